@@ -1,67 +1,43 @@
 import asyncio
-import csv
-import json
 import time
-import random
-from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from fake_useragent import UserAgent
 from datetime import datetime
+import os
+import sys
 
-# User-Agent 설정을 위한 fake_useragent 사용
-ua = UserAgent()
-
-chrome_options = webdriver.ChromeOptions()
-chrome_options.add_argument("--headless")  # 헤드리스 모드 활성화
-chrome_options.add_argument("--no-sandbox")  # 샌드박스 사용 안 함
-chrome_options.add_argument("--disable-dev-shm-usage")  # /dev/shm 파티션 사용 안 함
-chrome_options.add_argument(f"user-agent={ua.random}")  # 랜덤 User-Agent 설정
-
-# Selenium 감지 방지 설정
-caps = webdriver.DesiredCapabilities.CHROME.copy()
-caps["pageLoadStrategy"] = "eager"  # 페이지가 완전히 로드되기 전에도 동작하도록 설정
+# 공용 모듈(done/) 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'done'))
+from browser_pool import create_chrome, random_user_agent, wait_until_ready
+from rate_controller import RateController
+from recipe_extractor import parse_recipe_page
+from record_sink import ShardedJsonlSink, export_csv
 
 base_url = "https://www.10000recipe.com/recipe/"
+# V1 크롤러의 shard(10000recipe_shards)를 지우지 않도록 별도 디렉터리 사용
+shardDir = '10000test_recipe_shards'
 
+# 요청 속도 조절기 (페이지가 정상적으로 열리면 올리고, 타임아웃이 나면 줄임)
+rate_controller = RateController(rate=1.0, min_rate=0.2, max_rate=5.0, healthy_window=5)
 
-async def parsing_async(page_source):
-    parsed_li = []
-    soup = BeautifulSoup(page_source, "html.parser")
-
-    # JSON-LD 데이터 추출
-    try:
-        json_ld_script = soup.find("script", type="application/ld+json")
-        json_ld_data = json.loads(json_ld_script.string)
-    except Exception as e:
-        print(f"[ERROR] JSON-LD parsing failed: {e}")
-        return []
-
-    # 태그 데이터 추출
-    try:
-        tags = [tag.text.strip() for tag in soup.select(".view_tag a")]
-    except Exception as e:
-        print(f"[ERROR] Tag parsing failed: {e}")
-        tags = []
-
-    json_ld_data['tags'] = tags
-    parsed_li.append(json_ld_data)
 
-    return parsed_li
+async def parsing_async(page_source):
+    # JSON-LD / 태그만 바로 추출 (마크업이 예상과 다르면 BeautifulSoup 으로 처리)
+    return parse_recipe_page(page_source, with_ingredients=False, json_strict=True)
 
 
 async def crawl_async(recipe_id):
     global currBrowser
 
     url = base_url + str(recipe_id)
+    await rate_controller.acquire()
+    start = time.monotonic()
     try:
         currBrowser.get(url)
     except:
         print(f"[ERROR] getUrl failed at recipe ID {recipe_id}")
+        rate_controller.report(error=True)
         raise Exception("browser.get(url) Failed")
 
     try:
@@ -70,34 +46,32 @@ async def crawl_async(recipe_id):
         )
     except:
         print(f"[ERROR] 20s timeout at recipe ID {recipe_id}")
+        rate_controller.report(error=True)
         raise Exception("WebDriverWait Timeout")
 
+    rate_controller.report(latency=time.monotonic() - start)
     page_source = currBrowser.page_source
     parsing_li = await parsing_async(page_source)
 
     return parsing_li
 
 
-async def main_async():
-    global datas_li
+async def main_async(sink):
+    global row_count
     global currBrowser
 
-    datas_li = []
-    options = webdriver.ChromeOptions()
-    options.add_argument("headless")
-    options.add_argument(f"user-agent={ua.random}")  # 랜덤 User-Agent 설정
-
-    # options를 capabilities로 변환하여 병합
-    caps.update(options.to_capabilities())
-
-    currBrowser = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    time.sleep(3)
+    row_count = 0
+    # eager 로딩 + 이미지 / 미디어 / 폰트 / 광고·트래커 요청 차단 (랜덤 User-Agent)
+    currBrowser = create_chrome(random_user_agent())
+    wait_until_ready(currBrowser)
 
     for recipe_id in range(7028222, 7028224):  # 1번부터 100번 레시피 ID까지 크롤링
         parsed_li = await crawl_async(recipe_id)
         print(f"Recipe ID {recipe_id} has {len(parsed_li)} items.")
-        datas_li += parsed_li
-        time.sleep(random.uniform(1, 3))  # 요청 사이에 랜덤 지연 시간 추가
+        # 모아두지 않고 바로 shard 에 기록
+        for data in parsed_li:
+            sink(data)
+        row_count += len(parsed_li)
 
     currBrowser.quit()
 
@@ -105,7 +79,11 @@ async def main_async():
 # Running Time Check
 startTime = datetime.today()
 
-asyncio.run(main_async())
+sink = ShardedJsonlSink(shardDir)
+try:
+    asyncio.run(main_async(sink))
+finally:
+    sink.close()
 
 # Running Time Check
 endTime = datetime.today()
@@ -113,26 +91,17 @@ endTime = datetime.today()
 print(f"[Start Time] {startTime}\n")
 print(f"[End Time] {endTime}\n")
 print(f"[Running Time] : {endTime - startTime} (ms)\n")
-print(f"[File Length] {len(datas_li)} rows \n\n")
-
-# CSV 출력
-with open('10000recipe_results.csv', mode='w', newline='', encoding='utf-8') as fd:
-    csvWriter = csv.writer(fd)
-    # JSON-LD의 모든 키를 헤더로 사용
-    if datas_li:
-        # 첫 번째 데이터의 키를 사용하여 헤더를 설정
-        headers = list(datas_li[0].keys())
-        csvWriter.writerow(headers)
-        # 크롤링 결과 작성
-        for data in datas_li:
-            csvWriter.writerow([data.get(header, "") for header in headers])
+print(f"[File Length] {row_count} rows \n\n")
+
+# CSV 출력 (shard 의 모든 레코드 키를 합친 컬럼으로 변환)
+export_csv(shardDir, '10000recipe_results.csv')
 
 # log 출력
 log_fd = open("10000recipe_log.txt", "a", newline="")
 log_fd.write(f"[Start Time] {startTime}\n")
 log_fd.write(f"[End Time] {endTime}\n")
 log_fd.write(f"[Running Time] : {endTime - startTime} (ms)\n")
-log_fd.write(f"[File Length] {len(datas_li)} rows \n\n")
+log_fd.write(f"[File Length] {row_count} rows \n\n")
 log_fd.close()
 
 print("[LOGGED] time log.txt generated")
@@ -1,116 +1,91 @@
+import argparse
 import asyncio
-import csv
-import json
 import time
-import random
-from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from fake_useragent import UserAgent
 from datetime import datetime
 import os
+import sys
 
-# User-Agent 설정을 위한 fake_useragent 사용
-ua = UserAgent()
+# 공용 모듈(done/) 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'done'))
+from browser_pool import NOT_FOUND_PAGE, BrowserPool, create_chrome, load_page, random_user_agent
+from crawl_journal import CrawlJournal, ERROR, NOT_FOUND, PARSED
+from rate_controller import RateController
+from recipe_extractor import parse_recipe_page
+from recipe_id_index import open_index
+from record_sink import ShardedJsonlSink, export_records
 
-chrome_options = webdriver.ChromeOptions()
-chrome_options.add_argument("--headless")  # 헤드리스 모드 활성화
-chrome_options.add_argument("--no-sandbox")  # 샌드박스 사용 안 함
-chrome_options.add_argument("--disable-dev-shm-usage")  # /dev/shm 파티션 사용 안 함
-chrome_options.add_argument(f"user-agent={ua.random}")  # 랜덤 User-Agent 설정
+base_url = "https://www.10000recipe.com/recipe/"
 
-# Selenium 감지 방지 설정
-caps = webdriver.DesiredCapabilities.CHROME.copy()
-caps["pageLoadStrategy"] = "eager"  # 페이지가 완전히 로드되기 전에도 동작하도록 설정
+# 모든 브라우저가 공유하는 요청 속도 조절기 (페이지가 정상적으로 열리면 올리고, 타임아웃이 나면 줄임)
+rate_controller = RateController(rate=2.0, min_rate=0.2, max_rate=10.0, healthy_window=5)
 
-base_url = "https://www.10000recipe.com/recipe/"
+async def parsing_async(page_source, recipe_id):
+    # JSON-LD / 태그만 바로 추출 (마크업이 예상과 다르면 BeautifulSoup 으로 처리)
+    return parse_recipe_page(page_source, recipe_id, with_ingredients=False, json_strict=True)
 
-async def parsing_async(page_source):
-    parsed_li = []
-    soup = BeautifulSoup(page_source, "html.parser")
+def create_browser():
+    # eager 로딩 + 이미지 / 미디어 / 폰트 / 광고·트래커 요청 차단 (브라우저마다 랜덤 User-Agent)
+    return create_chrome(random_user_agent())
 
-    # JSON-LD 데이터 추출
+def load_recipe_page(browser, recipe_id):
+    # 브라우저 전용 스레드에서 실행되는 blocking 함수 (요청 전에 속도 조절기에서 차례를 받음)
+    rate_controller.acquire_blocking()
+    start = time.monotonic()
     try:
-        json_ld_script = soup.find("script", type="application/ld+json")
-        json_ld_data = json.loads(json_ld_script.string)
-    except Exception as e:
-        print(f"[ERROR] JSON-LD parsing failed: {e}")
-        return []
-
-    # 태그 데이터 추출
+        # JSON-LD 가 생기거나 레시피 없음 alert 가 뜰 때까지 기다림 (alert 를 따로 3초씩 기다리지 않음)
+        page_source = load_page(browser, base_url + str(recipe_id))
+        rate_controller.report(latency=time.monotonic() - start)
+        if page_source is NOT_FOUND_PAGE:
+            print(f"Recipe ID {recipe_id} not found (alert present).")
+            return None  # 레시피가 없는 경우
+        return page_source
+    except Exception:
+        # 페이지 로드 / JSON-LD 대기 타임아웃은 서버가 버거워하는 신호로 보고 속도를 줄임
+        rate_controller.report(error=True)
+        raise
+
+async def crawl_async(recipe_id, pool, journal, sink):
     try:
-        tags = [tag.text.strip() for tag in soup.select(".view_tag a")]
-    except Exception as e:
-        print(f"[ERROR] Tag parsing failed: {e}")
-        tags = []
-
-    # 태그가 없으면 빈 리스트로 설정
-    if not tags:
-        tags = []
-
-    json_ld_data['tags'] = tags
-    parsed_li.append(json_ld_data)
-
-    return parsed_li
-
-async def crawl_async(recipe_id, browser, semaphore):
-    async with semaphore:
-        try:
-            url = base_url + str(recipe_id)
-            browser.get(url)
-
-            # 레시피가 없을 때 alert 창 처리
-            try:
-                alert = WebDriverWait(browser, 3).until(EC.alert_is_present())
-                alert.accept()
-                print(f"Recipe ID {recipe_id} not found (alert present).")
-                return [], recipe_id  # 레시피가 없는 경우
-            except:
-                pass
-
-            element = WebDriverWait(browser, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "script[type='application/ld+json']"))
-            )
-            page_source = browser.page_source
-            parsing_li = await parsing_async(page_source)
-            return parsing_li, None
-        except Exception as e:
-            print(f"[ERROR] Error at recipe ID {recipe_id}: {e}")
+        page_source = await pool.run(load_recipe_page, recipe_id)
+        if page_source is None:
+            journal.record(recipe_id, NOT_FOUND)
             return [], recipe_id
+        parsing_li = await parsing_async(page_source, recipe_id)
+        # 결과는 바로 shard 에 기록 (저널의 완료 표시는 shard 가 커밋될 때)
+        for data in parsing_li:
+            sink(data)
+        if not parsing_li:
+            journal.record(recipe_id, NOT_FOUND)
+        return parsing_li, None
+    except Exception as e:
+        print(f"[ERROR] Error at recipe ID {recipe_id}: {e}")
+        journal.record(recipe_id, ERROR, str(e))
+        return [], recipe_id
 
-async def main_async(recipe_ids):
-    global datas_li
+async def main_async(recipe_ids, journal, sink):
+    global row_count
 
-    datas_li = []
+    row_count = 0
     not_found_ids = []
 
-    options = webdriver.ChromeOptions()
-    options.add_argument("headless")
-    options.add_argument(f"user-agent={ua.random}")  # 랜덤 User-Agent 설정
-
-    # options를 capabilities로 변환하여 병합
-    caps.update(options.to_capabilities())
-
     # 더 많은 브라우저 인스턴스를 생성하여 병렬 처리
     num_browsers = 5  # 동시에 실행될 최대 브라우저 수
-    browsers = [webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options) for _ in range(num_browsers)]
-    time.sleep(3)
-
-    semaphore = asyncio.Semaphore(num_browsers)  # 병렬로 실행될 최대 task 수
+    pool = BrowserPool(num_browsers, create_browser)  # 브라우저마다 200 페이지 / RSS 1 GiB 를 넘으면 새 브라우저로 교체
 
-    tasks = []
-    for i, recipe_id in enumerate(recipe_ids):
-        browser = browsers[i % len(browsers)]
-        task = asyncio.ensure_future(crawl_async(recipe_id, browser, semaphore))
-        tasks.append(task)
-        print(f"Task created for Recipe ID {recipe_id}")
-        time.sleep(random.uniform(0.5, 1.5))  # 요청 사이에 랜덤 지연 시간 추가
+    try:
+        await pool.start()  # 브라우저를 동시에 띄우고 모두 준비될 때까지 대기
+        tasks = []
+        for recipe_id in recipe_ids:
+            # 작업은 비어있는 브라우저가 생기는 대로 배정됨
+            task = asyncio.ensure_future(crawl_async(recipe_id, pool, journal, sink))
+            tasks.append(task)
+            print(f"Task created for Recipe ID {recipe_id}")
+
+        results = await asyncio.gather(*tasks)
+    finally:
+        await pool.close()
+        print(f"[INFO] Rate controller: {rate_controller.stats()}")
 
-    results = await asyncio.gather(*tasks)
     for i, result in enumerate(results):
         parsed_li, not_found_id = result
         if not_found_id:
@@ -119,54 +94,70 @@ async def main_async(recipe_ids):
         else:
             recipe_id = recipe_ids[i]
             print(f"Recipe ID {recipe_id} has {len(parsed_li)} items.")
-            datas_li += parsed_li
-
-    for browser in browsers:
-        browser.quit()
+            row_count += len(parsed_li)
 
     return not_found_ids
 
-# 파일에서 레시피 ID 읽기
-with open('./recipe_id.txt', 'r') as file:
-    recipe_ids = [int(line.strip()) for line in file]
-
-# ID 값을 큰 순서대로 정렬하고, 상위 1,000개 선택
-recipe_ids = sorted(recipe_ids, reverse=True)[:1000]
+parser = argparse.ArgumentParser()
+parser.add_argument('--resume', action='store_true', help="skip IDs already completed in the journal and keep the existing shards")
+parser.add_argument('--journal', default='10000recipe_journal.db', help="progress journal (SQLite)")
+parser.add_argument('--index', default='recipe_id_index.npy', help="recipe ID index (built from recipe_id.txt if missing)")
+parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="output file format (parquet keeps list/struct columns typed)")
+args = parser.parse_args()
+
+# 레시피 ID 인덱스에서 가장 큰 ID 1,000개 선택 (인덱스가 없으면 recipe_id.txt 로 한 번 생성)
+index = open_index(args.index, './recipe_id.txt')
+recipe_ids = [int(recipe_id) for recipe_id in index.newest(1000)]
+if not recipe_ids:
+    print(f"[ERROR] No recipe IDs in {args.index} (or ./recipe_id.txt), nothing to crawl")
+    sys.exit(1)
+low, high = recipe_ids[-1], recipe_ids[0]
+
+# --resume: 저널에 이미 완료(parsed / not_found)로 남은 ID 는 건너뜀
+journal = CrawlJournal(args.journal)
+if args.resume:
+    completed = journal.completed_between(low, high)
+    recipe_ids = [recipe_id for recipe_id in recipe_ids if recipe_id not in completed]
+    print(f"[INFO] Resuming: {len(completed)} recipes already completed")
+
+# 크롤링 결과는 나오는 대로 압축 JSONL shard 에 기록
+sink = ShardedJsonlSink('10000recipe_shards', on_commit=lambda ids: journal.record_many(ids, PARSED), append=args.resume)
 
 # Running Time Check
 startTime = datetime.today()
 print(f"[Start Time] {startTime}")
 
-not_found_ids = asyncio.run(main_async(recipe_ids))
+try:
+    not_found_ids = asyncio.run(main_async(recipe_ids, journal, sink))
+finally:
+    sink.close()
 
 # Running Time Check
 endTime = datetime.today()
 print(f"[End Time] {endTime}")
 print(f"[Running Time] : {endTime - startTime} (ms)")
-print(f"[File Length] {len(datas_li)} rows \n\n")
-
-# CSV 출력
-with open('10000recipe_results.csv', mode='w', newline='', encoding='utf-8') as fd:
-    csvWriter = csv.writer(fd)
-    # JSON-LD의 모든 키를 헤더로 사용
-    if datas_li:
-        # 첫 번째 데이터의 키를 사용하여 헤더를 설정
-        headers = list(datas_li[0].keys())
-        csvWriter.writerow(headers)
-        # 크롤링 결과 작성
-        for data in datas_li:
-            csvWriter.writerow([data.get(header, "") for header in headers])
-
-# 레시피가 없는 ID 로그 출력
+print(f"[File Length] {row_count} rows \n\n")
+
+# CSV 출력 (모든 레코드의 키를 합친 컬럼 사용), --format parquet 이면 Parquet 출력
+export_records('10000recipe_shards', f'10000recipe_results.{args.format}')
+
+# 레시피가 없는 ID / 오류로 실패한 ID 로그 출력 (이전 실행 결과까지 저널에서 모아서 기록)
+# 실패한 ID 는 레시피가 없는 것이 아니므로 따로 기록 (--resume 으로 다시 시도)
+not_found_ids = sorted(journal.ids_with_status(NOT_FOUND, low, high), reverse=True)
+failed_ids = sorted(journal.ids_with_status(ERROR, low, high), reverse=True)
+journal.close()
 with open('not_found_recipes.txt', mode='w', newline='', encoding='utf-8') as log_fd:
     for not_found_id in not_found_ids:
         log_fd.write(f"{not_found_id}\n")
+with open('failed_recipes.txt', mode='w', newline='', encoding='utf-8') as log_fd:
+    for failed_id in failed_ids:
+        log_fd.write(f"{failed_id}\n")
 
 # log 출력
 with open("10000recipe_log.txt", "a", newline="") as log_fd:
     log_fd.write(f"[Start Time] {startTime}\n")
     log_fd.write(f"[End Time] {endTime}\n")
     log_fd.write(f"[Running Time] : {endTime - startTime} (ms)\n")
-    log_fd.write(f"[File Length] {len(datas_li)} rows \n\n")
+    log_fd.write(f"[File Length] {row_count} rows \n\n")
 
 print("[LOGGED] time log.txt generated")
@@ -1,22 +1,20 @@
 import asyncio
 import csv
-import time
 from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from datetime import datetime
+import time
 
-chrome_options = webdriver.ChromeOptions()
-chrome_options.add_argument("--headless") # 헤드리스 모드 활성화
-chrome_options.add_argument("--no-sandbox") # 샌드박스 사용 안 함
-chrome_options.add_argument("--disable-dev-shm-usage") # /dev/shm 파티션 사용 안 함
+from browser_pool import create_chrome, wait_until_ready
+from rate_controller import RateController
 
 base_url = "https://www.10000recipe.com/profile/recipe.html?uid=10000know&qs=손질&page="
 
+# 요청 속도 조절기 (페이지가 정상적으로 열리면 올리고, 타임아웃이 나면 줄임)
+rate_controller = RateController(rate=1.0, min_rate=0.2, max_rate=5.0, healthy_window=5)
+
 async def parsing_async(crawledHtml_li):
     parsed_li = []
     for result in crawledHtml_li:
@@ -34,10 +32,13 @@ async def crawl_async(page):
     global currBrowser
 
     url = base_url + str(page)
+    await rate_controller.acquire()
+    start = time.monotonic()
     try:
         currBrowser.get(url)
     except:
         print("[ERROR] getUrl failed at page ", page)
+        rate_controller.report(error=True)
         raise Exception("browser.get(url) Failed")
 
     try:
@@ -46,8 +47,10 @@ async def crawl_async(page):
         )
     except:
         print("[ERROR] 20s timeout at page ", page)
+        rate_controller.report(error=True)
         raise Exception("WebDriverWait Timeout")
 
+    rate_controller.report(latency=time.monotonic() - start)
     soup = BeautifulSoup(currBrowser.page_source, "html.parser")
     crawledHtml_li = soup.select("#contents_area > div.brand_cont.mag_t_10 > ul > li")
     parsing_li = await parsing_async(crawledHtml_li)
@@ -59,10 +62,9 @@ async def main_async():
     global currBrowser
 
     datas_li = []
-    options = webdriver.ChromeOptions()
-    options.add_argument("headless")
-    currBrowser = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    time.sleep(3)
+    # eager 로딩 + 이미지 / 미디어 / 폰트 / 광고·트래커 요청 차단
+    currBrowser = create_chrome()
+    wait_until_ready(currBrowser)
 
     for page in range(1, 10):
         parsed_li = await crawl_async(page)
@@ -70,6 +72,7 @@ async def main_async():
         datas_li += parsed_li
 
     currBrowser.quit()
+    print(f"[INFO] Rate controller: {rate_controller.stats()}")
 
 # Running Time Check
 startTime = datetime.today()
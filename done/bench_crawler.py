@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+# 크롤러 벤치마크
+# standin_server.py 를 별도 프로세스로 띄우고 (recent_recipes.csv 로 만든 페이지, 지연 / 오류 / 요청 제한 설정 가능),
+# fast_version / recent_crawling 의 CrawlingBetweenRanges 를 그 서버에 대해 실행해서
+# 초당 페이지 수, 요청 지연 p50/p99, 최대 RSS 를 측정한다. 추출기(parse_recipe_page)만 돌린 결과도 같이 측정한다.
+# 측정마다 별도 프로세스에서 실행하므로 RSS 가 서로 섞이지 않는다.
+# --json 으로 결과를 저장하고, 다음 측정 때 --baseline 으로 넘기면 변화율을 같이 출력한다.
+#   python bench_crawler.py --ids 3000 --latency 0.02 --jitter 0.5 --error-rate 0.01 --json bench_crawler.json
+
+
+def peak_rss_mib():
+    # 리눅스에서 ru_maxrss 단위는 KiB (파싱 워커 프로세스는 RUSAGE_CHILDREN)
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+def run_crawl(crawler, base_url, ids, setting, parse_workers, max_rate):
+    # 측정용 프로세스에서 실행: 저널 / 지표 파일은 임시 디렉터리에
+    from crawl_journal import CrawlJournal
+    from crawl_metrics import CrawlMetrics
+    from rate_controller import RateController
+
+    module = __import__(crawler)
+    module.baseUrl = base_url
+    module.metricsFilename = os.devnull
+    metrics = CrawlMetrics()
+    # 처음부터 상한 속도로 시작 (서버가 제한하면 줄어듦)
+    rate = RateController(max_rate, max_rate=max_rate)
+    recipes = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = CrawlJournal(os.path.join(tmp, 'journal.db'))
+        start = time.perf_counter()
+        if crawler == 'fast_version':
+            coroutine = module.CrawlingBetweenRanges(7028266, ids, recipes.append, journal, concurrency=setting,
+                                                     parseWorkers=parse_workers, rate=rate, metrics=metrics)
+        else:
+            coroutine = module.CrawlingBetweenRanges(1, ids, recipes.append, journal, windowSize=setting,
+                                                     parseWorkers=parse_workers, rate=rate, metrics=metrics)
+        asyncio.run(coroutine)
+        elapsed = time.perf_counter() - start
+        journal.close()
+
+    snapshot = metrics.snapshot()
+    fetch = snapshot['histograms'].get('fetch_seconds', {'count': 0})
+    own, children = peak_rss_mib()
+    return {
+        'pages': fetch['count'],
+        'recipes': len(recipes),
+        'elapsed': elapsed,
+        'pages_per_second': fetch['count'] / elapsed,
+        'p50_ms': fetch.get('p50', 0) * 1000,
+        'p99_ms': fetch.get('p99', 0) * 1000,
+        'rss_mib': own,
+        'children_rss_mib': children,
+        'counters': snapshot['counters'],
+    }
+
+
+def run_parse(csv_filename, limit, repeat):
+    from recipe_extractor import parse_recipe_page
+    from sample_pages import load_sample_records, render_not_found_page, render_recipe_page
+
+    pages = [render_recipe_page(record) for record in load_sample_records(csv_filename, limit)]
+    pages.append(render_not_found_page())
+    timings = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for recipe_id, page in enumerate(pages):
+            page_start = time.perf_counter()
+            parse_recipe_page(page, recipe_id)
+            timings.append(time.perf_counter() - page_start)
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    own, children = peak_rss_mib()
+    return {
+        'pages': len(timings),
+        'recipes': None,
+        'elapsed': elapsed,
+        'pages_per_second': len(timings) / elapsed,
+        'p50_ms': timings[len(timings) // 2] * 1000,
+        'p99_ms': timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000,
+        'rss_mib': own,
+        'children_rss_mib': children,
+    }
+
+
+def run_once(args):
+    # 크롤러 출력(페이지마다 찍는 로그)은 버리고 마지막 줄에 결과 JSON 만 출력
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            if args.run_once == 'parse':
+                result = run_parse(args.csv, args.limit, args.repeat)
+            else:
+                result = run_crawl(args.run_once, args.base_url, args.ids, args.setting, args.parse_workers, args.max_rate)
+        finally:
+            sys.stdout = stdout
+    print(json.dumps(result))
+
+
+def measure(args, scenario, setting=0):
+    command = [sys.executable, os.path.abspath(__file__), '--run-once', scenario, '--setting', str(setting),
+               '--base-url', args.base_url, '--ids', str(args.ids), '--parse-workers', str(args.parse_workers),
+               '--max-rate', str(args.max_rate), '--csv', args.csv, '--limit', str(args.limit), '--repeat', str(args.repeat)]
+    result = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def server_stats(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/stats', timeout=5) as response:
+        return json.loads(response.read())
+
+
+def start_server(args):
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'standin_server.py'),
+               '--port', str(args.port), '--csv', args.csv, '--limit', str(args.limit),
+               '--capacity', str(args.capacity), '--latency', str(args.latency), '--jitter', str(args.jitter),
+               '--error-rate', str(args.error_rate), '--seed', str(args.seed)]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # 서버가 요청을 받을 수 있을 때까지 대기
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            server_stats(args.port)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("stand-in server exited during startup")
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("stand-in server did not start")
+
+
+def report(name, result, baseline):
+    line = (f"{name:<18} {result['pages_per_second']:9.1f} pages/s  p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+            f"peak RSS {result['rss_mib']:7.1f} MiB (+ workers {result['children_rss_mib']:.1f} MiB)")
+    if result.get('throttled'):
+        line += f"  429 x{result['throttled']}"
+    previous = baseline.get(name)
+    if previous:
+        line += f"  [{result['pages_per_second'] / previous['pages_per_second'] - 1:+.1%} vs baseline]"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="crawler benchmark against a local stand-in server")
+    parser.add_argument('--csv', default='recent_recipes.csv', help="records used to render the recipe pages")
+    parser.add_argument('--limit', type=int, default=500, help="number of records to render")
+    parser.add_argument('--ids', type=int, default=2000, help="IDs crawled per run")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[25, 100], help="fast_version concurrency values")
+    parser.add_argument('--windows', type=int, nargs='+', default=[10, 50], help="recent_crawling window sizes")
+    parser.add_argument('--parse-workers', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument('--max-rate', type=float, default=1000, help="rate controller upper bound (requests per second)")
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--capacity', type=float, default=100000, help="server requests per second before 429")
+    parser.add_argument('--latency', type=float, default=0.02, help="server response latency (seconds)")
+    parser.add_argument('--jitter', type=float, default=0.5, help="server latency jitter (fraction)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="server 503 probability")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help="passes over the pages for the parse-only run")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="results file from an earlier run to compare against")
+    parser.add_argument('--run-once', help=argparse.SUPPRESS)
+    parser.add_argument('--setting', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_once:
+        run_once(args)
+        return
+
+    args.base_url = f'http://127.0.0.1:{args.port}/recipe/'
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fd:
+            baseline = json.load(fd)['results']
+
+    print(f"[INFO] {args.ids} IDs per run, server latency {args.latency * 1000:.0f} ms ±{args.jitter:.0%}, "
+          f"error rate {args.error_rate:.1%}, capacity {args.capacity:g} req/s, parse workers {args.parse_workers}")
+    scenarios = [(f'fast_version c={c}', 'fast_version', c) for c in args.concurrency]
+    scenarios += [(f'recent w={w}', 'recent_crawling', w) for w in args.windows]
+
+    results = {}
+    server = start_server(args)
+    try:
+        for name, crawler, setting in scenarios:
+            before = server_stats(args.port)
+            result = measure(args, crawler, setting)
+            after = server_stats(args.port)
+            result['throttled'] = after.get('throttled', 0) - before.get('throttled', 0)
+            results[name] = result
+            report(name, result, baseline)
+    finally:
+        server.terminate()
+        server.wait()
+
+    results['parse only'] = measure(args, 'parse')
+    report('parse only', results['parse only'], baseline)
+
+    if args.json:
+        with open(args.json, mode='w', encoding='utf-8') as fd:
+            json.dump({'settings': {key: value for key, value in vars(args).items() if key not in ('run_once', 'setting', 'json', 'baseline')},
+                       'results': results}, fd, indent=2)
+        print(f"[LOGGED] results saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import glob
+import os
+import statistics
+import time
+import tracemalloc
+import warnings
+
+from recipe_extractor import extract_page, extract_page_with_soup
+from sample_pages import load_sample_records, render_not_found_page, render_recipe_page
+
+# 레시피 페이지 추출기 마이크로 벤치마크
+# 저장된 페이지(--pages-dir 의 *.html)가 있으면 그것을, 없으면 recent_recipes.csv 로 만든 페이지를 사용한다.
+# 합성 페이지에서 차이가 0 이어도 실제 마크업과 같다는 뜻은 아님 -> 두 추출기가 같은지는 저장된 실제 페이지로 확인할 것
+#   python bench_extractor.py --pages-dir ./pages
+#   python bench_extractor.py --csv recent_recipes.csv --limit 300
+
+
+# 주석 / script 안에 alert, view_tag, JSON-LD, 재료 영역 마크업이 들어간 페이지 (BeautifulSoup 은 요소로 보지 않음)
+# 이름: (넣을 위치 바로 앞 태그, 마크업)
+edgeCaseMarkup = {
+    'alert-in-comment': (b'<body>', b'<!-- <div class="alert">old notice</div> -->'),
+    'alert-in-script': (b'<body>', b'<script>var notice = \'<div class="alert">\' + msg + \'</div>\';</script>'),
+    'tag-in-comment': (b'<body>', b'<!-- <div class="view_tag"><a href="#">old tag</a></div> -->'),
+    'json-ld-in-comment': (b'<head>', b'<!-- <script type="application/ld+json">{"name": "old"}</script> -->'),
+    'material-in-comment': (b'<body>', b'<!-- <div id="divConfirmedMaterialArea"><ul><li><div>old</div><span>1</span></li></ul></div> -->'),
+}
+
+
+def load_pages(pages_dir, csv_filename, limit):
+    # (이름, 페이지) 목록
+    if pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(pages_dir, '*.html')))[:limit]:
+            with open(path, 'rb') as fd:
+                pages.append((os.path.basename(path), fd.read()))
+        return pages
+
+    records = load_sample_records(csv_filename, limit)
+    pages = [(f'record-{i}', render_recipe_page(record)) for i, record in enumerate(records)]
+    pages.append(('not-found', render_not_found_page()))
+    if records:
+        page = render_recipe_page(records[0])
+        for name, (anchor, markup) in edgeCaseMarkup.items():
+            pages.append((name, page.replace(anchor, anchor + markup, 1)))
+    return pages
+
+
+def time_per_page(extract_fn, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        for page in pages:
+            start = time.perf_counter()
+            extract_fn(page)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory_per_page(extract_fn, pages):
+    peaks = []
+    tracemalloc.start()
+    try:
+        for page in pages:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            extract_fn(page)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def report(name, timings, peaks):
+    timings_us = sorted(t * 1e6 for t in timings)
+    p99 = timings_us[min(len(timings_us) - 1, int(len(timings_us) * 0.99))]
+    print(f"{name:<14} mean {statistics.mean(timings_us):9.1f} us  p50 {statistics.median(timings_us):9.1f} us  "
+          f"p99 {p99:9.1f} us  peak alloc {statistics.mean(peaks) / 1024:8.1f} KiB/page")
+    return statistics.mean(timings_us)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recipe page extractor benchmark")
+    parser.add_argument('--pages-dir', help="directory of saved recipe pages (*.html)")
+    parser.add_argument('--csv', default='recent_recipes.csv', help="records used to render synthetic pages")
+    parser.add_argument('--limit', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')  # bs4 의 from_encoding 경고 무시
+    named_pages = load_pages(args.pages_dir, args.csv, args.limit)
+    pages = [page for _, page in named_pages]
+    total_bytes = sum(len(page) for page in pages)
+    source = f"saved pages from {args.pages_dir}" if args.pages_dir else f"synthetic pages rendered from {args.csv}"
+    print(f"[INFO] {len(pages)} {source}, average {total_bytes / len(pages) / 1024:.1f} KiB")
+
+    mismatched = [name for name, page in named_pages if extract_page(page) != extract_page_with_soup(page)]
+    print(f"[INFO] {len(mismatched)} pages differ between extractors")
+    for name in mismatched[:20]:
+        print(f"[ERROR] extractors disagree on {name}")
+    if not args.pages_dir:
+        print("[INFO] synthetic pages only; pass --pages-dir with saved pages to check real markup")
+
+    soup_mean = report('BeautifulSoup', time_per_page(extract_page_with_soup, pages, args.repeat),
+                       peak_memory_per_page(extract_page_with_soup, pages))
+    fast_mean = report('targeted scan', time_per_page(extract_page, pages, args.repeat),
+                       peak_memory_per_page(extract_page, pages))
+    print(f"[INFO] speedup x{soup_mean / fast_mean:.1f}")
+
+
+if __name__ == '__main__':
+    main()
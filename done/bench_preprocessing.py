@@ -0,0 +1,121 @@
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from preprocessing_recipes import preprocess_recipe_data, preprocess_recipe_data_streaming
+
+# 전처리 벤치마크
+# recent_recipes.csv 의 행을 recipe_id 만 바꿔 반복해서 큰 합성 코퍼스(기본 200,000행)를 만들고,
+# 전체를 한 번에 읽는 기존 방식과 chunk 스트리밍 방식(워커 수별)의 시간과 최대 메모리(RSS)를 비교한다.
+# 측정마다 별도 프로세스에서 실행하므로 RSS 가 서로 섞이지 않는다.
+# 벤치마크가 만든 코퍼스(bench_corpus_{rows}.csv)는 끝나면 지운다 (--keep 이면 남겨두고, 다음 실행에서 다시 사용).
+# --corpus 로 넘긴 파일은 그대로 읽기만 한다 (덮어쓰거나 지우지 않음).
+#   python bench_preprocessing.py --rows 200000 --workers 1 2 4
+
+
+def build_corpus(sample_csv, corpus_csv, rows):
+    with open(sample_csv, newline='', encoding='utf-8-sig') as fd:
+        reader = csv.reader(fd)
+        header = next(reader)
+        samples = list(reader)
+
+    id_index = header.index('recipe_id')
+    with open(corpus_csv, mode='w', newline='', encoding='utf-8-sig') as fd:
+        writer = csv.writer(fd)
+        writer.writerow(header)
+        for i in range(rows):
+            row = list(samples[i % len(samples)])
+            row[id_index] = str(1000000 + i)
+            writer.writerow(row)
+
+
+def count_rows(corpus_csv):
+    with open(corpus_csv, newline='', encoding='utf-8-sig') as fd:
+        return sum(1 for _ in csv.reader(fd)) - 1
+
+
+def peak_rss_mib():
+    # 리눅스에서 ru_maxrss 단위는 KiB (워커 프로세스는 RUSAGE_CHILDREN 에 합쳐짐)
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+def run_once(corpus_csv, output_csv, workers, chunksize):
+    start = time.perf_counter()
+    if workers == 0:
+        preprocess_recipe_data(corpus_csv, output_csv)
+    else:
+        preprocess_recipe_data_streaming(corpus_csv, output_csv, chunksize=chunksize, workers=workers)
+    elapsed = time.perf_counter() - start
+    own, children = peak_rss_mib()
+    print(f"{elapsed:.3f} {own:.1f} {children:.1f}")
+
+
+def measure(corpus_csv, output_csv, workers, chunksize):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-once', corpus_csv, output_csv,
+                             '--workers', str(workers), '--chunksize', str(chunksize)],
+                            check=True, capture_output=True, text=True)
+    elapsed, own, children = map(float, result.stdout.strip().splitlines()[-1].split())
+    return elapsed, own, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recipe preprocessing benchmark")
+    parser.add_argument('--csv', default='recent_recipes.csv', help="sample rows used to build the synthetic corpus")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunksize', type=int, default=20000)
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help="worker counts to measure (default: 1, 2, 4, ... up to cpu count)")
+    parser.add_argument('--corpus', help="existing corpus to measure instead of building bench_corpus_{rows}.csv (never modified)")
+    parser.add_argument('--keep', action='store_true', help="keep the generated corpus for the next run")
+    parser.add_argument('--run-once', nargs=2, metavar=('CORPUS', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_once:
+        run_once(args.run_once[0], args.run_once[1], args.workers[0], args.chunksize)
+        return
+
+    worker_counts = args.workers
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= (os.cpu_count() or 1):
+            worker_counts.append(worker_counts[-1] * 2)
+
+    if args.corpus and not os.path.exists(args.corpus):
+        parser.error(f"--corpus {args.corpus} does not exist")
+
+    corpus_csv = args.corpus or f'bench_corpus_{args.rows}.csv'
+    generated = args.corpus is None  # 벤치마크가 만든 코퍼스만 다시 만들거나 지움
+    output_csv = 'bench_prepro.csv'
+    try:
+        if not generated:
+            rows = count_rows(corpus_csv)
+            if rows != args.rows:
+                print(f"[INFO] {corpus_csv} has {rows} rows, not --rows {args.rows}; measuring it as is")
+        elif os.path.exists(corpus_csv) and count_rows(corpus_csv) == args.rows:
+            # 이전 --keep 실행에서 남긴 코퍼스
+            print(f"[INFO] Reusing {args.rows} row corpus: {corpus_csv}")
+        else:
+            print(f"[INFO] Building {args.rows} row corpus: {corpus_csv}")
+            build_corpus(args.csv, corpus_csv, args.rows)
+        print(f"[INFO] corpus {os.path.getsize(corpus_csv) / 1024 / 1024:.1f} MiB, chunksize {args.chunksize}")
+
+        baseline, own, children = measure(corpus_csv, output_csv, 0, args.chunksize)
+        print(f"{'whole file':<16} {baseline:8.2f} s  peak RSS {own:8.1f} MiB")
+        for workers in worker_counts:
+            elapsed, own, children = measure(corpus_csv, output_csv, workers, args.chunksize)
+            print(f"{f'stream x{workers}':<16} {elapsed:8.2f} s  peak RSS {own:8.1f} MiB (+ workers {children:.1f} MiB)  "
+                  f"speedup x{baseline / elapsed:.2f}")
+    finally:
+        if os.path.exists(output_csv):
+            os.remove(output_csv)
+        if generated and not args.keep and os.path.exists(corpus_csv):
+            os.remove(corpus_csv)
+
+
+if __name__ == '__main__':
+    main()
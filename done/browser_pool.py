@@ -0,0 +1,292 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from crawl_metrics import Histogram, TIME_BUCKETS
+
+# headless Chrome 여러 개를 띄워두고 비어있는 브라우저에 작업을 배정하는 풀.
+# 브라우저마다 전용 스레드를 하나씩 두고, Selenium 호출은 모두 해당 브라우저의 스레드에서 실행되어 이벤트 루프를 막지 않는다.
+#   - create_chrome(): eager 로딩 (DOMContentLoaded 에서 get() 반환), 이미지 끔, 이미지 / 미디어 / 폰트 / 광고·트래커 요청은 CDP 로 차단
+#   - 브라우저마다 max_pages 페이지를 열었거나 Chrome 프로세스들의 RSS 합이 max_rss_mib 를 넘으면 새 브라우저로 교체 (메모리 누수 제한)
+#   - 페이지마다 걸린 시간을 page_seconds (및 metrics 의 browser_page_seconds) 에 기록
+#   - 브라우저는 동시에 띄우고, 고정 sleep 대신 세션이 스크립트를 실행할 수 있을 때까지 확인 (wait_until_ready)
+#   - chromedriver 경로는 한 번만 찾고 driverCacheFilename 에 저장해서 다음 실행에서 재사용 (CHROMEDRIVER 환경변수로 직접 지정 가능)
+# selenium / webdriver_manager / fake_useragent 는 브라우저를 실제로 만들 때 import (HTTP 만 쓰는 실행에서는 설치되어 있지 않아도 됨)
+
+# 레시피 없음 alert 가 뜬 페이지 대신 돌려주는 페이지 (추출기가 레시피 없음으로 판단하는 최소 마크업)
+NOT_FOUND_PAGE = '<html><body><div class="alert">레시피가 존재하지 않습니다.</div></body></html>'
+
+# Network.setBlockedURLs 패턴 (* 는 아무 문자열). 레시피 데이터는 HTML 안의 JSON-LD / 태그에만 있으므로 나머지는 받지 않음
+BLOCKED_URLS = [
+    # 이미지 / 미디어 / 폰트
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*', '*.ico*',
+    '*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*',
+    '*.woff*', '*.ttf*', '*.otf*', '*.eot*',
+    # 광고 / 트래커 (서드파티 호스트)
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*', '*googlesyndication.com*', '*adservice.google.*',
+    '*facebook.net*', '*facebook.com/tr*', '*criteo.*', '*taboola.com*', '*dable.io*', '*mobon.net*', '*wcs.naver.net*',
+    '*kakaoad*', '*adfit*',
+]
+
+maxPages = 200  # 브라우저 하나가 여는 최대 페이지 수
+maxRssMiB = 1024  # 브라우저 하나(chromedriver + Chrome 프로세스들)의 RSS 상한
+rssCheckEvery = 10  # RSS 는 이 페이지 수마다 확인 (/proc 을 훑으므로 매 페이지마다 하지 않음)
+readyTimeout = 30  # 브라우저를 띄운 뒤 준비될 때까지 기다리는 최대 시간(초)
+driverCacheFilename = os.path.join(os.path.expanduser('~'), '.cache', 'food-crawling', 'chromedriver.json')
+
+_driver_path = None
+_driver_lock = threading.Lock()
+_user_agent = None
+
+
+def resolve_chromedriver(stale_path=None):
+    # 1) CHROMEDRIVER 환경변수  2) 이 프로세스에서 이미 찾은 경로  3) 이전 실행에서 저장한 경로  4) ChromeDriverManager().install()
+    # 브라우저 스레드들이 동시에 불러도 install() 은 한 번만 실행됨
+    # stale_path: 이 경로의 driver 로 Chrome 을 띄우지 못함 (Chrome 업데이트 등) -> 저장된 경로를 버리고 다시 받음
+    global _driver_path
+    with _driver_lock:
+        if os.environ.get('CHROMEDRIVER'):
+            return os.environ['CHROMEDRIVER']
+        if _driver_path is not None and _driver_path != stale_path:
+            return _driver_path
+        if stale_path is None and os.path.exists(driverCacheFilename):
+            with open(driverCacheFilename, encoding='utf-8') as fd:
+                cached = json.load(fd).get('path')
+            if cached and os.access(cached, os.X_OK):
+                _driver_path = cached
+                return cached
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        _driver_path = ChromeDriverManager().install()
+        os.makedirs(os.path.dirname(driverCacheFilename), exist_ok=True)
+        tmp_path = driverCacheFilename + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fd:
+            json.dump({'path': _driver_path, 'resolved_at': time.time()}, fd)
+        os.replace(tmp_path, driverCacheFilename)
+        print(f"[INFO] chromedriver resolved to {_driver_path}")
+        return _driver_path
+
+
+def random_user_agent():
+    # fake_useragent 는 처음 부를 때 한 번만 불러옴 (UserAgent() 생성이 느림)
+    global _user_agent
+    if _user_agent is None:
+        from fake_useragent import UserAgent
+        _user_agent = UserAgent()
+    return _user_agent.random
+
+
+def wait_until_ready(browser, timeout=readyTimeout):
+    # 세션이 스크립트를 실행할 수 있으면 준비된 것으로 봄 (about:blank 의 readyState 가 complete)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if browser.execute_script("return document.readyState") == 'complete':
+                return
+        except Exception:
+            if time.monotonic() >= deadline:
+                raise
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"browser not ready after {timeout}s")
+        time.sleep(0.05)
+
+
+def process_tree_rss_mib(pid):
+    # pid 와 모든 자식 프로세스의 RSS 합 (리눅스 /proc 기준, 확인할 수 없으면 None)
+    try:
+        parents = {}
+        rss_pages = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'rb') as fd:
+                    fields = fd.read().rsplit(b')', 1)[1].split()
+            except OSError:
+                continue
+            parents[int(entry)] = int(fields[1])
+            rss_pages[int(entry)] = int(fields[21])
+    except OSError:
+        return None
+    if pid not in parents:
+        return None
+
+    tree = {pid}
+    added = True
+    while added:
+        added = False
+        for child, parent in parents.items():
+            if parent in tree and child not in tree:
+                tree.add(child)
+                added = True
+    return sum(rss_pages[p] for p in tree) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def browser_rss_mib(browser):
+    service = getattr(browser, 'service', None)
+    process = getattr(service, 'process', None)
+    return process_tree_rss_mib(process.pid) if process is not None else None
+
+
+def is_alive(browser):
+    try:
+        browser.current_url
+        return True
+    except Exception:
+        return False
+
+
+class BrowserPool:
+    def __init__(self, num_browsers, create_browser, max_pages=maxPages, max_rss_mib=maxRssMiB, metrics=None):
+        self.num_browsers = num_browsers
+        self.create_browser = create_browser
+        self.max_pages = max_pages
+        self.max_rss_mib = max_rss_mib
+        self.metrics = metrics
+        self.executors = []
+        self.browsers = []
+        self.pages = []  # 브라우저별 (교체 후) 연 페이지 수
+        self.idle = None
+        self.page_seconds = Histogram(TIME_BUCKETS)
+        self.recycles = Counter()
+
+    def _launch(self):
+        browser = self.create_browser()
+        wait_until_ready(browser)
+        return browser
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        self.executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"browser-{i}") for i in range(self.num_browsers)]
+        # 각 브라우저는 자신의 스레드에서 생성 (동시에 실행), 준비되면 바로 작업을 받음
+        launched = await asyncio.gather(*[loop.run_in_executor(executor, self._launch) for executor in self.executors], return_exceptions=True)
+        errors = [result for result in launched if isinstance(result, BaseException)]
+        if errors:
+            # 일부만 떴으면 뜬 브라우저를 닫고 스레드도 정리한 뒤 첫 실패를 알림 (Chrome 프로세스가 남지 않도록)
+            await asyncio.gather(*[loop.run_in_executor(executor, browser.quit) for executor, browser in zip(self.executors, launched)
+                                   if not isinstance(browser, BaseException)], return_exceptions=True)
+            for executor in self.executors:
+                executor.shutdown(wait=True)
+            self.executors = []
+            print(f"[ERROR] {len(errors)} of {self.num_browsers} browsers failed to start: {errors[0]!r}")
+            raise errors[0]
+        self.browsers = launched
+        print(f"[INFO] {self.num_browsers} browsers ready in {time.monotonic() - start:.1f}s")
+        self.pages = [0] * self.num_browsers
+        self.idle = asyncio.Queue()
+        for slot in range(self.num_browsers):
+            self.idle.put_nowait(slot)
+
+    def _run_page(self, slot, func, args):
+        # 브라우저 스레드에서 실행: 페이지 작업 후 교체가 필요하면 같은 스레드에서 새 브라우저를 만듦
+        browser = self.browsers[slot]
+        try:
+            return func(browser, *args)
+        except Exception:
+            # Chrome 이 죽었으면 (세션 끊김 등) 다음 작업 전에 교체
+            if not is_alive(browser):
+                self._recycle(slot, 'crashed')
+            raise
+        finally:
+            if self.browsers[slot] is browser:
+                self.pages[slot] += 1
+                reason = None
+                if self.pages[slot] >= self.max_pages:
+                    reason = 'pages'
+                elif self.max_rss_mib and self.pages[slot] % rssCheckEvery == 0:
+                    rss = browser_rss_mib(browser)
+                    if rss is not None and rss > self.max_rss_mib:
+                        reason = 'rss'
+                if reason is not None:
+                    self._recycle(slot, reason)
+
+    def _recycle(self, slot, reason):
+        print(f"[INFO] Recycling browser {slot} after {self.pages[slot]} pages ({reason})")
+        try:
+            self.browsers[slot].quit()
+        except Exception:
+            pass
+        self.browsers[slot] = self._launch()
+        self.pages[slot] = 0
+        self.recycles[reason] += 1
+        if self.metrics is not None:
+            self.metrics.inc('browser_recycles', reason=reason)
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        slot = await self.idle.get()
+        start = loop.time()
+        try:
+            return await loop.run_in_executor(self.executors[slot], self._run_page, slot, func, args)
+        finally:
+            elapsed = loop.time() - start
+            self.page_seconds.observe(elapsed)
+            if self.metrics is not None:
+                self.metrics.observe('browser_page_seconds', elapsed)
+            self.idle.put_nowait(slot)
+
+    def stats(self):
+        return {'pages': self.page_seconds.count, 'recycles': dict(self.recycles), 'page_seconds': self.page_seconds.summary()}
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(executor, browser.quit) for executor, browser in zip(self.executors, self.browsers)], return_exceptions=True)
+        for executor in self.executors:
+            executor.shutdown(wait=True)
+        print(f"[INFO] Browser pool: {self.stats()}")
+
+
+def create_chrome(user_agent=None, block_resources=True, page_load_timeout=30):
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = 'eager'  # DOMContentLoaded 까지만 기다림 (이미지 / 광고 스크립트 로딩을 기다리지 않음)
+    options.add_argument("--headless")  # 헤드리스 모드 활성화
+    options.add_argument("--no-sandbox")  # 샌드박스 사용 안 함
+    options.add_argument("--disable-dev-shm-usage")  # /dev/shm 파티션 사용 안 함
+    options.add_argument("--disable-extensions")
+    options.add_argument("--mute-audio")
+    if block_resources:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    if user_agent:
+        options.add_argument(f"user-agent={user_agent}")
+
+    driver_path = resolve_chromedriver()
+    try:
+        browser = webdriver.Chrome(service=Service(driver_path), options=options)
+    except SessionNotCreatedException:
+        # 저장된 driver 가 설치된 Chrome 버전과 맞지 않음 -> 다시 받아서 한 번 더 시도
+        browser = webdriver.Chrome(service=Service(resolve_chromedriver(stale_path=driver_path)), options=options)
+    browser.set_page_load_timeout(page_load_timeout)
+    if block_resources:
+        # 요청 단계에서 차단 (이미지 설정으로 막히지 않는 CSS 배경 / 폰트 / 미디어 / 서드파티 스크립트)
+        browser.execute_cdp_cmd('Network.enable', {})
+        browser.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+    return browser
+
+
+def load_page(browser, url, timeout=10):
+    # 브라우저 전용 스레드에서 실행되는 blocking 함수
+    # JSON-LD 가 생기거나 레시피 없음 alert 가 뜰 때까지 기다림 (둘 다 없으면 selenium TimeoutException)
+    from selenium.webdriver.common.alert import Alert
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    browser.get(url)
+    found = WebDriverWait(browser, timeout).until(EC.any_of(
+        EC.alert_is_present(),
+        EC.presence_of_element_located((By.CSS_SELECTOR, "script[type='application/ld+json']")),
+    ))
+    if isinstance(found, Alert):
+        found.accept()
+        return NOT_FOUND_PAGE
+    return browser.page_source
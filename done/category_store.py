@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# 레시피 ID -> (cat4, cat2) 조합 소속을 비트셋으로 저장하는 저장소.
+# 조합마다 비트 하나를 배정하고 (221 개 -> uint64 4 개), 레시피 한 개는 비트 행렬의 한 행이다.
+# 추가 / 확인은 O(1) 비트 연산이고, "조합 X 에 속한 레시피" 는 비트 열 하나를 numpy 로 한 번에 걸러낸다.
+# 레시피 한 개당 (조합 수 / 8) 바이트 + ID 4 바이트만 쓰므로 같은 레시피가 여러 조합에서 나와도 메모리는 늘지 않는다.
+
+WORD_BITS = 64
+
+
+class CategoryStore:
+    def __init__(self, combinations, initial_capacity=1024):
+        self.combinations = list(combinations)
+        self.combination_index = {combination: i for i, combination in enumerate(self.combinations)}
+        self.words = (len(self.combinations) + WORD_BITS - 1) // WORD_BITS
+        self.bits = np.zeros((initial_capacity, self.words), dtype=np.uint64)
+        self.recipe_ids = np.zeros(initial_capacity, dtype=np.uint32)
+        self.rows = {}  # recipe_id -> 행 번호
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self.rows
+
+    def _bit(self, combination):
+        i = self.combination_index[combination]
+        return i // WORD_BITS, np.uint64(1 << (i % WORD_BITS))
+
+    def _row(self, recipe_id):
+        row = self.rows.get(recipe_id)
+        if row is None:
+            row = len(self.rows)
+            if row == len(self.recipe_ids):
+                # 용량이 차면 두 배로 늘림
+                self.bits = np.concatenate([self.bits, np.zeros_like(self.bits)])
+                self.recipe_ids = np.concatenate([self.recipe_ids, np.zeros_like(self.recipe_ids)])
+            self.recipe_ids[row] = recipe_id
+            self.rows[recipe_id] = row
+        return row
+
+    def add(self, recipe_id, combination):
+        # 새로 추가된 소속이면 True (이미 있던 소속이면 False)
+        word, mask = self._bit(combination)
+        row = self._row(recipe_id)
+        if self.bits[row, word] & mask:
+            return False
+        self.bits[row, word] |= mask
+        return True
+
+    def has(self, recipe_id, combination):
+        row = self.rows.get(recipe_id)
+        if row is None:
+            return False
+        word, mask = self._bit(combination)
+        return bool(self.bits[row, word] & mask)
+
+    def membership(self):
+        # (레시피 수, 조합 수) bool 행렬, 열 순서는 self.combinations
+        n = len(self.rows)
+        unpacked = np.unpackbits(self.bits[:n].view(np.uint8), axis=1, bitorder='little')
+        return unpacked[:, :len(self.combinations)].astype(bool)
+
+    def categories(self, recipe_id):
+        row = self.rows.get(recipe_id)
+        if row is None:
+            return []
+        flags = np.unpackbits(self.bits[row].view(np.uint8), bitorder='little')[:len(self.combinations)]
+        return [self.combinations[i] for i in np.flatnonzero(flags)]
+
+    def recipes_in(self, combination):
+        # 조합에 속한 레시피 ID (오름차순)
+        n = len(self.rows)
+        word, mask = self._bit(combination)
+        selected = (self.bits[:n, word] & mask) != 0
+        return np.sort(self.recipe_ids[:n][selected])
+
+    def counts(self):
+        # 조합별 레시피 수
+        return dict(zip(self.combinations, self.membership().sum(axis=0).tolist()))
+
+    def to_frame(self, wide=False):
+        # wide=False: (RecipeID, cat4, cat2) 행, wide=True: RecipeID + 조합별 bool 컬럼
+        n = len(self.rows)
+        matrix = self.membership()
+        if wide:
+            columns = {'RecipeID': self.recipe_ids[:n]}
+            for i, (cat4_value, cat2_value) in enumerate(self.combinations):
+                columns[f'{cat4_value}_{cat2_value}'] = matrix[:, i]
+            return pd.DataFrame(columns)
+
+        rows, combination_ids = np.nonzero(matrix)
+        combination_array = np.array(self.combinations, dtype=np.int64).reshape(-1, 2)
+        return pd.DataFrame({
+            'RecipeID': self.recipe_ids[:n][rows],
+            'cat4': combination_array[combination_ids, 0],
+            'cat2': combination_array[combination_ids, 1],
+        })
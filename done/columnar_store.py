@@ -0,0 +1,136 @@
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 는 Parquet 입출력을 쓸 때만 필요
+    pa = None
+    pq = None
+
+# 레시피 레코드를 리스트/구조체 컬럼을 가진 Parquet 로 저장하고 읽는 모듈.
+# CSV 처럼 Python repr 문자열로 저장하지 않기 때문에 읽을 때 literal_eval / json.loads 가 필요 없다.
+# 반복이 많은 문자열(@type, totalTime, recipeYield, 작성자 이름 등)은 dictionary 로 인코딩한다.
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet output (pip install pyarrow)")
+
+
+def _dict_string():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def recipe_schema():
+    require_pyarrow()
+    return pa.schema([
+        ('recipe_id', pa.int64()),
+        ('@context', _dict_string()),
+        ('@type', _dict_string()),
+        ('name', pa.string()),
+        ('image', pa.list_(pa.string())),
+        ('author', pa.struct([('@type', _dict_string()), ('name', _dict_string())])),
+        ('datePublished', pa.string()),
+        ('description', pa.string()),
+        ('totalTime', _dict_string()),
+        ('recipeYield', _dict_string()),
+        ('recipeIngredient', pa.list_(pa.string())),
+        ('recipeInstructions', pa.list_(pa.struct([('text', pa.string()), ('image', pa.string())]))),
+        ('tags', pa.list_(_dict_string())),
+        ('ingredients', pa.list_(pa.struct([('name', _dict_string()), ('amount', pa.string())]))),
+        ('aggregateRating', pa.struct([('ratingValue', pa.float64()), ('reviewCount', pa.int64())])),
+    ])
+
+
+def _string_list(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    return [str(item) for item in value]
+
+
+def _number(value, cast):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_record(record):
+    # JSON-LD 레코드를 recipe_schema() 의 타입에 맞게 정리 (스키마에 없는 필드는 버림)
+    author = record.get('author')
+    if isinstance(author, str):
+        author = {'name': author}
+    steps = record.get('recipeInstructions')
+    if isinstance(steps, list):
+        steps = [{'text': step.get('text'), 'image': step.get('image')} if isinstance(step, dict) else {'text': str(step), 'image': None}
+                 for step in steps]
+    rating = record.get('aggregateRating')
+    if isinstance(rating, dict):
+        rating = {'ratingValue': _number(rating.get('ratingValue'), float),
+                  'reviewCount': _number(rating.get('reviewCount', rating.get('ratingCount')), int)}
+    else:
+        rating = None
+
+    return {
+        'recipe_id': _number(record.get('recipe_id'), int),
+        '@context': record.get('@context'),
+        '@type': record.get('@type'),
+        'name': record.get('name'),
+        'image': _string_list(record.get('image')),
+        'author': {'@type': author.get('@type'), 'name': author.get('name')} if isinstance(author, dict) else None,
+        'datePublished': record.get('datePublished'),
+        'description': record.get('description'),
+        'totalTime': record.get('totalTime'),
+        'recipeYield': record.get('recipeYield'),
+        'recipeIngredient': _string_list(record.get('recipeIngredient')),
+        'recipeInstructions': steps if isinstance(steps, list) else None,
+        'tags': _string_list(record.get('tags')),
+        'ingredients': [{'name': item.get('name'), 'amount': item.get('amount')} for item in record['ingredients']]
+        if isinstance(record.get('ingredients'), list) else None,
+        'aggregateRating': rating,
+    }
+
+
+class ParquetRecipeWriter:
+    # 레코드를 row_group_size 개씩 모아서 row group 단위로 기록 (메모리는 row group 하나 크기로 유지)
+    def __init__(self, filename, row_group_size=5000, schema=None, normalize=normalize_record):
+        require_pyarrow()
+        self.filename = filename
+        self.row_group_size = row_group_size
+        self.schema = schema or recipe_schema()
+        self.normalize = normalize
+        self.rows = []
+        self.writer = pq.ParquetWriter(filename, self.schema, compression='zstd')
+        self.record_count = 0
+
+    def __call__(self, record):
+        self.rows.append(self.normalize(record))
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.record_count += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        print(f"Data saved to {self.filename} ({self.record_count} rows)")
+
+
+def export_parquet(records, filename, row_group_size=5000):
+    writer = ParquetRecipeWriter(filename, row_group_size)
+    try:
+        for record in records:
+            writer(record)
+    finally:
+        writer.close()
+
+
+def read_recipes(filename, columns=None, filters=None):
+    # 필요한 컬럼만 읽고 (projection), filters 는 row group 통계로 먼저 걸러냄
+    #   read_recipes('recipes.parquet', columns=['recipe_id', 'tags'], filters=[('recipe_id', '>=', 7028000)])
+    require_pyarrow()
+    return pq.read_table(filename, columns=columns, filters=filters)
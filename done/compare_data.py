@@ -1,16 +1,25 @@
-import pandas as pd
+import csv
+import os
 
-# 데이터 파일 로드 (cp949 인코딩 사용)
-recent_ingredient_df = pd.read_csv('./recent9737_division_ingredient.csv', encoding='cp949')
-recipe_cat_ids_df = pd.read_csv('./recipe_cat_ids.csv', encoding='cp949')
+from recipe_store import RecipeStore
+
+# 레시피 저장소(recipes.db)에 전처리된 재료 데이터와 카테고리를 반영하고 Recipe_data.csv 로 내보냅니다.
+# 저장소는 recipe_id 기준 upsert 이므로, 새로 받은 파일만 가져와도 기존 데이터와 합쳐집니다.
+store = RecipeStore('recipes.db')
 
-# 'recipe_id' 열 이름을 'RecipeID'로 변경
-recent_ingredient_df = recent_ingredient_df.rename(columns={'recipe_id': 'RecipeID'})
+# 데이터 파일 로드 (cp949 인코딩 사용)
+if os.path.exists('./recent9737_division_ingredient.csv'):
+    imported = store.import_preprocessed_csv('./recent9737_division_ingredient.csv', encoding='cp949')
+    print(f"[INFO] {imported} recipes upserted")
 
-# RecipeID 열을 기준으로 inner join을 수행하여 공통으로 존재하는 데이터만 남기고, recipe_cat_ids 데이터 병합
-merged_df = pd.merge(recent_ingredient_df, recipe_cat_ids_df, on='RecipeID', how='inner')
+if os.path.exists('./recipe_cat_ids.csv'):
+    with open('./recipe_cat_ids.csv', newline='', encoding='cp949') as fd:
+        reader = csv.DictReader(fd)
+        added = store.upsert_categories((row['RecipeID'], row['cat4'], row['cat2']) for row in reader)
+    print(f"[INFO] {added} category rows added")
 
-# 병합된 데이터를 CSV 파일로 저장 (utf-8-sig 인코딩 지정)
-merged_df.to_csv('Recipe_data.csv', index=False, encoding='utf-8-sig')
+# RecipeID 기준 inner join (recipe_data 뷰) 결과를 CSV 파일로 저장 (utf-8-sig 인코딩 지정)
+store.export_recipe_data('Recipe_data.csv')
+store.close()
 
-print("병합된 데이터가 'Recipe_data.csv' 파일로 저장되었습니다.")
\ No newline at end of file
+print("병합된 데이터가 'Recipe_data.csv' 파일로 저장되었습니다.")
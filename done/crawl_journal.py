@@ -0,0 +1,74 @@
+import sqlite3
+import time
+
+# 크롤링 진행 상황을 ID 별로 남기는 SQLite 저널.
+# 결과가 나올 때마다 바로 커밋하므로 중간에 프로세스가 죽어도 --resume 으로 남은 ID 만 다시 처리할 수 있다.
+
+PARSED = 'parsed'  # 레시피 저장 완료
+NOT_FOUND = 'not_found'  # 레시피 없음 (alert 페이지 / JSON-LD 없음)
+ERROR = 'error'  # 일시적인 오류 (재시도 대상)
+
+COMPLETED_STATUSES = (PARSED, NOT_FOUND)
+
+
+class CrawlJournal:
+    def __init__(self, filename, busy_timeout=30):
+        self.filename = filename
+        # 다른 프로세스가 같은 파일에 쓰는 중이면 busy_timeout 초까지 기다림 (기본 5초면 'database is locked')
+        self.conn = sqlite3.connect(filename, timeout=busy_timeout)
+        self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        # WAL + synchronous=NORMAL: 커밋마다 fsync 하지 않아도 프로세스가 죽었을 때 커밋된 내용은 남음
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS outcomes ("
+            " recipe_id INTEGER PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " detail TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 1,"
+            " updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def record(self, recipe_id, status, detail=None):
+        self.conn.execute(
+            "INSERT INTO outcomes (recipe_id, status, detail, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(recipe_id) DO UPDATE SET status=excluded.status, detail=excluded.detail,"
+            " attempts=attempts + 1, updated_at=excluded.updated_at",
+            (recipe_id, status, detail, time.time()),
+        )
+        self.conn.commit()
+
+    def record_many(self, recipe_ids, status, detail=None):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT INTO outcomes (recipe_id, status, detail, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(recipe_id) DO UPDATE SET status=excluded.status, detail=excluded.detail,"
+            " attempts=attempts + 1, updated_at=excluded.updated_at",
+            [(recipe_id, status, detail, now) for recipe_id in recipe_ids],
+        )
+        self.conn.commit()
+
+    def outcomes_between(self, low, high):
+        # low <= recipe_id <= high 범위의 {recipe_id: status}
+        rows = self.conn.execute(
+            "SELECT recipe_id, status FROM outcomes WHERE recipe_id BETWEEN ? AND ?", (low, high)
+        )
+        return dict(rows)
+
+    def completed_between(self, low, high):
+        return {recipe_id for recipe_id, status in self.outcomes_between(low, high).items() if status in COMPLETED_STATUSES}
+
+    def ids_with_status(self, status, low=None, high=None):
+        query = "SELECT recipe_id FROM outcomes WHERE status = ?"
+        params = [status]
+        if low is not None and high is not None:
+            query += " AND recipe_id BETWEEN ? AND ?"
+            params += [low, high]
+        return [row[0] for row in self.conn.execute(query + " ORDER BY recipe_id", params)]
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM outcomes GROUP BY status"))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,164 @@
+import asyncio
+import bisect
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# 크롤링 단계별 지표 (카운터 / 히스토그램 / 게이지).
+#   - 히스토그램: 대기열 대기, 속도 조절 대기, 요청 지연, 응답 크기, 추출(decode), JSON 파싱(parse), 기록(write)
+#   - 카운터: 레시피 / 레시피 없음 / 재시도 / 실패 이유별 횟수 등 (라벨은 키워드 인자로)
+#   - 게이지: 현재 요청 속도처럼 읽을 때마다 값을 계산하는 함수
+# report_every() 는 interval 초마다 JSON 한 줄을 파일에 추가하고 (tail -f 로 확인),
+# serve() 는 /metrics (Prometheus 텍스트) 와 /stats (JSON) 를 제공한다.
+
+TIME_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+BYTE_BUCKETS = [1024 * 2 ** i for i in range(13)]  # 1 KB ~ 4 MB
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # 버킷 안에서는 선형 보간한 근사값
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, low + (high - low) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6),
+            'p50': round(self.quantile(0.5), 6),
+            'p90': round(self.quantile(0.9), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'max': round(self.max, 6),
+        }
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _label_text(labels):
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}' if labels else ''
+
+
+class CrawlMetrics:
+    def __init__(self, prefix='crawl'):
+        self.prefix = prefix
+        self.counters = Counter()
+        self.histograms = {}
+        self.gauges = {}
+        self.started = time.monotonic()
+
+    def inc(self, name, value=1, **labels):
+        self.counters[_key(name, labels)] += value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    def snapshot(self):
+        elapsed = time.monotonic() - self.started
+        counters = {}
+        for (name, labels), value in sorted(self.counters.items()):
+            counters[name + _label_text(labels)] = value
+        return {
+            'time': round(time.time(), 3),
+            'elapsed': round(elapsed, 3),
+            'counters': counters,
+            'gauges': {name: fn() for name, fn in self.gauges.items()},
+            'histograms': {name: histogram.summary() for name, histogram in self.histograms.items()},
+        }
+
+    def to_prometheus(self):
+        lines = []
+        typed = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f'{self.prefix}_{name}_total'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} counter')
+                typed.add(metric)
+            lines.append(f'{metric}{_label_text(labels)} {value}')
+        for name, fn in self.gauges.items():
+            metric = f'{self.prefix}_{name}'
+            lines.append(f'# TYPE {metric} gauge')
+            lines.append(f'{metric} {fn()}')
+        for name, histogram in self.histograms.items():
+            metric = f'{self.prefix}_{name}'
+            lines.append(f'# TYPE {metric} histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum {histogram.sum}')
+            lines.append(f'{metric}_count {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, filename):
+        with open(filename, mode='a', encoding='utf-8') as fd:
+            fd.write(json.dumps(self.snapshot(), ensure_ascii=False) + '\n')
+
+    async def report_every(self, interval, filename):
+        # 크롤링 task 와 같이 실행하고, 끝나면 cancel (취소될 때 마지막 값을 한 번 더 기록)
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.write_snapshot(filename)
+        finally:
+            self.write_snapshot(filename)
+
+    async def serve(self, port, host='127.0.0.1'):
+        # aiohttp 는 크롤러가 이미 쓰고 있으므로 같은 이벤트 루프에서 HTTP 서버를 띄움 (돌려받은 runner 로 cleanup)
+        from aiohttp import web
+
+        async def metrics(request):
+            return web.Response(text=self.to_prometheus(), content_type='text/plain')
+
+        async def stats(request):
+            return web.Response(text=json.dumps(self.snapshot(), ensure_ascii=False), content_type='application/json')
+
+        app = web.Application()
+        app.router.add_get('/metrics', metrics)
+        app.router.add_get('/stats', stats)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        print(f"[INFO] Metrics on http://{host}:{port}/metrics")
+        return runner
@@ -1,122 +1,374 @@
 import asyncio
-import aiohttp
 from aiohttp import ClientSession, TCPConnector
-from bs4 import BeautifulSoup
-import json
-import pandas as pd
+import argparse
 from datetime import datetime
+from functools import partial
+import os
+import re
+import shutil
+import socket
+import time
+from crawl_journal import CrawlJournal, ERROR, NOT_FOUND, PARSED
+from crawl_metrics import CrawlMetrics
+from fetch_backends import BrowserBackend, HttpBackend, HybridFetcher
+from id_prober import GapAwareProber
+from page_cache import PageCache
+from page_fetcher import UNEXPECTED, FetchError, headers
+from parse_stage import ParseStage
+from rate_controller import RateController
+from recipe_id_index import RecipeIdIndex
+from recipe_store import RecipeStore
+from retry_queue import RetryQueue
+from record_sink import ShardedJsonlSink, export_records
+from shard_coordinator import FAILED_FILENAME, ShardCoordinator, SqliteLeaseStore
 
 baseUrl = 'http://www.10000recipe.com/recipe/'
 
-async def fetch(session, url, recipe_id):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        async with session.get(url, headers=headers) as response:
-            print(f"Fetching URL: {url}")
-            page_source = await response.read()
-            return page_source.decode('utf-8', errors='replace'), recipe_id
-    except Exception as e:
-        print(f"[ERROR] Fetching URL failed: {url}, error: {e}")
-        return None, recipe_id
-
-async def parsing_async(page_source, recipe_id):
-    parsed_li = []
-    soup = BeautifulSoup(page_source, "html.parser", from_encoding='utf-8')
-
-    # 레시피가 없는 경우 alert 메시지 처리
-    if soup.find("div", class_="alert"):
-        print(f"[INFO] Recipe ID {recipe_id} not found.")
-        return []
-
-    # JSON-LD 데이터 추출
-    try:
-        json_ld_script = soup.find("script", type="application/ld+json")
-        json_ld_data = json.loads(json_ld_script.string, strict=False)
-        json_ld_data = {'recipe_id': recipe_id, **json_ld_data}  # Add recipe ID to the beginning of data
-    except Exception as e:
-        print(f"[ERROR] JSON-LD parsing failed for Recipe ID {recipe_id}: {e}")
-        return []
-
-    # 태그 데이터 추출
-    try:
-        tags = [tag.text.strip() for tag in soup.select(".view_tag a")]
-    except Exception as e:
-        print(f"[ERROR] Tag parsing failed for Recipe ID {recipe_id}: {e}")
-        tags = []
-
-    # 태그가 없으면 빈 리스트로 설정
-    if not tags:
-        tags = []
-
-    json_ld_data['tags'] = tags
-    parsed_li.append(json_ld_data)
-
-    print(f"[INFO] Successfully parsed Recipe ID {recipe_id}")
-    return parsed_li
-
-async def CrawlingBetweenRanges(startRecipeId, numRecipes):
-    connector = TCPConnector(ssl=False)  # SSL 인증서 검증 비활성화
-    async with ClientSession(connector=connector) as session:
-        tasks = []
-        for i in range(startRecipeId, startRecipeId - numRecipes, -1):
-            url = baseUrl + str(i)
-            tasks.append(fetch(session, url, i))
-
-        print(f"[INFO] Starting to fetch {numRecipes} recipes from ID {startRecipeId}")
-        responses = await asyncio.gather(*tasks)
-        all_recipes = []
-        not_found_ids = []
-        for page_source, recipe_id in responses:
-            if page_source is None:
-                print(f"[ERROR] Failed to fetch Recipe ID {recipe_id}")
-                not_found_ids.append(recipe_id)
+maxConcurrency = 100  # 동시에 처리하는 최대 요청 수
+limitPerHost = 20  # 호스트당 최대 커넥션 수
+parseWorkers = max(1, (os.cpu_count() or 2) - 1)  # 파싱 프로세스 수 (0이면 이벤트 루프에서 바로 파싱)
+cacheMaxAge = 24 * 60 * 60  # 페이지 캐시 사용 시, 이 시간(초) 안에 받은 페이지는 다시 요청하지 않음
+initialRate = 5.0  # 처음 초당 요청 수 (응답이 정상이면 maxRate 까지 올리고, 429 나 지연 시간 증가면 줄임)
+maxRate = 200.0  # 초당 요청 수 상한
+journalFilename = "fast_version_journal.db"  # ID 별 진행 상황 저널 (--resume 에 사용)
+workerJournalFilename = "fast_version_journal.{worker}.db"  # --coordinator 워커별 저널 (같은 노드의 워커끼리 쓰기 잠금을 다투지 않도록)
+indexFilename = "recipe_id_index.npy"  # 찾은 레시피 ID 를 모아두는 인덱스
+storeFilename = "recipes.db"  # 레시피 저장소 (recipe_id 기준 upsert)
+probeReportFilename = "probe_report.csv"  # --adaptive 실행 시 블록별 hit rate
+maxAttempts = 4  # 타임아웃 / 연결 오류 / 429 / 5xx 가 난 ID 를 요청하는 최대 횟수
+metricsFilename = "fast_version_metrics.jsonl"  # 단계별 지표를 metricsInterval 초마다 한 줄씩 추가
+metricsInterval = 10
+browsers = 0  # JSON-LD 가 원본 HTML 에 없는 페이지를 다시 받을 headless Chrome 수 (0 이면 HTTP 만 사용)
+leaseSeconds = 300  # --coordinator 실행 시 shard lease 시간 (lease / 3 마다 연장, 워커가 죽으면 이 시간 뒤에 다른 워커가 가져감)
+
+async def crawling_worker(fetcher, parse_stage, journal, queue, retry, on_recipe, not_found_ids, counter, prober=None, rate=None, metrics=None):
+    while True:
+        recipe_id, enqueued = await queue.get()
+        try:
+            metrics.observe('queue_wait_seconds', time.monotonic() - enqueued)
+            url = baseUrl + str(recipe_id)
+            try:
+                page_source = await fetcher.fetch(url, recipe_id)
+            except FetchError as e:
+                # 일시적인 실패는 레시피 없음으로 남기지 않고 재시도 대기열로 (저널에는 error 로 남겨서 --resume 때도 다시 요청)
+                journal.record(recipe_id, ERROR, e.reason)
+                metrics.inc('failures', reason=e.reason)
+                if not e.retryable:
+                    retry.note(e.reason)
+                    metrics.inc('errors', reason=e.reason)
+                    print(f"[ERROR] Failed to fetch Recipe ID {recipe_id}: {e}")
+                elif retry.schedule(recipe_id, e.reason):
+                    metrics.inc('retries')
+                    print(f"[INFO] Recipe ID {recipe_id} failed ({e.reason}), will retry")
+                else:
+                    metrics.inc('errors', reason=e.reason)
+                    print(f"[ERROR] Failed to fetch Recipe ID {recipe_id} after {maxAttempts} attempts: {e}")
                 continue
-            if (startRecipeId - recipe_id + startRecipeId - 1) % 10 == 0:
-                print(f"Processing Recipe ID {recipe_id}")
-            res = await parsing_async(page_source, recipe_id)
+
+            counter['processed'] += 1
+            if counter['processed'] % 10 == 0:
+                print(f"Processing Recipe ID {recipe_id} ({rate.current_rate:.1f} req/s)" if rate is not None else f"Processing Recipe ID {recipe_id}")
+            res = await parse_stage.parse(recipe_id, page_source)
             if res:
-                all_recipes.extend(res)
+                # 파싱된 레시피는 모아두지 않고 바로 기록
+                with metrics.timer('write_seconds'):
+                    for recipe in res:
+                        on_recipe(recipe)
+                counter['recipes'] += len(res)
+                metrics.inc('recipes', len(res))
             else:
                 not_found_ids.append(recipe_id)
-        return all_recipes, not_found_ids
+                journal.record(recipe_id, NOT_FOUND)
+                retry.note(NOT_FOUND)
+                metrics.inc('not_found')
+            retry.done(recipe_id)
+            if prober is not None:
+                prober.record(recipe_id, bool(res))
+        except Exception as e:
+            # 파싱 / 저장 / 기록 중 예상하지 못한 오류: 이 ID 만 error 로 남기고 (failed_recipes.txt) 워커는 계속 실행
+            journal.record(recipe_id, ERROR, UNEXPECTED)
+            retry.note(UNEXPECTED)
+            metrics.inc('errors', reason=UNEXPECTED)
+            print(f"[ERROR] Failed to process Recipe ID {recipe_id}: {e!r}")
+        finally:
+            queue.task_done()
+
+async def retry_feeder(queue, retry):
+    # 다시 시도할 시각이 된 ID 를 새 ID 와 같은 큐에 넣음 (기다리는 동안 워커는 새 ID 를 처리)
+    while True:
+        recipe_id = await retry.get()
+        try:
+            await queue.put((recipe_id, time.monotonic()))
+        finally:
+            retry.task_done()
+
+async def CrawlingBetweenRanges(startRecipeId, numRecipes, on_recipe, journal, resume=False, cache=None, replay=False,
+                                concurrency=maxConcurrency, parseWorkers=parseWorkers, prober=None, rate=None, metrics=None, metricsPort=None, browsers=browsers):
+    # 요청 수는 concurrency 로, 호스트당 커넥션 수는 limitPerHost 로 제한
+    connector = TCPConnector(ssl=False, limit=concurrency, limit_per_host=limitPerHost)  # SSL 인증서 검증 비활성화
+    # 파싱은 parseWorkers 개의 프로세스에서 처리 (JSON-LD / 태그만 추출)
+    metrics = metrics if metrics is not None else CrawlMetrics()
+    async with ClientSession(connector=connector) as session, ParseStage(parseWorkers, with_ingredients=False, metrics=metrics) as parse_stage:
+        # 페이지는 HTTP 로 먼저 받고, browsers 가 있으면 추출기가 판단할 수 없는 페이지만 Chrome 으로 다시 받음
+        pool = None
+        fallback = None
+        if browsers:
+            from browser_pool import BrowserPool, create_chrome, load_page
+            pool = BrowserPool(browsers, partial(create_chrome, headers['User-Agent']), metrics=metrics)
+            fallback = BrowserBackend(pool, load_page, rate, metrics)
+        fetcher = HybridFetcher(HttpBackend(session, cache, replay, rate, metrics), fallback, metrics)
+        not_found_ids = []
+        counter = {'processed': 0, 'recipes': 0}
+
+        # 큐 크기를 제한해서 메모리에 올라가는 ID/페이지 수가 범위 크기와 무관하게 유지되도록 함
+        # 큐에는 (ID, 넣은 시각) 을 넣어서 워커가 꺼낼 때까지 기다린 시간을 기록
+        queue = asyncio.Queue(maxsize=concurrency)
+        retry = RetryQueue(maxAttempts)
+        workers = [
+            asyncio.create_task(crawling_worker(fetcher, parse_stage, journal, queue, retry, on_recipe, not_found_ids, counter, prober, rate, metrics))
+            for _ in range(concurrency)
+        ]
+        workers.append(asyncio.create_task(retry_feeder(queue, retry)))
+
+        # 단계별 지표: metricsInterval 초마다 JSON 한 줄, metricsPort 가 있으면 /metrics 로도 제공
+        metrics.gauge('queue_size', queue.qsize)
+        metrics.gauge('retry_pending', retry.__len__)
+        if rate is not None:
+            metrics.gauge('request_rate', lambda: rate.current_rate)
+        workers.append(asyncio.create_task(metrics.report_every(metricsInterval, metricsFilename)))
+        runner = await metrics.serve(metricsPort) if metricsPort else None
+
+        # --resume: 저널에 이미 완료(parsed / not_found)로 남은 ID 는 건너뜀
+        completed = journal.completed_between(startRecipeId - numRecipes + 1, startRecipeId) if resume else set()
+        if completed:
+            print(f"[INFO] Resuming: {len(completed)} recipes already completed")
 
-def save_to_csv(data, filename):
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"Data saved to {filename}")
+        # --replay: 캐시에 있는 ID 만 네트워크 없이 다시 파싱
+        if replay:
+            recipe_ids = cache.ids_between(startRecipeId - numRecipes + 1, startRecipeId)[::-1]
+        else:
+            recipe_ids = range(startRecipeId, startRecipeId - numRecipes, -1)
 
-def main(startRecipeId, numRecipes, filename):
+        # --adaptive: 블록별 hit rate 에 따라 나눠서 요청 (라운드마다 앞 라운드의 결과를 보고 다음 ID 를 정함)
+        rounds = prober.rounds() if prober is not None else [recipe_ids]
+        if prober is None:
+            print(f"[INFO] Starting to {'replay' if replay else 'fetch'} {len(recipe_ids) - len(completed)} recipes from ID {startRecipeId}")
+        else:
+            print(f"[INFO] Starting adaptive probing of IDs {startRecipeId - numRecipes + 1} ~ {startRecipeId}")
+        try:
+            if pool is not None:
+                # 브라우저는 워커가 ID 를 받기 전에 모두 띄움 (일부가 실패해도 아래 finally 에서 나머지를 정리)
+                await pool.start()
+            for round_ids in rounds:
+                for i in round_ids:
+                    if i in completed:
+                        continue
+                    await queue.put((i, time.monotonic()))
+                # 라운드가 끝나기 전에 재시도까지 모두 처리 (워커가 실패를 대기열에 넣은 뒤 task_done 하므로 순서대로 확인)
+                while True:
+                    await queue.join()
+                    if not retry:
+                        break
+                    await retry.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if runner is not None:
+                await runner.cleanup()
+            if pool is not None:
+                await pool.close()
+            print(f"[INFO] Fetch backends: {dict(fetcher.usage)}")
+            if rate is not None:
+                print(f"[INFO] Rate controller: {rate.stats()}")
+            print(f"[INFO] Fetch outcomes: {retry.summary()}")
+            for name, summary in metrics.snapshot()['histograms'].items():
+                if summary['count']:
+                    print(f"[INFO] {name}: p50 {summary['p50']}, p99 {summary['p99']}, total {summary['sum']:.1f} ({summary['count']})")
+            print(f"[LOGGED] metrics saved to {metricsFilename}")
+
+        return counter['recipes'], not_found_ids, retry.gave_up
+
+def main(startRecipeId, numRecipes, filename, outputDir, resume=False, journalFilename=journalFilename, cacheDir=None, replay=False, indexFilename=indexFilename, adaptive=False, storeFilename=storeFilename, maxRate=maxRate, metricsPort=None, browsers=browsers, refetchKnown=False):
     # Running Time Check
     startTime = datetime.now()
     print(f"[Start Time] {startTime}")
 
-    all_recipes, not_found_ids = asyncio.run(CrawlingBetweenRanges(startRecipeId, numRecipes))
+    journal = CrawlJournal(journalFilename)
+    cache = PageCache(cacheDir, max_age=cacheMaxAge) if cacheDir else None
+    # 레코드는 압축 JSONL shard 로 바로 기록하고, shard 가 커밋되면 저널에 완료 표시
+    store = RecipeStore(storeFilename)
+
+    def on_shard_commit(recipe_ids):
+        # shard 가 커밋되면 같은 레코드를 저장소에도 반영하고 저널에 완료 표시
+        store.commit()
+        journal.record_many(recipe_ids, PARSED)
+
+    def on_recipe(recipe):
+        store(recipe)
+        sink(recipe)
+
+    sink = ShardedJsonlSink(outputDir, on_commit=on_shard_commit, append=resume)
+    # 서버 응답(상태 코드 / 지연 시간)에 따라 요청 속도를 조절 (replay 는 네트워크를 쓰지 않으므로 제한 없음)
+    rate = None if replay else RateController(initialRate, max_rate=maxRate)
+    prober = None
+    if adaptive:
+        # 인덱스 / 저널 / not_found_recipes.txt 로 블록별 hit rate 추정
+        # 인덱스에 이미 있는 레시피는 --refetch-known 일 때만 다시 받음
+        prober = GapAwareProber(startRecipeId - numRecipes + 1, startRecipeId, refetch_known=refetchKnown)
+        prober.load_evidence(RecipeIdIndex(indexFilename), journal, 'not_found_recipes.txt')
+    try:
+        recipe_count, not_found_ids, failed_ids = asyncio.run(CrawlingBetweenRanges(startRecipeId, numRecipes, on_recipe, journal, resume, cache, replay,
+                                                                         prober=prober, rate=rate, metricsPort=metricsPort, browsers=browsers))
+    finally:
+        sink.close()
+        store.close()
+        if cache is not None:
+            cache.close()
 
     # Running Time Check
     endTime = datetime.now()
     print(f"[End Time] {endTime}")
-    print(f"[Running Time] : {endTime - startTime} (ms)")
+    print(f"[Running Time] : {endTime - startTime} ({(endTime - startTime).total_seconds():.1f}s)")
+    print(f"[INFO] {recipe_count} recipes saved, {len(not_found_ids)} not found, {len(failed_ids)} failed")
+    if prober is not None:
+        prober.write_report(probeReportFilename)
 
-    save_to_csv(all_recipes, filename)
+    # 전체 shard 를 CSV (합집합 컬럼) 또는 Parquet (리스트/구조체 컬럼) 로 변환
+    export_records(outputDir, filename)
 
-    # 레시피가 없는 ID 로그 출력
+    # 레시피가 없는 ID / 재시도 후에도 받지 못한 ID 로그 출력 (이전 실행 결과까지 저널에서 모아서 기록)
+    # 실패한 ID 는 레시피가 없다는 뜻이 아니므로 not_found_recipes.txt 에 넣지 않음 (--adaptive 가 없는 ID 로 취급하지 않도록)
+    low, high = startRecipeId - numRecipes + 1, startRecipeId
+    added = RecipeIdIndex(indexFilename).merge(journal.ids_with_status(PARSED, low, high))
+    print(f"[INFO] {added} new recipe IDs merged into {indexFilename}")
+    not_found_ids = sorted(journal.ids_with_status(NOT_FOUND, low, high), reverse=True)
+    failed_ids = sorted(journal.ids_with_status(ERROR, low, high), reverse=True)
+    journal.close()
     with open('not_found_recipes.txt', mode='w', newline='', encoding='utf-8') as log_fd:
         for not_found_id in not_found_ids:
             log_fd.write(f"{not_found_id}\n")
+    with open('failed_recipes.txt', mode='w', newline='', encoding='utf-8') as log_fd:
+        for failed_id in failed_ids:
+            log_fd.write(f"{failed_id}\n")
 
     # log 출력
     with open("10000recipe_log.txt", "a", newline='', encoding='utf-8') as log_fd:
         log_fd.write(f"[Start Time] {startTime}\n")
         log_fd.write(f"[End Time] {endTime}\n")
-        log_fd.write(f"[Running Time] : {endTime - startTime} (ms)\n")
+        log_fd.write(f"[Running Time] : {endTime - startTime} ({(endTime - startTime).total_seconds():.1f}s)\n")
 
     print("[LOGGED] time log.txt generated")
 
+async def CrawlingLeasedShard(coordinator, lease, on_recipe, journal, rate=None, metrics=None, metricsPort=None, browsers=browsers):
+    # shard 를 크롤링하는 동안 lease 를 연장하고, 연장에 실패하면 (만료되어 다른 워커가 가져감) 크롤링을 멈추고 None
+    crawl = asyncio.create_task(CrawlingBetweenRanges(lease.high, lease.high - lease.low + 1, on_recipe, journal, rate=rate, metrics=metrics,
+                                                      metricsPort=metricsPort, browsers=browsers))
+    try:
+        while True:
+            done, _ = await asyncio.wait({crawl}, timeout=coordinator.lease_seconds / 3)
+            if done:
+                return crawl.result()
+            if not coordinator.renew(lease):
+                print(f"[ERROR] Lost the lease on shard {lease.shard_id}, stopping")
+                return None
+    finally:
+        if not crawl.done():
+            crawl.cancel()
+            await asyncio.gather(crawl, return_exceptions=True)
+
+def run_shard_worker(coordinatorFilename, workerId, outputDir, journalFilename=None, maxRate=maxRate, metricsPort=None,
+                     leaseSeconds=leaseSeconds, browsers=browsers):
+    # 코디네이터에서 shard 를 하나씩 받아서 크롤링 (노드 / 프로세스마다 실행, shard_coordinator.py plan 으로 먼저 범위를 나눔)
+    # shard 출력은 outputDir/shard-{번호}-{token} 에 따로 기록하고, 합치기는 shard_coordinator.py merge 로
+    startTime = datetime.now()
+    print(f"[Start Time] {startTime}")
+    coordinator = ShardCoordinator(SqliteLeaseStore(coordinatorFilename), leaseSeconds)
+    if journalFilename is None:
+        journalFilename = workerJournalFilename.format(worker=re.sub(r'[^\w.-]', '_', workerId))
+    journal = CrawlJournal(journalFilename)
+    print(f"[INFO] Journal: {journalFilename}")
+    # 속도 조절기 / 지표는 shard 가 바뀌어도 이어서 사용
+    rate = RateController(initialRate, max_rate=maxRate)
+    metrics = CrawlMetrics()
+    shard_count = 0
+    try:
+        while True:
+            lease = coordinator.claim(workerId)
+            if lease is None:
+                break
+            print(f"[INFO] {workerId} leased shard {lease.shard_id} ({lease.low} ~ {lease.high}, token {lease.token})")
+            # token 마다 다른 디렉터리이므로 lease 를 잃은 워커가 새 워커의 출력을 건드리지 않음
+            shard_dir = os.path.join(outputDir, f'shard-{lease.shard_id:05d}-{lease.token}')
+            sink = ShardedJsonlSink(shard_dir, on_commit=lambda recipe_ids: journal.record_many(recipe_ids, PARSED))
+            try:
+                result = asyncio.run(CrawlingLeasedShard(coordinator, lease, sink, journal, rate, metrics, metricsPort, browsers))
+            except BaseException:
+                # 중단되면 shard 를 바로 돌려놓음 (lease 만료를 기다리지 않고 다른 워커가 가져가도록)
+                sink.close()
+                coordinator.release(lease)
+                raise
+            sink.close()
+            if result is not None:
+                recipe_count, not_found_ids, failed_ids = result
+                with open(os.path.join(shard_dir, FAILED_FILENAME), mode='w', newline='', encoding='utf-8') as log_fd:
+                    for failed_id in sorted(failed_ids, reverse=True):
+                        log_fd.write(f"{failed_id}\n")
+                if coordinator.complete(lease, shard_dir):
+                    shard_count += 1
+                    print(f"[INFO] Shard {lease.shard_id} done: {recipe_count} recipes, {len(not_found_ids)} not found, {len(failed_ids)} failed")
+                    continue
+                print(f"[ERROR] Shard {lease.shard_id} was leased to another worker before completing")
+            shutil.rmtree(shard_dir, ignore_errors=True)
+    finally:
+        journal.close()
+        endTime = datetime.now()
+        print(f"[End Time] {endTime}")
+        print(f"[Running Time] : {endTime - startTime} ({(endTime - startTime).total_seconds():.1f}s)")
+        print(f"[INFO] {workerId} completed {shard_count} shards, coordinator progress {coordinator.progress()}")
+        coordinator.store.close()
+
 # 크롤링 범위와 저장할 파일명을 설정합니다.
 startRecipeId = 7028266
 numRecipes = 10000
 filename = "recipes.csv"
+outputDir = "recipes_shards"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true', help="skip IDs already completed in the journal and keep the existing shards")
+    parser.add_argument('--journal', help=f"progress journal (SQLite, default {journalFilename}; {workerJournalFilename} with --coordinator)")
+    parser.add_argument('--cache', help="raw page cache directory (stores every response, revalidates stale pages)")
+    parser.add_argument('--replay', action='store_true', help="parse pages from --cache only, without any network access")
+    parser.add_argument('--index', default=indexFilename, help="recipe ID index that newly found recipe IDs are merged into")
+    parser.add_argument('--adaptive', action='store_true', help="probe IDs by estimated hit rate per block instead of every ID in the range")
+    parser.add_argument('--refetch-known', action='store_true', help="with --adaptive, also request IDs already in the index / journal")
+    parser.add_argument('--store', default=storeFilename, help="recipe store (SQLite) that parsed recipes are upserted into")
+    parser.add_argument('--max-rate', type=float, default=maxRate, help="upper bound for the adaptive request rate (requests per second)")
+    parser.add_argument('--base-url', default=baseUrl, help="recipe page URL prefix (e.g. a local stand-in server)")
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this port while crawling")
+    parser.add_argument('--browsers', type=int, default=browsers, help="headless Chrome instances for pages whose JSON-LD is not in the raw HTML")
+    parser.add_argument('--coordinator', help="shared shard coordinator (SQLite) to take ID ranges from instead of the fixed range")
+    parser.add_argument('--worker-id', default=f'{socket.gethostname()}-{os.getpid()}', help="worker name recorded on leased shards")
+    parser.add_argument('--lease', type=float, default=leaseSeconds, help="shard lease duration in seconds")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="output file format (parquet keeps list/struct columns typed)")
+    args = parser.parse_args()
+    if args.format == 'parquet':
+        filename = os.path.splitext(filename)[0] + '.parquet'
+    baseUrl = args.base_url
+    if args.replay and not args.cache:
+        parser.error("--replay requires --cache")
+    if args.refetch_known and not args.adaptive:
+        parser.error("--refetch-known requires --adaptive")
+    if args.replay and args.adaptive:
+        parser.error("--adaptive cannot be used with --replay")
+    if args.replay and args.browsers:
+        parser.error("--browsers cannot be used with --replay")
+    if args.coordinator and (args.replay or args.adaptive or args.resume):
+        parser.error("--coordinator cannot be used with --replay, --adaptive or --resume")
 
-main(startRecipeId, numRecipes, filename)
+    if args.coordinator:
+        run_shard_worker(args.coordinator, args.worker_id, outputDir, args.journal, args.max_rate, args.metrics_port, args.lease, args.browsers)
+    else:
+        main(startRecipeId, numRecipes, filename, outputDir, args.resume, args.journal or journalFilename, args.cache, args.replay, args.index, args.adaptive, args.store, args.max_rate, args.metrics_port,
+             args.browsers, args.refetch_known)
@@ -0,0 +1,94 @@
+import time
+from collections import Counter
+
+from page_fetcher import CONNECTION, HTTP_ERROR, TIMEOUT, FetchError, fetch
+from recipe_extractor import has_recipe_markup
+
+# 페이지를 받는 방법(backend)을 바꿔 끼울 수 있는 fetch 단계.
+#   - HttpBackend: aiohttp 세션으로 원본 HTML 요청 (캐시 / replay / 속도 조절 포함, page_fetcher.fetch)
+#   - BrowserBackend: BrowserPool 의 headless Chrome 으로 페이지를 그려서 받음
+#   - HybridFetcher: 먼저 HTTP 로 받고, 추출기가 판단할 수 없는 페이지(JSON-LD 도 레시피 없음 표시도 없음)나
+#     403 같은 4xx 로 막힌 요청만 브라우저로 다시 받음. 대부분의 페이지는 HTTP 요청 한 번으로 끝난다.
+# backend 별로 페이지를 돌려준 횟수는 usage 와 metrics 의 backend_pages{backend=...} 에 기록한다.
+
+
+class HttpBackend:
+    name = 'http'
+
+    def __init__(self, session, cache=None, replay=False, rate=None, metrics=None):
+        self.session = session
+        self.cache = cache
+        self.replay = replay
+        self.rate = rate
+        self.metrics = metrics
+
+    async def fetch(self, url, recipe_id):
+        page_source, _ = await fetch(self.session, url, recipe_id, self.cache, self.replay, self.rate, self.metrics)
+        return page_source
+
+
+class BrowserBackend:
+    name = 'browser'
+
+    def __init__(self, pool, load_page, rate=None, metrics=None):
+        self.pool = pool
+        self.load_page = load_page  # load_page(browser, url) -> page_source (브라우저 스레드에서 실행)
+        self.rate = rate
+        self.metrics = metrics
+
+    async def fetch(self, url, recipe_id):
+        # HTTP 와 같은 사이트에 요청하므로 같은 속도 조절기에서 차례를 받음
+        start = time.monotonic()
+        if self.rate is not None:
+            await self.rate.acquire()
+            if self.metrics is not None:
+                self.metrics.observe('rate_limit_sleep_seconds', time.monotonic() - start)
+        start = time.monotonic()
+        try:
+            page_source = await self.pool.run(self.load_page, url)
+        except Exception as e:
+            # 페이지 로드 / 대기 타임아웃은 재시도 대기열로 (selenium 예외는 이름으로 구분)
+            if self.rate is not None:
+                self.rate.report(error=True)
+            print(f"[ERROR] Browser failed to load URL: {url}, error: {e!r}")
+            raise FetchError(TIMEOUT if 'Timeout' in type(e).__name__ else CONNECTION, repr(e)) from e
+        if self.rate is not None:
+            self.rate.report(latency=time.monotonic() - start)
+        if self.metrics is not None:
+            self.metrics.observe('browser_fetch_seconds', time.monotonic() - start)
+        print(f"Rendered URL: {url}")
+        return page_source
+
+
+class HybridFetcher:
+    def __init__(self, primary, fallback=None, metrics=None):
+        self.primary = primary
+        self.fallback = fallback
+        self.metrics = metrics
+        self.usage = Counter()
+
+    def _used(self, backend):
+        self.usage[backend.name] += 1
+        if self.metrics is not None:
+            self.metrics.inc('backend_pages', backend=backend.name)
+
+    async def fetch(self, url, recipe_id):
+        try:
+            page_source = await self.primary.fetch(url, recipe_id)
+        except FetchError as e:
+            # 타임아웃 / 429 / 5xx 는 브라우저로 받아도 같으므로 재시도 대기열로
+            if self.fallback is None or e.reason != HTTP_ERROR:
+                raise
+            reason = e.reason
+        else:
+            if self.fallback is None or has_recipe_markup(page_source):
+                self._used(self.primary)
+                return page_source
+            reason = 'missing_markup'
+
+        print(f"[INFO] Recipe ID {recipe_id} needs the browser ({reason})")
+        if self.metrics is not None:
+            self.metrics.inc('browser_fallbacks', reason=reason)
+        page_source = await self.fallback.fetch(url, recipe_id)
+        self._used(self.fallback)
+        return page_source
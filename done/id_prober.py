@@ -0,0 +1,171 @@
+import csv
+import os
+
+from crawl_journal import NOT_FOUND, PARSED
+
+# 레시피 ID 는 범위 전체에 고르게 있지 않고 몰려 있으므로, 범위를 블록(block_size 개 ID)으로 나눠서
+# 블록마다 레시피가 있을 확률(hit rate)을 추정하고 요청을 그에 맞게 배분한다.
+#   - 추정 근거: 레시피 ID 인덱스(있는 ID), 저널(parsed / not_found), not_found_recipes.txt (없는 ID)
+#   - 1차: hit rate 추정이 dense_hit_rate 보다 낮은 블록에서 sample_rate 만큼만 표본으로 요청 (1차는 작게 유지해서 2차를 빨리 시작)
+#   - 2차: hit rate 가 높은 블록의 모든 ID 와, 1차 표본에서 hit rate 가 min_hit_rate 이상 나온 블록의 나머지 ID 를 요청
+# 이미 없는 것으로 확인된 ID 와, 이미 있는 것으로 알려진 ID (refetch_known=False) 는 요청하지 않는다.
+# 결과는 record() 로 전달받아 블록별 hit rate 로 보고한다.
+#
+# 손익분기: 모든 ID 를 요청하는 것보다 줄어드는 요청 수는
+#   알려진 ID 수 + 없는 것으로 확인된 ID 수 + 건너뛴 블록마다 (1 - sample_rate) * block_size
+# 뿐이다. 근거가 하나도 없는 범위에서 모든 블록이 표본에 레시피가 나와 승격되면 요청 수는 전체를 요청하는 것과 같다
+# (표본 ID 는 2차에서 다시 요청하지 않으므로 더 많아지지는 않음). 즉 빈 블록이 있거나 이전 실행의 근거가 있을 때만 이득이다.
+
+DENSE = 'dense'  # 처음부터 모든 ID 요청
+PROMOTED = 'promoted'  # 표본에서 레시피가 나와서 나머지도 요청
+SKIPPED = 'skipped'  # 표본만 요청하고 나머지는 건너뜀
+
+
+class BlockStats:
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.known = set()  # 레시피가 있는 것으로 알려진 ID
+        self.dead = set()  # 레시피가 없는 것으로 알려진 ID
+        self.state = None
+        self.requested = set()
+        self.sample_probes = 0
+        self.sample_hits = 0
+        self.probes = 0
+        self.hits = 0
+
+    def estimate(self):
+        # 없는 ID 기록이 있으면 관측된 비율, 없으면 인덱스 밀도(블록 크기 대비 알려진 ID 수)
+        if self.dead:
+            return len(self.known) / (len(self.known) + len(self.dead))
+        return len(self.known) / (self.end - self.start + 1)
+
+    def unknown_ids(self):
+        # 큰 ID 부터, 있는지 없는지 모르는 ID
+        for recipe_id in range(self.end, self.start - 1, -1):
+            if recipe_id not in self.known and recipe_id not in self.dead:
+                yield recipe_id
+
+
+class GapAwareProber:
+    def __init__(self, low, high, block_size=1000, dense_hit_rate=0.2, sample_rate=0.1, min_hit_rate=0.02, refetch_known=False):
+        self.low = low
+        self.high = high
+        self.block_size = block_size
+        self.dense_hit_rate = dense_hit_rate
+        self.sample_stride = max(1, round(1 / sample_rate))
+        self.min_hit_rate = min_hit_rate
+        self.refetch_known = refetch_known  # 인덱스 / 저널에 있는 레시피도 다시 받을지 (내용 갱신용)
+        first_block = low // block_size
+        self.blocks = [BlockStats(max(low, b * block_size), min(high, (b + 1) * block_size - 1))
+                       for b in range(high // block_size, first_block - 1, -1)]
+
+    def _block(self, recipe_id):
+        return self.blocks[self.high // self.block_size - recipe_id // self.block_size]
+
+    def _in_range(self, recipe_id):
+        return self.low <= recipe_id <= self.high
+
+    def load_evidence(self, index=None, journal=None, not_found_filename=None):
+        if index is not None:
+            for recipe_id in index.between(self.low, self.high):
+                self._block(int(recipe_id)).known.add(int(recipe_id))
+        if journal is not None:
+            for recipe_id, status in journal.outcomes_between(self.low, self.high).items():
+                if status == PARSED:
+                    self._block(recipe_id).known.add(recipe_id)
+                elif status == NOT_FOUND:
+                    self._block(recipe_id).dead.add(recipe_id)
+        if not_found_filename and os.path.exists(not_found_filename):
+            with open(not_found_filename, 'r') as fd:
+                for line in fd:
+                    line = line.strip()
+                    if line.isdigit() and self._in_range(int(line)):
+                        recipe_id = int(line)
+                        block = self._block(recipe_id)
+                        if recipe_id not in block.known:
+                            block.dead.add(recipe_id)
+
+    def rounds(self):
+        # 라운드 사이에는 호출한 쪽에서 앞 라운드의 결과(record)가 모두 들어올 때까지 기다려야 함
+        yield self._first_round()
+        yield self._second_round()
+
+    def _request(self, block, recipe_id):
+        block.requested.add(recipe_id)
+        return recipe_id
+
+    def _first_round(self):
+        for block in self.blocks:
+            if block.estimate() >= self.dense_hit_rate:
+                block.state = DENSE  # 2차에서 모두 요청
+            else:
+                # 표본은 sample_stride 간격으로 뽑고, 간격에 걸리는 ID 가 없는 작은 블록은 첫 ID 하나만 요청
+                first_unknown = None
+                for recipe_id in block.unknown_ids():
+                    if first_unknown is None:
+                        first_unknown = recipe_id
+                    if recipe_id % self.sample_stride == 0:
+                        block.sample_probes += 1
+                        yield self._request(block, recipe_id)
+                if block.sample_probes == 0 and first_unknown is not None:
+                    block.sample_probes += 1
+                    yield self._request(block, first_unknown)
+
+    def _second_round(self):
+        for block in self.blocks:
+            if self.refetch_known:
+                for recipe_id in sorted(block.known, reverse=True):
+                    yield self._request(block, recipe_id)
+            if block.state != DENSE:
+                sample_rate = block.sample_hits / block.sample_probes if block.sample_probes else 0.0
+                if sample_rate < self.min_hit_rate:
+                    block.state = SKIPPED
+                    continue
+                block.state = PROMOTED
+            for recipe_id in block.unknown_ids():
+                if recipe_id not in block.requested:
+                    yield self._request(block, recipe_id)
+
+    def record(self, recipe_id, found):
+        if not self._in_range(recipe_id):
+            return
+        block = self._block(recipe_id)
+        block.probes += 1
+        block.hits += bool(found)
+        # 표본 결과 (알려진 ID 가 아니고, 아직 모든 ID 를 요청하기로 정해지지 않은 블록)
+        if block.state is None and recipe_id not in block.known:
+            block.sample_hits += bool(found)
+
+    def report(self):
+        rows = []
+        for block in self.blocks:
+            rows.append({
+                'block_start': block.start,
+                'block_end': block.end,
+                'known_before': len(block.known),
+                'estimated_hit_rate': round(block.estimate(), 4),
+                'state': block.state,
+                'probes': block.probes,
+                'hits': block.hits,
+                'hit_rate': round(block.hits / block.probes, 4) if block.probes else None,
+            })
+        return rows
+
+    def write_report(self, filename):
+        rows = self.report()
+        with open(filename, mode='w', newline='', encoding='utf-8') as fd:
+            writer = csv.DictWriter(fd, fieldnames=list(rows[0].keys()) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+
+        probes = sum(row['probes'] for row in rows)
+        hits = sum(row['hits'] for row in rows)
+        skipped = sum(1 for row in rows if row['state'] == SKIPPED)
+        total = self.high - self.low + 1
+        print(f"[INFO] Probed {probes} of {total} IDs, {hits} recipes found "
+              f"({hits / probes if probes else 0:.1%} hit rate), {skipped} of {len(rows)} blocks skipped after sampling")
+        print(f"[INFO] {total - probes} requests saved compared with requesting every ID ({(total - probes) / total:.1%})")
+        if skipped == 0 and not any(row['known_before'] for row in rows):
+            print("[INFO] No evidence and no sparse blocks: adaptive probing cost the same as a dense crawl (see id_prober.py)")
+        print(f"[LOGGED] per-block hit rates saved to {filename}")
@@ -0,0 +1,304 @@
+import asyncio
+import aiohttp
+from aiohttp import ClientSession, TCPConnector
+import argparse
+import csv
+from collections import Counter
+from datetime import datetime
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from bs4 import BeautifulSoup
+from page_fetcher import HTTP_ERROR, UNEXPECTED, FetchError, classify_exception, classify_status, headers
+from rate_controller import RateController, parse_retry_after
+from retry_queue import RetryQueue
+
+# 재료 정보(재료 마스터) 수집기. 브라우저 콘솔에 붙여넣던 ingredients.js 를 대신한다.
+# /bbs/ajax.html?q_mode=getMaterialContents&seq= 를 seq 범위만큼 요청해서 HTML 조각을 ingredients.js 와 같은 14개 필드로 파싱하고,
+# 결과는 seq 별로 SQLite(materials.db)에 나오는 대로 기록한 뒤 마지막에 CSV 로 내보낸다.
+#   - 중간에 멈춰도 다시 실행하면 받지 못한 seq 만 요청 (재시도 후에도 실패한 seq 도 다음 실행에서 다시 요청)
+#   - --refresh: 전체를 다시 받아서 필드 내용의 hash 가 바뀐 seq 만 갱신 (실패하면 이전 내용 유지)
+#   - 요청 속도는 RateController (429 나 지연 시간 증가면 줄이고 정상이면 올림), 일시적인 실패는 RetryQueue 로 재시도
+#   python ingredient_harvester.py
+#   python ingredient_harvester.py --refresh
+#   python ingredient_harvester.py --base-url http://127.0.0.1:8765/bbs/ajax.html   (standin_server.py)
+
+baseUrl = 'https://www.10000recipe.com/bbs/ajax.html'
+recipeSeq = 6856668  # ajax 를 부르는 레시피 페이지 (ingredients.js 와 같은 값)
+startSeq = 1
+endSeq = 3509
+maxConcurrency = 20  # 동시에 보내는 최대 요청 수
+initialRate = 5.0  # 처음 초당 요청 수
+maxRate = 30.0  # 초당 요청 수 상한
+maxAttempts = 4  # seq 하나를 요청하는 최대 횟수
+requestTimeout = 10  # 초 (ingredients.js 의 timeout 과 같음)
+commitEvery = 100  # 이 수만큼 기록할 때마다 커밋
+dbFilename = 'materials.db'
+csvFilename = 'materials_data.csv'
+
+# ingredients.js 와 같은 컬럼 (순서 포함)
+FIELDS = ['material_number', 'mname', 'image', 'title', 'season', 'storage_temp', 'calories', 'matching_food', 'non_matching_food',
+          'efficacy', 'purchase_tip', 'cleaning_tip', 'cooking_tip', 'storage_tip']
+
+# .ingredient_info tr:nth-child(n) td
+INFO_FIELDS = ['season', 'storage_temp', 'calories', 'matching_food', 'non_matching_food']
+# .ingredient_cont:nth-of-type(n) dd (첫 번째는 효능 태그)
+TIP_FIELDS = ['purchase_tip', 'cleaning_tip', 'cooking_tip', 'storage_tip']
+
+BACKGROUND_URL_RE = re.compile(r"url\(\s*['\"]?(.*?)['\"]?\s*\)")
+
+# seq 별 상태
+OK = 'ok'
+EMPTY = 'empty'  # 응답은 받았지만 재료 정보가 없음
+ERROR = 'error'  # 재시도 후에도 받지 못함 (다음 실행에서 다시 요청)
+
+requestHeaders = {**headers, 'X-Requested-With': 'XMLHttpRequest', 'Referer': f'https://www.10000recipe.com/recipe/{recipeSeq}'}
+
+
+def _text(soup, selector):
+    element = soup.select_one(selector)
+    return element.get_text().strip() if element is not None else ''
+
+
+def parse_material(seq, data):
+    material = dict.fromkeys(FIELDS, '')
+    material['material_number'] = seq
+    material['mname'] = data.get('mname') or ''
+    soup = BeautifulSoup(data.get('html') or '', 'html.parser')
+
+    picture = soup.select_one('.ingredient_top .ingredient_pic')
+    if picture is not None:
+        m = BACKGROUND_URL_RE.search(picture.get('style', ''))
+        material['image'] = m.group(1) if m else ''
+    material['title'] = _text(soup, '.ingredient_top .ingredient_tit')
+    for i, field in enumerate(INFO_FIELDS, start=1):
+        material[field] = _text(soup, f'.ingredient_info tr:nth-child({i}) td')
+    material['efficacy'] = ', '.join(tag.get_text().strip() for tag in soup.select('.ingredient_cont_tag a'))
+    for i, field in enumerate(TIP_FIELDS, start=2):
+        material[field] = _text(soup, f'.ingredient_cont:nth-of-type({i}) dd')
+    return material
+
+
+def content_hash(material):
+    return hashlib.sha1(json.dumps(material, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class MaterialStore:
+    def __init__(self, filename):
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS materials ("
+            " seq INTEGER PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " content_hash TEXT,"
+            " data TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " changed_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self.pending = 0
+
+    def completed_between(self, low, high):
+        rows = self.conn.execute("SELECT seq FROM materials WHERE seq BETWEEN ? AND ? AND status != ?", (low, high, ERROR))
+        return {seq for seq, in rows}
+
+    def _written(self):
+        self.pending += 1
+        if self.pending >= commitEvery:
+            self.commit()
+
+    def upsert(self, seq, material):
+        # 'new' / 'changed' / 'unchanged' 중 하나를 돌려줌 (내용이 같으면 fetched_at 만 갱신)
+        status = OK if material['mname'] or material['title'] else EMPTY
+        digest = content_hash(material)
+        now = time.time()
+        row = self.conn.execute("SELECT status, content_hash FROM materials WHERE seq = ?", (seq,)).fetchone()
+        if row is not None and row[0] != ERROR and row[1] == digest:
+            self.conn.execute("UPDATE materials SET fetched_at = ? WHERE seq = ?", (now, seq))
+            outcome = 'unchanged'
+        else:
+            self.conn.execute(
+                "INSERT INTO materials (seq, status, content_hash, data, fetched_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(seq) DO UPDATE SET status=excluded.status, content_hash=excluded.content_hash, data=excluded.data,"
+                " fetched_at=excluded.fetched_at, changed_at=excluded.changed_at",
+                (seq, status, digest, json.dumps(material, ensure_ascii=False), now, now),
+            )
+            outcome = 'new' if row is None or row[0] == ERROR else 'changed'
+        self._written()
+        return outcome
+
+    def record_error(self, seq, reason):
+        # 이전에 받은 내용이 있으면 그대로 두고, 없으면 빈 필드로 남김 (ingredients.js 처럼 CSV 에 빈 행)
+        material = dict.fromkeys(FIELDS, '')
+        material['material_number'] = seq
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR IGNORE INTO materials (seq, status, content_hash, data, fetched_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (seq, ERROR, reason, json.dumps(material, ensure_ascii=False), now, now),
+        )
+        self._written()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM materials GROUP BY status").fetchall())
+
+    def export_csv(self, filename, low, high):
+        # seq 순서대로 한 행씩 읽어서 씀 (문자열은 ingredients.js 처럼 따옴표로 감쌈)
+        with open(filename, mode='w', newline='', encoding='utf-8-sig') as fd:
+            writer = csv.DictWriter(fd, fieldnames=FIELDS, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writeheader()
+            for data, in self.conn.execute("SELECT data FROM materials WHERE seq BETWEEN ? AND ? ORDER BY seq", (low, high)):
+                writer.writerow(json.loads(data))
+        print(f"Data saved to {filename}")
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+async def fetch_material(session, seq, rate):
+    params = {'q_mode': 'getMaterialContents', 'seq': seq, 'recipe_seq': recipeSeq}
+    await rate.acquire()
+    start = time.monotonic()
+    try:
+        async with session.get(baseUrl, params=params, headers=requestHeaders) as response:
+            rate.report(response.status, time.monotonic() - start, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            reason = classify_status(response.status) or (HTTP_ERROR if response.status != 200 else None)
+            if reason is not None:
+                raise FetchError(reason, f"HTTP {response.status}")
+            body = await response.read()
+    except FetchError:
+        raise
+    except Exception as e:
+        rate.report(error=True)
+        raise FetchError(classify_exception(e), repr(e)) from e
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        # 점검 / 차단 페이지처럼 JSON 이 아닌 응답
+        raise FetchError(HTTP_ERROR, "response is not JSON") from e
+    if not isinstance(data, dict):
+        # null / 리스트 같은 응답은 parse_material 에서 쓸 수 없음
+        raise FetchError(HTTP_ERROR, f"response is a JSON {type(data).__name__}, not an object")
+    return data
+
+
+async def harvest_worker(session, store, queue, retry, rate, counter):
+    while True:
+        seq = await queue.get()
+        try:
+            try:
+                data = await fetch_material(session, seq, rate)
+            except FetchError as e:
+                if retry.schedule(seq, e.reason):
+                    print(f"[INFO] seq {seq} failed ({e}), will retry")
+                else:
+                    store.record_error(seq, e.reason)
+                    counter['failed'] += 1
+                    print(f"[ERROR] Failed to fetch seq {seq} after {maxAttempts} attempts: {e}")
+                continue
+            try:
+                counter[store.upsert(seq, parse_material(seq, data))] += 1
+            except Exception as e:
+                # 파싱 / 저장 중 예상하지 못한 오류: 이 seq 만 실패로 남기고 워커는 계속 실행 (워커가 죽으면 queue.put 이 멈춤)
+                retry.note(UNEXPECTED)
+                store.record_error(seq, UNEXPECTED)
+                counter['failed'] += 1
+                print(f"[ERROR] Failed to parse seq {seq}: {e!r}")
+                continue
+            retry.done(seq)
+            processed = sum(counter.values())
+            if processed % 100 == 0:
+                print(f"Processed {processed} seqs ({rate.current_rate:.1f} req/s)")
+        finally:
+            queue.task_done()
+
+
+async def retry_feeder(queue, retry):
+    # 다시 시도할 시각이 된 seq 를 새 seq 와 같은 큐에 넣음
+    while True:
+        seq = await retry.get()
+        try:
+            await queue.put(seq)
+        finally:
+            retry.task_done()
+
+
+async def harvest(seqs, store, rate, concurrency=maxConcurrency):
+    connector = TCPConnector(ssl=False, limit=concurrency)
+    counter = Counter()
+    async with ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=requestTimeout)) as session:
+        queue = asyncio.Queue(maxsize=concurrency)
+        retry = RetryQueue(maxAttempts)
+        workers = [asyncio.create_task(harvest_worker(session, store, queue, retry, rate, counter)) for _ in range(concurrency)]
+        workers.append(asyncio.create_task(retry_feeder(queue, retry)))
+        try:
+            for seq in seqs:
+                await queue.put(seq)
+            # 재시도까지 모두 처리 (워커가 실패를 대기열에 넣은 뒤 task_done 하므로 순서대로 확인)
+            while True:
+                await queue.join()
+                if not retry:
+                    break
+                await retry.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            store.commit()
+            print(f"[INFO] Rate controller: {rate.stats()}")
+            print(f"[INFO] Fetch outcomes: {retry.summary()}")
+    return counter
+
+
+def main(start, end, refresh=False, dbFilename=dbFilename, csvFilename=csvFilename, concurrency=maxConcurrency, maxRate=maxRate):
+    # Running Time Check
+    startTime = datetime.now()
+    print(f"[Start Time] {startTime}")
+
+    store = MaterialStore(dbFilename)
+    if refresh:
+        seqs = range(start, end + 1)
+    else:
+        completed = store.completed_between(start, end)
+        if completed:
+            print(f"[INFO] Resuming: {len(completed)} seqs already harvested")
+        seqs = [seq for seq in range(start, end + 1) if seq not in completed]
+    print(f"[INFO] {'Refreshing' if refresh else 'Fetching'} {len(seqs)} seqs ({start} ~ {end})")
+
+    rate = RateController(min(initialRate, maxRate), max_rate=maxRate)
+    try:
+        counter = asyncio.run(harvest(seqs, store, rate, concurrency))
+        print(f"[INFO] {counter['new']} new, {counter['changed']} changed, {counter['unchanged']} unchanged, {counter['failed']} failed")
+        print(f"[INFO] Store: {store.counts()}")
+        store.export_csv(csvFilename, start, end)
+    finally:
+        store.close()
+
+    # Running Time Check
+    endTime = datetime.now()
+    print(f"[End Time] {endTime}")
+    print(f"[Running Time] : {endTime - startTime} ({(endTime - startTime).total_seconds():.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--start', type=int, default=startSeq, help="first ingredient seq")
+    parser.add_argument('--end', type=int, default=endSeq, help="last ingredient seq")
+    parser.add_argument('--refresh', action='store_true', help="fetch every seq again and update only those whose content changed")
+    parser.add_argument('--db', default=dbFilename, help="harvest state (SQLite), used to resume and to detect changes")
+    parser.add_argument('--output', default=csvFilename, help="CSV written from the harvested seqs")
+    parser.add_argument('--concurrency', type=int, default=maxConcurrency)
+    parser.add_argument('--max-rate', type=float, default=maxRate, help="upper bound for the adaptive request rate (requests per second)")
+    parser.add_argument('--base-url', default=baseUrl, help="ajax endpoint URL (e.g. a local stand-in server)")
+    args = parser.parse_args()
+    baseUrl = args.base_url
+
+    main(args.start, args.end, args.refresh, args.db, args.output, args.concurrency, args.max_rate)
@@ -0,0 +1,165 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+# 재료 계량 문자열('1/2컵', '2T', '1꼬집', '100ml', '1~2개', '약간' ...)을 수량/단위로 정규화한다.
+# 같은 계량 문자열이 코퍼스 전체에서 반복되므로 고유한 문자열만 한 번씩 파싱하고 (pd.factorize),
+# 결과는 코드 배열로 한 번에 펼친다. 재료 이름과 단위는 category(사전 인코딩)로 돌려준다.
+
+# 재료 문자열 '만두 18개' -> ('만두', '18개')
+INGREDIENT_SPLIT_RE = re.compile(r"(.+?)\s+(\d+.*)")
+
+# 표준 단위: [별칭], 표준 단위로 바꿀 때 곱하는 값
+UNITS = {
+    'T': (['T', 'Ts', 'TS', 'Tbs', 'Tbsp', 'tbs', 'tbsp', 'tablespoon', 'tablespoons', '큰술', '큰 술', '큰스푼', '큰숟가락', '큰숟갈', '밥숟가락', '밥스푼',
+           '숟가락', '숟갈', '스푼', '수저', '술'], 1),
+    't': (['t', 'ts', 'tsp', 'teaspoon', 'teaspoons', '작은술', '작은 술', '작은스푼', '티스푼', '찻숟가락'], 1),
+    'ml': (['ml', 'mL', 'ML', 'cc', 'CC', '미리'], 1),
+    'g': (['g', 'G', 'gr', '그램', '그람'], 1),
+    '컵': (['컵', '종이컵', 'cup', 'cups'], 1),
+    '개': (['개', 'ea', 'EA'], 1),
+}
+SCALED_UNITS = {
+    'ml': (['L', 'l', '리터'], 1000),
+    'g': (['kg', 'KG', 'Kg', '킬로'], 1000),
+}
+# 별칭 없이 그대로 쓰는 단위
+PLAIN_UNITS = ['장', '줌', '대', '꼬집', '알', '공기', '인분', '마리', '줄', '봉지', '팩', '조각', '봉', '모', '바퀴', 'cm',
+               '캔', '톨', '단', '통', '뿌리', '포기', '줄기', '쪽', '토막', '가닥', '국자', '주먹', '방울', '덩어리', '샷',
+               '대접', '병', '움큼', '젓가락', '잎', '톡']
+# 수량이 없는 계량 표현
+VAGUE_AMOUNTS = {
+    '약간': '약간', '조금': '약간', '소량': '약간', '살짝': '약간', '약간만': '약간', '톡톡': '약간', '솔솔': '약간',
+    '적당량': '적당량', '적당히': '적당량', '취향껏': '적당량', '기호에 맞게': '적당량',
+    '넉넉히': '넉넉히', '넉넉하게': '넉넉히', '듬뿍': '넉넉히',
+}
+
+UNICODE_FRACTIONS = {'½': 1 / 2, '⅓': 1 / 3, '⅔': 2 / 3, '¼': 1 / 4, '¾': 3 / 4, '⅛': 1 / 8}
+
+
+def _build_unit_table():
+    table = {}
+    for canonical, (aliases, factor) in list(UNITS.items()) + list(SCALED_UNITS.items()):
+        for alias in aliases:
+            table[alias] = (canonical, factor)
+    for unit in PLAIN_UNITS:
+        table.setdefault(unit, (unit, 1))
+    return table
+
+
+UNIT_TABLE = _build_unit_table()
+
+_NUMBER = r"(?:\d+(?:\.\d+)?(?:\s*/\s*\d+)?[½⅓⅔¼¾⅛]?|[½⅓⅔¼¾⅛])"
+# 공백만으로 이어 붙이는 건 대분수('1 1/2')뿐: '2 10g' 를 12 로 더하지 않도록
+_QUANTITY = rf"{_NUMBER}(?:\s*(?:\+|과|와)\s*{_NUMBER}|\s+\d+\s*/\s*\d+)*"
+_UNIT = '|'.join(re.escape(unit) for unit in sorted(UNIT_TABLE, key=len, reverse=True))
+# 단위 뒤에 영문자가 이어지면 단위로 보지 않음 ('2 tsps' 가 't' 로 잘리지 않도록, 모르는 영문 단위는 unit=None)
+AMOUNT_RE = re.compile(
+    rf"^\s*(?:약|대략)?\s*(?:(?P<low>{_QUANTITY})(?:\s*[~\-]\s*(?P<high>{_QUANTITY}))?|(?P<half_only>반))"
+    rf"\s*(?:(?P<unit>{_UNIT})(?![A-Za-z]))?\s*(?P<half>반)?"
+)
+_TERM_RE = re.compile(_NUMBER)
+
+ParsedAmount = namedtuple('ParsedAmount', ['quantity', 'quantity_max', 'unit'])
+EMPTY_AMOUNT = ParsedAmount(None, None, None)
+
+
+def _number_value(term):
+    term = term.replace(' ', '')
+    value = 0.0
+    if term[-1] in UNICODE_FRACTIONS:
+        value += UNICODE_FRACTIONS[term[-1]]
+        term = term[:-1]
+    if not term:
+        return value
+    if '/' in term:
+        numerator, denominator = term.split('/')
+        if not float(denominator):
+            return None  # '1/0' 은 수량으로 보지 않음
+        return value + float(numerator) / float(denominator)
+    return value + float(term)
+
+
+def _quantity_value(text):
+    # '1과1/2' -> 1.5, '2+1' -> 3.0, '1 1/2' -> 1.5
+    values = [_number_value(term) for term in _TERM_RE.findall(text)]
+    return None if None in values else sum(values)
+
+
+# '1/2컵' -> (0.5, 0.5, '컵'), '1~2큰술' -> (1.0, 2.0, 'T'), '1L' -> (1000.0, 1000.0, 'ml'), '약간' -> (None, None, '약간')
+# '1 1/2컵' -> (1.5, 1.5, '컵'), '1/0컵' -> (None, None, None)
+# '2 tablespoons' -> (2.0, 2.0, 'T'), '1 tbs' -> (1.0, 1.0, 'T'), '1 teaspoon' -> (1.0, 1.0, 't'), '2 pinches' -> (2.0, 2.0, None)
+@lru_cache(maxsize=65536)
+def parse_amount(text):
+    if not text:
+        return EMPTY_AMOUNT
+    text = text.strip()
+    match = AMOUNT_RE.match(text)
+    if match is None or not (match.group('low') or match.group('half_only')):
+        return ParsedAmount(None, None, VAGUE_AMOUNTS.get(text))
+
+    unit, factor = UNIT_TABLE.get(match.group('unit'), (None, 1))
+    if match.group('half_only'):
+        low = high = 0.5
+    else:
+        low = _quantity_value(match.group('low'))
+        high = _quantity_value(match.group('high')) if match.group('high') else low
+        if low is None or high is None:
+            return ParsedAmount(None, None, VAGUE_AMOUNTS.get(text))
+    if match.group('half'):
+        low, high = low + 0.5, high + 0.5
+    return ParsedAmount(low * factor, high * factor, unit)
+
+
+def split_ingredient_text(ingredient):
+    match = INGREDIENT_SPLIT_RE.match(ingredient)
+    if match:
+        return match.groups()
+    return ingredient, ""
+
+
+def explode_ingredients(recipe_ids, ingredient_lists):
+    # 레시피별 재료 리스트를 (recipe_id, name, amount) 행으로 펼침
+    # 재료는 크롤러의 ingredients ({'name', 'amount'}) 또는 recipeIngredient ('만두 18개') 형식
+    # numpy / pandas 는 DataFrame 을 다루는 함수에서만 import (parse_amount 만 쓰는 크롤러의 시작 시간을 늘리지 않도록)
+    import numpy as np
+    import pandas as pd
+
+    rows_id, names, amounts = [], [], []
+    for recipe_id, items in zip(recipe_ids, ingredient_lists):
+        if not isinstance(items, (list, tuple, np.ndarray)):
+            continue
+        for item in items:
+            if isinstance(item, dict):
+                name, amount = item.get('name'), item.get('amount')
+            elif isinstance(item, (list, tuple)):
+                name, amount = item
+            else:
+                name, amount = split_ingredient_text(str(item))
+            rows_id.append(recipe_id)
+            names.append(name)
+            amounts.append(amount)
+    return pd.DataFrame({'recipe_id': rows_id, 'name': names, 'amount': amounts})
+
+
+def normalize_ingredients(frame):
+    # name / amount 컬럼을 가진 DataFrame 에 quantity, quantity_max, unit 컬럼을 붙여서 돌려줌
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(frame['amount'].fillna('').astype(str), sort=False)
+    parsed = [parse_amount(amount) for amount in uniques]
+    quantity = np.array([p.quantity if p.quantity is not None else np.nan for p in parsed], dtype=float)
+    quantity_max = np.array([p.quantity_max if p.quantity_max is not None else np.nan for p in parsed], dtype=float)
+    unit_categories = sorted({p.unit for p in parsed if p.unit is not None})
+    unit_index = {unit: i for i, unit in enumerate(unit_categories)}
+    unit_codes = np.array([unit_index.get(p.unit, -1) for p in parsed], dtype=np.int32)
+
+    result = frame.copy()
+    # 같은 재료 이름은 category 하나로 공유 (문자열 중복 저장 없음)
+    result['name'] = pd.Categorical(frame['name'].fillna('').astype(str).str.strip())
+    result['quantity'] = quantity[codes]
+    result['quantity_max'] = quantity_max[codes]
+    result['unit'] = pd.Categorical.from_codes(unit_codes[codes], categories=unit_categories)
+    return result
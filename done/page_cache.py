@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from collections import namedtuple
+
+# 레시피 페이지 원본 응답을 디스크에 저장해두는 캐시.
+# 본문은 sha256 으로 이름을 붙여 zlib 으로 압축해 저장하고 (같은 내용은 한 번만 저장),
+# recipe_id -> (status, headers, fetched_at, sha256, etag, last_modified) 는 SQLite 인덱스에 둔다.
+#   cache/
+#     index.db
+#     blobs/ab/ab12....z
+
+CachedPage = namedtuple('CachedPage', ['recipe_id', 'status', 'headers', 'fetched_at', 'sha256', 'etag', 'last_modified'])
+
+
+class PageCache:
+    def __init__(self, directory, max_age=None):
+        self.directory = directory
+        self.max_age = max_age  # 이 시간(초) 안에 받은 페이지는 요청 없이 캐시에서 사용 (None 이면 항상 조건부 요청)
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.db'))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " recipe_id INTEGER PRIMARY KEY,"
+            " status INTEGER NOT NULL,"
+            " headers TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " sha256 TEXT NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT)"
+        )
+        self.conn.commit()
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.directory, 'blobs', sha256[:2], sha256 + '.z')
+
+    def get(self, recipe_id):
+        row = self.conn.execute(
+            "SELECT recipe_id, status, headers, fetched_at, sha256, etag, last_modified FROM pages WHERE recipe_id = ?",
+            (recipe_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return CachedPage(row[0], row[1], json.loads(row[2]), row[3], row[4], row[5], row[6])
+
+    def is_fresh(self, entry):
+        return self.max_age is not None and time.time() - entry.fetched_at < self.max_age
+
+    def read_body(self, entry):
+        with open(self._blob_path(entry.sha256), 'rb') as fd:
+            return zlib.decompress(fd.read())
+
+    def read_page(self, recipe_id):
+        entry = self.get(recipe_id)
+        if entry is None:
+            return None
+        return self.read_body(entry)
+
+    def put(self, recipe_id, status, headers, body):
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(sha256)
+        if not os.path.exists(path):
+            # 임시 파일에 쓴 뒤 rename 해서 중간에 죽어도 깨진 blob 이 남지 않도록 함
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as fd:
+                fd.write(zlib.compress(body, 6))
+            os.replace(tmp_path, path)
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (recipe_id, status, headers, fetched_at, sha256, etag, last_modified)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (recipe_id, status, json.dumps(headers, ensure_ascii=False), time.time(), sha256,
+             headers.get('ETag'), headers.get('Last-Modified')),
+        )
+        self.conn.commit()
+
+    def touch(self, recipe_id):
+        # 304 Not Modified 응답을 받았을 때 fetched_at 만 갱신
+        self.conn.execute("UPDATE pages SET fetched_at = ? WHERE recipe_id = ?", (time.time(), recipe_id))
+        self.conn.commit()
+
+    def ids_between(self, low, high):
+        rows = self.conn.execute("SELECT recipe_id FROM pages WHERE recipe_id BETWEEN ? AND ? ORDER BY recipe_id", (low, high))
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.conn.close()
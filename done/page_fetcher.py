@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import aiohttp
+
+from crawl_metrics import BYTE_BUCKETS
+from rate_controller import parse_retry_after
+
+# 레시피 페이지 요청 (fast_version / recent_crawling 공용)
+# 응답을 받으면 (page_source, recipe_id), 레시피가 있는지 판단할 수 없는 실패는 FetchError(reason) 를 던진다.
+# 404 / 410 과 alert 페이지는 실패가 아니라 "레시피 없음" 이므로 페이지를 그대로 돌려주고 파싱 단계에서 판단한다.
+
+# 실패 이유
+TIMEOUT = 'timeout'
+CONNECTION = 'connection'  # 연결 실패 / 끊김 / 응답 본문 잘림
+THROTTLED = 'throttled'  # 429
+SERVER_ERROR = 'server_error'  # 5xx
+HTTP_ERROR = 'http_error'  # 그 밖의 4xx (403 차단 등)
+NOT_CACHED = 'not_cached'  # --replay 인데 캐시에 없음 (재시도해도 같음)
+UNEXPECTED = 'unexpected'  # 받은 응답을 파싱 / 저장하다 난 예상하지 못한 예외 (재시도하지 않음)
+
+headers = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class FetchError(Exception):
+    def __init__(self, reason, detail=None):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.retryable = reason != NOT_CACHED
+
+
+def classify_exception(e):
+    if isinstance(e, asyncio.TimeoutError):
+        return TIMEOUT
+    if isinstance(e, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, ConnectionError)):
+        return CONNECTION
+    return CONNECTION if isinstance(e, OSError) else HTTP_ERROR
+
+
+def classify_status(status):
+    # 페이지를 돌려줄 응답이면 None
+    if status == 429:
+        return THROTTLED
+    if status >= 500:
+        return SERVER_ERROR
+    if 400 <= status < 500 and status not in (404, 410):
+        return HTTP_ERROR
+    return None
+
+
+async def fetch(session, url, recipe_id, cache=None, replay=False, rate=None, metrics=None):
+    # replay: 네트워크 없이 캐시에 저장된 페이지만 사용
+    if replay:
+        page_source = cache.read_page(recipe_id)
+        if page_source is None:
+            print(f"[INFO] Recipe ID {recipe_id} is not in the page cache.")
+            raise FetchError(NOT_CACHED)
+        return page_source, recipe_id
+
+    request_headers = dict(headers)
+    cached = cache.get(recipe_id) if cache is not None else None
+    if cached is not None:
+        if cache.is_fresh(cached):
+            if metrics is not None:
+                metrics.inc('cache_hits')
+            return cache.read_body(cached), recipe_id
+        # 캐시가 오래됐으면 조건부 요청으로 변경 여부만 확인
+        if cached.etag:
+            request_headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            request_headers['If-Modified-Since'] = cached.last_modified
+
+    # rate: 요청 속도 조절기 (차례가 올 때까지 기다리고, 응답 결과를 알려줌)
+    start = time.monotonic()
+    if rate is not None:
+        await rate.acquire()
+        if metrics is not None:
+            metrics.observe('rate_limit_sleep_seconds', time.monotonic() - start)
+    start = time.monotonic()
+    try:
+        async with session.get(url, headers=request_headers) as response:
+            print(f"Fetching URL: {url}")
+            if metrics is not None:
+                metrics.inc('responses', status=response.status)
+            if rate is not None:
+                rate.report(response.status, time.monotonic() - start, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            reason = classify_status(response.status)
+            if reason is not None:
+                # 서버가 요청을 제한하거나 오류를 낸 경우는 레시피 없음이 아니라 실패로 처리 (캐시에도 저장하지 않음)
+                print(f"[ERROR] Fetching URL failed: {url}, status: {response.status}")
+                raise FetchError(reason, f"HTTP {response.status}")
+            if response.status == 304 and cached is not None:
+                cache.touch(recipe_id)
+                return cache.read_body(cached), recipe_id
+            page_source = await response.read()
+            if metrics is not None:
+                # 요청부터 본문을 다 받을 때까지
+                metrics.observe('fetch_seconds', time.monotonic() - start)
+                metrics.observe('response_bytes', len(page_source), BYTE_BUCKETS)
+            if cache is not None:
+                cache.put(recipe_id, response.status, dict(response.headers), page_source)
+            return page_source, recipe_id
+    except FetchError:
+        raise
+    except Exception as e:
+        if rate is not None:
+            rate.report(error=True)
+        print(f"[ERROR] Fetching URL failed: {url}, error: {e!r}")
+        raise FetchError(classify_exception(e), repr(e)) from e
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from recipe_extractor import parse_recipe_page
+
+# HTML/JSON 파싱을 이벤트 루프 밖의 프로세스 풀에서 처리하는 단계.
+# 페이지를 batch_size 개씩 묶어서 보내고, 결과는 페이지마다 future 로 돌려준다.
+# 풀에 올라간 batch 수는 max_pending_batches 로 제한되며, parse() 를 호출한 fetch 워커는
+# 결과가 나올 때까지 기다리므로 fetch 가 파싱보다 앞서 나가지 못한다.
+# metrics 를 넘기면 페이지마다 추출(decode) / JSON 파싱(parse) 시간과, parse() 를 호출해서 결과를 받을 때까지의 시간(parse_wait)을 기록한다.
+
+
+def parse_page(recipe_id, page_source, with_ingredients):
+    timings = {}
+    return parse_recipe_page(page_source, recipe_id, with_ingredients, timings=timings), timings
+
+
+def parse_batch(batch, with_ingredients):
+    # 워커 프로세스에서 실행
+    return [parse_page(recipe_id, page_source, with_ingredients) for recipe_id, page_source in batch]
+
+
+class ParseStage:
+    def __init__(self, workers=0, with_ingredients=True, batch_size=16, max_pending_batches=None, max_delay=0.02, metrics=None):
+        self.workers = workers
+        self.with_ingredients = with_ingredients
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches or max(2, workers * 2)
+        self.max_delay = max_delay  # batch 가 다 차지 않아도 이 시간(초)이 지나면 보냄
+        self.executor = None
+        self.slots = None
+        self.batch = []
+        self.timer = None
+        self.flush_tasks = set()
+        self.metrics = metrics
+
+    async def __aenter__(self):
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            self.slots = asyncio.Semaphore(self.max_pending_batches)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._schedule_flush()
+        if self.flush_tasks:
+            await asyncio.gather(*self.flush_tasks, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def parse(self, recipe_id, page_source):
+        start = time.perf_counter()
+        if self.executor is None:
+            # 워커가 없으면 이벤트 루프에서 바로 파싱
+            result, timings = parse_page(recipe_id, page_source, self.with_ingredients)
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.batch.append((recipe_id, page_source, future))
+            if len(self.batch) >= self.batch_size:
+                self._schedule_flush()
+            elif self.timer is None:
+                self.timer = loop.call_later(self.max_delay, self._schedule_flush)
+            result, timings = await future
+
+        if self.metrics is not None:
+            self.metrics.observe('parse_wait_seconds', time.perf_counter() - start)
+            for stage, seconds in timings.items():
+                self.metrics.observe(f'{stage}_seconds', seconds)
+        return result
+
+    def _schedule_flush(self):
+        # batch 전송은 호출한 워커와 별도의 task 로 실행 (워커가 취소돼도 같은 batch 의 다른 페이지는 영향 없음)
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        task = asyncio.ensure_future(self._flush(batch))
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def _flush(self, batch):
+        try:
+            # backpressure: 풀에 올라간 batch 가 가득 차 있으면 자리가 날 때까지 대기
+            await self.slots.acquire()
+            try:
+                loop = asyncio.get_running_loop()
+                pages = [(recipe_id, page_source) for recipe_id, page_source, _ in batch]
+                results = await loop.run_in_executor(self.executor, parse_batch, pages, self.with_ingredients)
+            finally:
+                self.slots.release()
+        except BaseException as e:
+            for _, _, future in batch:
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            raise
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -1,7 +1,15 @@
 import pandas as pd
 import ast
 import json
-import re
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from columnar_store import pa, require_pyarrow
+from ingredient_normalizer import INGREDIENT_SPLIT_RE, explode_ingredients, normalize_ingredients
+
+if pa is not None:
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
 
 def safe_literal_eval(val):
     try:
@@ -23,34 +31,138 @@ def process_instructions(val):
     return []
 
 def split_ingredient(ingredient):
-    match = re.match(r"(.+?)\s+(\d+.*)", ingredient)
+    match = INGREDIENT_SPLIT_RE.match(ingredient)
     if match:
         return match.groups()
     return ingredient, ""
 
+def split_ingredients(val):
+    return [split_ingredient(i) for i in safe_literal_eval(val)]
+
+def literal_list_column(column, convert=safe_literal_eval):
+    # 값이 있는 셀만 변환하고 빈 셀은 [] 로 채움
+    present = column.notna()
+    result = pd.Series([[] for _ in range(len(column))], index=column.index, dtype=object)
+    result[present] = column[present].map(convert)
+    return result
+
+# author 셀은 "{'@type': 'Person', 'name': '...'}" 형태이므로 이름만 정규식으로 한 번에 뽑음
+AUTHOR_NAME_RE = r"""'name':\s*(?:'([^']*)'|"([^"]*)")"""
+
 def preprocess_chunk(chunk):
     # 필요한 데이터만 남기기
     required_columns = ["recipe_id", "name", "image", "author", "datePublished", "description", "recipeIngredient", "recipeInstructions", "tags"]
-    chunk = chunk[required_columns]
+    chunk = chunk[required_columns].copy()
 
     # author 필드에서 이름만 추출
-    chunk.loc[:, "author"] = chunk["author"].apply(lambda x: safe_json_loads(x)["name"] if pd.notna(x) else "")
+    author_name = chunk["author"].astype(object).str.extract(AUTHOR_NAME_RE)
+    chunk["author"] = author_name[0].fillna(author_name[1]).fillna("").astype(object)
 
     # image 필드를 리스트 형식으로 변환
-    chunk.loc[:, "image"] = chunk["image"].apply(lambda x: safe_literal_eval(x) if pd.notna(x) else [])
+    chunk["image"] = literal_list_column(chunk["image"])
 
     # recipeIngredient 필드를 리스트 형식으로 변환 및 재료 이름과 계량으로 분리
-    chunk.loc[:, "recipeIngredient"] = chunk["recipeIngredient"].apply(lambda x: [split_ingredient(i) for i in safe_literal_eval(x)] if pd.notna(x) else [])
+    chunk["recipeIngredient"] = literal_list_column(chunk["recipeIngredient"], split_ingredients)
 
     # recipeInstructions 필드를 리스트 형식으로 변환
-    chunk.loc[:, "recipeInstructions"] = chunk["recipeInstructions"].apply(process_instructions)
+    chunk["recipeInstructions"] = chunk["recipeInstructions"].astype(object).map(process_instructions)
 
     # tags 필드를 리스트 형식으로 변환
-    chunk.loc[:, "tags"] = chunk["tags"].apply(lambda x: safe_literal_eval(x) if pd.notna(x) else [])
+    chunk["tags"] = literal_list_column(chunk["tags"])
 
     return chunk
 
+def split_ingredient_column(column):
+    # list<string> 재료 컬럼을 list<struct<name, amount>> 로 분리 (split_ingredient 와 같은 규칙을 Arrow 커널로 한 번에 적용)
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    flat = pc.list_flatten(column)
+    parts = pc.extract_regex(flat, r"^(?P<name>.+?)\s+(?P<amount>\d+.*)")
+    matched = pc.is_valid(parts)
+    names = pc.if_else(matched, pc.struct_field(parts, [0]), flat)
+    amounts = pc.if_else(matched, pc.struct_field(parts, [1]), "")
+    items = pa.StructArray.from_arrays([names, amounts], names=["name", "amount"])
+    offsets = pc.subtract(column.offsets, column.offsets[0])
+    return pa.ListArray.from_arrays(offsets, items, mask=column.is_null())
+
+def preprocess_table(table):
+    # 크롤러가 만든 Parquet 테이블은 이미 리스트/구조체 컬럼이므로 문자열 파싱 없이 컬럼 단위로 변환
+    author = table.column("author")
+    return pa.table({
+        "recipe_id": table.column("recipe_id"),
+        "name": table.column("name"),
+        "image": table.column("image"),
+        "author": pc.struct_field(author, "name"),
+        "datePublished": table.column("datePublished"),
+        "description": table.column("description"),
+        "recipeIngredient": split_ingredient_column(table.column("recipeIngredient")),
+        "recipeInstructions": table.column("recipeInstructions"),
+        "tags": table.column("tags"),
+    })
+
+def load_ingredient_rows(input_file, source="ingredients"):
+    # source: 크롤러가 페이지에서 뽑은 "ingredients" (name/amount) 또는 JSON-LD 의 "recipeIngredient" ('만두 18개')
+    if input_file.endswith(".parquet"):
+        # Parquet 은 list<struct> 컬럼이므로 문자열 파싱 없이 평탄화
+        require_pyarrow()
+        table = pq.read_table(input_file, columns=["recipe_id", source])
+        column = table.column(source).combine_chunks()
+        recipe_ids = pc.take(table.column("recipe_id"), pc.list_parent_indices(column))
+        flat = pc.list_flatten(column)
+        if source == "ingredients":
+            names, amounts = pc.struct_field(flat, "name").cast(pa.string()), pc.struct_field(flat, "amount")
+            return pd.DataFrame({"recipe_id": recipe_ids.to_numpy(), "name": names.to_pandas(), "amount": amounts.to_pandas()})
+        return explode_ingredients(recipe_ids.to_pylist(), [[item] for item in flat.to_pylist()])
+
+    df = pd.read_csv(input_file, usecols=["recipe_id", source])
+    return explode_ingredients(df["recipe_id"], literal_list_column(df[source]))
+
+def normalize_recipe_ingredients(input_file, output_file, source="ingredients"):
+    # 재료를 (recipe_id, name, amount, quantity, quantity_max, unit) 행으로 정규화해서 저장
+    rows = normalize_ingredients(load_ingredient_rows(input_file, source))
+    if output_file.endswith(".parquet"):
+        rows.to_parquet(output_file, index=False, compression="zstd")
+    else:
+        rows.to_csv(output_file, index=False, encoding='utf-8-sig')
+    print(f"[INFO] {len(rows)} ingredients saved to {output_file}")
+    return rows
+
+def preprocess_recipe_data_streaming(input_file, output_file, rows_to_process=None, chunksize=20000, workers=None):
+    # 입력을 chunksize 행씩 읽어서 프로세스 풀에서 전처리하고, 결과는 입력 순서대로 이어 씀
+    # 풀에 올라간 chunk 는 workers * 2 개까지만 허용하므로 메모리는 chunk 크기에 비례해서 유지됨
+    workers = workers or os.cpu_count() or 1
+    pending = []
+    row_count = 0
+
+    with open(output_file, mode='w', newline='', encoding='utf-8-sig') as out_fd, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        def write_next():
+            nonlocal row_count
+            processed = pending.pop(0).result()
+            processed.to_csv(out_fd, index=False, header=(row_count == 0))
+            row_count += len(processed)
+
+        for chunk in pd.read_csv(input_file, nrows=rows_to_process, chunksize=chunksize):
+            pending.append(executor.submit(preprocess_chunk, chunk))
+            if len(pending) >= workers * 2:
+                write_next()
+        while pending:
+            write_next()
+
+    print(f"[INFO] {row_count} rows saved to {output_file}")
+    return row_count
+
 def preprocess_recipe_data(input_file, output_file, rows_to_process=None):
+    if input_file.endswith(".parquet"):
+        # Parquet 입력: 필요한 컬럼만 읽어서 Parquet 로 저장 (literal_eval / json.loads 없음)
+        require_pyarrow()
+        required_columns = ["recipe_id", "name", "image", "author", "datePublished", "description", "recipeIngredient", "recipeInstructions", "tags"]
+        table = pq.read_table(input_file, columns=required_columns)
+        if rows_to_process is not None:
+            table = table.slice(0, rows_to_process)
+        pq.write_table(preprocess_table(table), output_file, compression="zstd")
+        return
+
     # 데이터 읽기
     df = pd.read_csv(input_file, nrows=rows_to_process)
 
@@ -60,11 +172,18 @@ def preprocess_recipe_data(input_file, output_file, rows_to_process=None):
     # 결과를 CSV 파일로 저장
     processed_df.to_csv(output_file, index=False, encoding='utf-8-sig')
 
-# 함수 호출 예제
-input_file = "./recipes.csv"  # 업로드한 파일 경로
-output_file = "./example_prepro.csv"
-preprocess_recipe_data(input_file, output_file, rows_to_process=9738)
-
-# 결과를 확인하기 위해 저장된 파일을 다시 읽어옵니다.
-processed_df = pd.read_csv(output_file)
-processed_df.head()
\ No newline at end of file
+if __name__ == "__main__":
+    # 함수 호출 예제
+    input_file = "./recipes.csv"  # 업로드한 파일 경로 (크롤러를 --format parquet 으로 실행했다면 "./recipes.parquet")
+    output_file = "./example_prepro.csv" if input_file.endswith(".csv") else "./example_prepro.parquet"
+    if input_file.endswith(".csv"):
+        preprocess_recipe_data_streaming(input_file, output_file, rows_to_process=9738)
+    else:
+        preprocess_recipe_data(input_file, output_file, rows_to_process=9738)
+
+    # 재료 계량을 수량/단위로 정규화
+    normalize_recipe_ingredients(input_file, "./example_ingredients.csv" if input_file.endswith(".csv") else "./example_ingredients.parquet")
+
+    # 결과를 확인하기 위해 저장된 파일을 다시 읽어옵니다.
+    processed_df = pd.read_csv(output_file) if output_file.endswith(".csv") else pd.read_parquet(output_file)
+    print(processed_df.head())
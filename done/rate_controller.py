@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+
+# 모든 크롤러가 같이 쓰는 요청 속도 조절기 (AIMD).
+#   - 요청 전에 acquire() 로 차례를 받음: 요청 사이 간격은 1 / rate 초
+#   - 응답 후 report() 로 결과를 알려줌
+#       정상 응답이 healthy_window 번 이어지고 지연 시간도 평소 수준이면 rate 를 increase_step 만큼 올림 (additive increase)
+#       429 면 rate 를 decrease_factor 배로 줄임 (multiplicative decrease), Retry-After 가 있으면 그동안 멈춤
+#       5xx / 타임아웃은 재시도되는 요청이므로 그것만으로는 크게 줄이지 않음:
+#         지연 시간이 평소보다 latency_factor 배 이상 늘었거나 (서버가 버거워함), 최근 응답 중 오류 비율이 error_threshold 이상일 때만
+#         오류 비율만큼 줄임 (rate *= 1 - (1 - decrease_factor) * 오류 비율)
+#         -> 지연 시간은 정상인데 일정 비율로 503 을 내는 서버에서는 줄이지 않고, 정상 응답으로 계속 올림
+# 줄인 직후 cooldown 초 동안은 이미 보낸 요청들의 실패로 다시 줄이지 않는다.
+# asyncio 크롤러는 acquire(), Selenium 스레드는 acquire_blocking() 을 쓴다.
+
+
+class RateController:
+    def __init__(self, rate=5.0, min_rate=0.5, max_rate=100.0, increase_step=1.0, decrease_factor=0.5,
+                 healthy_window=10, latency_factor=3.0, cooldown=1.0, error_window=20, error_threshold=0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.healthy_window = healthy_window
+        self.latency_factor = latency_factor  # 지연 시간이 기준의 이 배수를 넘으면 올리지 않음
+        self.cooldown = cooldown
+        self.error_threshold = error_threshold
+        self.recent_errors = deque(maxlen=error_window)  # 최근 응답의 오류 여부
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.healthy = 0
+        self.latency = None  # 지연 시간 EWMA
+        self.base_latency = None  # 지금까지 가장 낮았던 EWMA (서버가 한가할 때의 지연 시간)
+        self.counts = Counter()
+
+    def _try_acquire(self):
+        # 차례가 왔으면 0, 아니면 다시 확인할 때까지 기다릴 시간
+        # 미리 시각을 예약해두지 않으므로, 기다리는 동안 rate 가 줄면 줄어든 간격이 바로 적용됨
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next_time, self.paused_until)
+            if start > now:
+                return start - now
+            self.next_time = now + 1 / self.rate
+            return 0
+
+    async def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self):
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def report(self, status=None, latency=None, error=False, retry_after=None):
+        with self.lock:
+            now = time.monotonic()
+            failed = error or (status is not None and status >= 500)
+            if status != 429:
+                self.recent_errors.append(failed)
+            if status == 429:
+                self.counts['throttled'] += 1
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                self.healthy = 0
+                self._decrease(now, self.decrease_factor)
+                return
+            if failed:
+                self.counts['errors'] += 1
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                error_rate = sum(self.recent_errors) / len(self.recent_errors)
+                if error_rate >= self.error_threshold or self._slow():
+                    self.healthy = 0
+                    self._decrease(now, 1 - (1 - self.decrease_factor) * error_rate)
+                return
+
+            self.counts['ok'] += 1
+            if latency is not None:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                self.base_latency = self.latency if self.base_latency is None else min(self.base_latency, self.latency)
+                if self._slow():
+                    # 서버 응답이 느려지고 있으면 더 올리지 않음
+                    self.healthy = 0
+                    return
+
+            self.healthy += 1
+            if self.healthy >= self.healthy_window:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+                self.healthy = 0
+
+    def _slow(self):
+        return self.latency is not None and self.latency > self.base_latency * self.latency_factor
+
+    def _decrease(self, now, factor):
+        if now - self.last_decrease >= self.cooldown:
+            self.rate = max(self.min_rate, self.rate * factor)
+            self.last_decrease = now
+
+    @property
+    def current_rate(self):
+        return self.rate
+
+    def stats(self):
+        with self.lock:
+            return {'rate': round(self.rate, 2), 'latency_ms': round(self.latency * 1000, 1) if self.latency else None, **self.counts}
+
+
+def parse_retry_after(value):
+    # Retry-After 헤더 (초 단위만 지원)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
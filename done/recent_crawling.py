@@ -1,123 +1,182 @@
 import asyncio
-import aiohttp
 from aiohttp import ClientSession, TCPConnector
-from bs4 import BeautifulSoup
-import json
-import pandas as pd
+import argparse
 from datetime import datetime
+import os
+from crawl_journal import CrawlJournal, ERROR, NOT_FOUND, PARSED
+from crawl_metrics import CrawlMetrics
+from page_cache import PageCache
+from page_fetcher import FetchError, fetch
+from parse_stage import ParseStage
+from rate_controller import RateController
+from recipe_id_index import RecipeIdIndex
+from recipe_store import RecipeStore
+from retry_queue import RetryQueue
+from record_sink import ShardedJsonlSink, export_records
 
 baseUrl = 'http://www.10000recipe.com/recipe/'
 
-async def fetch(session, url, recipe_id):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        async with session.get(url, headers=headers) as response:
-            print(f"Fetching URL: {url}")
-            page_source = await response.read()
-            return page_source.decode('utf-8', errors='replace'), recipe_id
-    except Exception as e:
-        print(f"[ERROR] Fetching URL failed: {url}, error: {e}")
-        return None, recipe_id
-
-async def parsing_async(page_source, recipe_id):
-    parsed_li = []
-    soup = BeautifulSoup(page_source, "html.parser", from_encoding='utf-8')
-
-    # 레시피가 없는 경우 alert 메시지 처리
-    if soup.find("div", class_="alert"):
-        print(f"[INFO] Recipe ID {recipe_id} not found.")
-        return []
-
-    # JSON-LD 데이터 추출
-    try:
-        json_ld_script = soup.find("script", type="application/ld+json")
-        json_ld_data = json.loads(json_ld_script.string, strict=False)
-        json_ld_data = {'recipe_id': recipe_id, **json_ld_data}  # Add recipe ID to the beginning of data
-    except Exception as e:
-        print(f"[ERROR] JSON-LD parsing failed for Recipe ID {recipe_id}: {e}")
-        return []
-
-    # 태그 데이터 추출
-    try:
-        tags = [tag.text.strip() for tag in soup.select(".view_tag a")]
-    except Exception as e:
-        print(f"[ERROR] Tag parsing failed for Recipe ID {recipe_id}: {e}")
-        tags = []
+windowSize = 10  # 동시에 미리 요청해두는 ID 수 (1이면 한 개씩 순차 요청)
+maxConsecutiveNotFound = 20  # 연속으로 이 수만큼 레시피가 없으면 크롤링 중단
+parseWorkers = max(1, (os.cpu_count() or 2) - 1)  # 파싱 프로세스 수 (0이면 이벤트 루프에서 바로 파싱)
+cacheMaxAge = 24 * 60 * 60  # 페이지 캐시 사용 시, 이 시간(초) 안에 받은 페이지는 다시 요청하지 않음
+initialRate = 5.0  # 처음 초당 요청 수 (응답이 정상이면 maxRate 까지 올리고, 429 나 지연 시간 증가면 줄임)
+maxRate = 50.0  # 초당 요청 수 상한
+journalFilename = "recent_crawling_journal.db"  # ID 별 진행 상황 저널 (--resume 에 사용)
+indexFilename = "recipe_id_index.npy"  # 찾은 레시피 ID 를 모아두는 인덱스
+maxAttempts = 4  # 타임아웃 / 연결 오류 / 429 / 5xx 가 난 ID 를 요청하는 최대 횟수
+metricsFilename = "recent_crawling_metrics.jsonl"  # 단계별 지표를 metricsInterval 초마다 한 줄씩 추가
+metricsInterval = 10
 
-    # 재료 데이터 추출
-    ingredients = []
-    try:
-        material_area = soup.select('#divConfirmedMaterialArea > ul > li')
-        for item in material_area:
-            material_name = item.select_one('div').text.strip()
-            material_amount = item.select_one('span').text.strip()
-            ingredients.append({'name': material_name, 'amount': material_amount})
-    except Exception as e:
-        print(f"[ERROR] Material parsing failed for Recipe ID {recipe_id}: {e}")
-        ingredients = []
-
-    # 태그와 재료가 없으면 빈 리스트로 설정
-    if not tags:
-        tags = []
-    if not ingredients:
-        ingredients = []
-
-    json_ld_data['tags'] = tags
-    json_ld_data['ingredients'] = ingredients
-    parsed_li.append(json_ld_data)
-
-    print(f"[INFO] Successfully parsed Recipe ID {recipe_id}")
-    return parsed_li
-
-async def CrawlingBetweenRanges(startRecipeId, numRecipes):
+async def fetch_and_parse(session, parse_stage, recipe_id, cache=None, replay=False, rate=None, metrics=None):
+    url = baseUrl + str(recipe_id)
+    # 레시피가 있는지 알 수 없는 실패는 FetchError 로 올라감
+    page_source, recipe_id = await fetch(session, url, recipe_id, cache, replay, rate, metrics)
+    # 응답 bytes 에서 JSON-LD / 태그 / 재료만 추출 (parseWorkers 개의 프로세스에서 처리)
+    return await parse_stage.parse(recipe_id, page_source), recipe_id
+
+async def CrawlingBetweenRanges(startRecipeId, numRecipes, on_recipe, journal, resume=False, cache=None, replay=False,
+                                windowSize=windowSize, parseWorkers=parseWorkers, rate=None, metrics=None, metricsPort=None):
     connector = TCPConnector(ssl=False)  # SSL 인증서 검증 비활성화
-    async with ClientSession(connector=connector) as session:
-        all_recipes = []
+    metrics = metrics if metrics is not None else CrawlMetrics()
+    async with ClientSession(connector=connector) as session, ParseStage(parseWorkers, with_ingredients=True, metrics=metrics) as parse_stage:
+        recipe_count = 0
         not_found_ids = []
         consecutive_not_found = 0
+        retry = RetryQueue(maxAttempts)
+        retry_tasks = set()
 
-        for i in range(startRecipeId, startRecipeId + numRecipes):
-            if consecutive_not_found >= 20:
-                print("[INFO] 20 consecutive recipes not found. Stopping crawling.")
-                break
-
-            url = baseUrl + str(i)
-            page_source, recipe_id = await fetch(session, url, i)
-
-            if page_source is None:
-                print(f"[ERROR] Failed to fetch Recipe ID {recipe_id}")
-                not_found_ids.append(recipe_id)
-                consecutive_not_found += 1
-                continue
-
-            res = await parsing_async(page_source, recipe_id)
+        def handle_result(recipe_id, res):
+            nonlocal recipe_count
+            retry.done(recipe_id)
             if res:
-                all_recipes.extend(res)
-                consecutive_not_found = 0  # Reset counter if a valid recipe is found
+                # 파싱된 레시피는 바로 기록 (저널의 완료 표시는 shard 가 커밋될 때)
+                with metrics.timer('write_seconds'):
+                    for recipe in res:
+                        on_recipe(recipe)
+                recipe_count += len(res)
+                metrics.inc('recipes', len(res))
             else:
                 not_found_ids.append(recipe_id)
-                consecutive_not_found += 1
+                journal.record(recipe_id, NOT_FOUND)
+                retry.note(NOT_FOUND)
+                metrics.inc('not_found')
+
+        def handle_failure(recipe_id, e):
+            # 일시적인 실패는 레시피 없음이 아니므로 연속 미발견 수에 넣지 않고 재시도 대기열로
+            journal.record(recipe_id, ERROR, e.reason)
+            metrics.inc('failures', reason=e.reason)
+            if not e.retryable:
+                retry.note(e.reason)
+                metrics.inc('errors', reason=e.reason)
+                print(f"[ERROR] Failed to fetch Recipe ID {recipe_id}: {e}")
+            elif retry.schedule(recipe_id, e.reason):
+                metrics.inc('retries')
+                print(f"[INFO] Recipe ID {recipe_id} failed ({e.reason}), will retry")
+            else:
+                metrics.inc('errors', reason=e.reason)
+                print(f"[ERROR] Failed to fetch Recipe ID {recipe_id} after {maxAttempts} attempts: {e}")
 
-        return all_recipes, not_found_ids
+        async def retry_one(recipe_id):
+            try:
+                res, recipe_id = await fetch_and_parse(session, parse_stage, recipe_id, cache, replay, rate, metrics)
+                handle_result(recipe_id, res)
+            except FetchError as e:
+                handle_failure(recipe_id, e)
+            finally:
+                retry.task_done()
 
-def save_to_csv(data, filename):
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"Data saved to {filename}")
+        async def retry_feeder():
+            # 다시 시도할 시각이 된 ID 는 순서대로 처리 중인 창과 따로 요청 (재시도를 기다리느라 새 ID 가 멈추지 않음)
+            while True:
+                task = asyncio.create_task(retry_one(await retry.get()))
+                retry_tasks.add(task)
+                task.add_done_callback(retry_tasks.discard)
 
-def get_last_recipe_id(csv_filename):
-    try:
-        df = pd.read_csv(csv_filename)
-        if df.empty:
-            return None
-        return df['RecipeID'].max()
-    except FileNotFoundError:
+        feeder = asyncio.create_task(retry_feeder())
+
+        # 단계별 지표: metricsInterval 초마다 JSON 한 줄, metricsPort 가 있으면 /metrics 로도 제공
+        metrics.gauge('retry_pending', retry.__len__)
+        if rate is not None:
+            metrics.gauge('request_rate', lambda: rate.current_rate)
+        reporter = asyncio.create_task(metrics.report_every(metricsInterval, metricsFilename))
+        runner = await metrics.serve(metricsPort) if metricsPort else None
+
+        # windowSize 개의 ID 를 미리 요청해두고, 결과는 ID 순서대로 처리 (windowSize=1 이면 순차 모드와 동일)
+        endRecipeId = startRecipeId + numRecipes
+        pending = {}
+        next_id = startRecipeId
+
+        # --resume: 저널에 완료(parsed / not_found)로 남은 ID 는 다시 요청하지 않고 기록된 결과로 연속 미발견 수를 계산
+        completed = {}
+        if resume:
+            completed = {recipe_id: status for recipe_id, status in journal.outcomes_between(startRecipeId, endRecipeId - 1).items()
+                         if status in (PARSED, NOT_FOUND)}
+            print(f"[INFO] Resuming: {len(completed)} recipes already completed")
+
+        try:
+            for i in range(startRecipeId, endRecipeId):
+                if consecutive_not_found >= maxConsecutiveNotFound:
+                    print(f"[INFO] {maxConsecutiveNotFound} consecutive recipes not found. Stopping crawling.")
+                    break
+
+                if i in completed:
+                    if completed[i] == PARSED:
+                        consecutive_not_found = 0
+                    else:
+                        not_found_ids.append(i)
+                        consecutive_not_found += 1
+                    continue
+
+                while next_id < endRecipeId and len(pending) < windowSize:
+                    if next_id not in completed:
+                        pending[next_id] = asyncio.create_task(fetch_and_parse(session, parse_stage, next_id, cache, replay, rate, metrics))
+                    next_id += 1
+
+                try:
+                    res, recipe_id = await pending.pop(i)
+                except FetchError as e:
+                    handle_failure(i, e)
+                    continue
+
+                handle_result(recipe_id, res)
+                if res:
+                    consecutive_not_found = 0  # Reset counter if a valid recipe is found
+                else:
+                    consecutive_not_found += 1
+
+            # 중단 지점 앞쪽에서 실패한 ID 는 재시도가 끝날 때까지 기다림
+            await retry.join()
+        finally:
+            # 중단 지점 이후로 미리 보낸 요청은 취소
+            tasks = list(pending.values()) + list(retry_tasks) + [feeder, reporter]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if runner is not None:
+                await runner.cleanup()
+            if rate is not None:
+                print(f"[INFO] Rate controller: {rate.stats()}")
+            print(f"[INFO] Fetch outcomes: {retry.summary()}")
+            for name, summary in metrics.snapshot()['histograms'].items():
+                if summary['count']:
+                    print(f"[INFO] {name}: p50 {summary['p50']}, p99 {summary['p99']}, total {summary['sum']:.1f} ({summary['count']})")
+            print(f"[LOGGED] metrics saved to {metricsFilename}")
+
+        return recipe_count, not_found_ids, retry.gave_up
+
+def get_last_recipe_id(store_filename):
+    # 저장소에 있는 가장 큰 recipe_id (PRIMARY KEY 의 마지막 항목이라 저장소 크기와 무관)
+    if not os.path.exists(store_filename):
         return None
+    store = RecipeStore(store_filename)
+    try:
+        return store.max_recipe_id()
+    finally:
+        store.close()
 
-def main(csv_filename, numRecipes, filename):
-    last_recipe_id = get_last_recipe_id(csv_filename)
+def main(store_filename, numRecipes, filename, outputDir, resume=False, journalFilename=journalFilename, cacheDir=None, replay=False, indexFilename=indexFilename, maxRate=maxRate, metricsPort=None):
+    last_recipe_id = get_last_recipe_id(store_filename)
     if last_recipe_id is None:
         print("[INFO] No previous data found. Please set a startRecipeId manually.")
         return
@@ -128,31 +187,87 @@ def main(csv_filename, numRecipes, filename):
     startTime = datetime.now()
     print(f"[Start Time] {startTime}")
 
-    all_recipes, not_found_ids = asyncio.run(CrawlingBetweenRanges(startRecipeId, numRecipes))
+    journal = CrawlJournal(journalFilename)
+    cache = PageCache(cacheDir, max_age=cacheMaxAge) if cacheDir else None
+    # 레코드는 압축 JSONL shard 로 바로 기록하고, shard 가 커밋되면 저널에 완료 표시
+    store = RecipeStore(store_filename)
+
+    def on_shard_commit(recipe_ids):
+        # shard 가 커밋되면 같은 레코드를 저장소에도 반영하고 저널에 완료 표시
+        store.commit()
+        journal.record_many(recipe_ids, PARSED)
+
+    def on_recipe(recipe):
+        store(recipe)
+        sink(recipe)
+
+    sink = ShardedJsonlSink(outputDir, on_commit=on_shard_commit, append=resume)
+    # 서버 응답(상태 코드 / 지연 시간)에 따라 요청 속도를 조절 (replay 는 네트워크를 쓰지 않으므로 제한 없음)
+    rate = None if replay else RateController(initialRate, max_rate=maxRate)
+    try:
+        recipe_count, not_found_ids, _ = asyncio.run(CrawlingBetweenRanges(startRecipeId, numRecipes, on_recipe, journal, resume, cache, replay,
+                                                                         rate=rate, metricsPort=metricsPort))
+    finally:
+        sink.close()
+        store.close()
+        # 커밋된 레시피 ID 를 인덱스에 추가
+        low, high = startRecipeId, startRecipeId + numRecipes - 1
+        added = RecipeIdIndex(indexFilename).merge(journal.ids_with_status(PARSED, low, high))
+        print(f"[INFO] {added} new recipe IDs merged into {indexFilename}")
+        # 실패한 ID 는 저널의 error 기록에서 모음 (재시도를 다 쓴 ID 뿐 아니라 replay 에서 캐시에 없던 ID 도 포함)
+        failed_ids = journal.ids_with_status(ERROR, low, high)
+        journal.close()
+        if cache is not None:
+            cache.close()
 
     # Running Time Check
     endTime = datetime.now()
     print(f"[End Time] {endTime}")
-    print(f"[Running Time] : {endTime - startTime} (ms)")
+    print(f"[Running Time] : {endTime - startTime} ({(endTime - startTime).total_seconds():.1f}s)")
+    print(f"[INFO] {recipe_count} recipes saved, {len(not_found_ids)} not found, {len(failed_ids)} failed")
 
-    save_to_csv(all_recipes, filename)
+    # 전체 shard 를 CSV (합집합 컬럼) 또는 Parquet (리스트/구조체 컬럼) 로 변환
+    export_records(outputDir, filename)
 
-    # 레시피가 없는 ID 로그 출력
+    # 레시피가 없는 ID / 재시도 후에도 받지 못한 ID 로그 출력
     with open('not_found_recipes.txt', mode='w', newline='', encoding='utf-8') as log_fd:
         for not_found_id in not_found_ids:
             log_fd.write(f"{not_found_id}\n")
+    with open('failed_recipes.txt', mode='w', newline='', encoding='utf-8') as log_fd:
+        for failed_id in failed_ids:
+            log_fd.write(f"{failed_id}\n")
 
     # log 출력
     with open("10000recipe_log.txt", "a", newline='', encoding='utf-8') as log_fd:
         log_fd.write(f"[Start Time] {startTime}\n")
         log_fd.write(f"[End Time] {endTime}\n")
-        log_fd.write(f"[Running Time] : {endTime - startTime} (ms)\n")
+        log_fd.write(f"[Running Time] : {endTime - startTime} ({(endTime - startTime).total_seconds():.1f}s)\n")
 
     print("[LOGGED] time log.txt generated")
 
 # 크롤링 범위와 저장할 파일명을 설정합니다.
-csv_filename = "Recipe_data.csv"
+storeFilename = "recipes.db"
 numRecipes = 10000
 filename = "recent_recipes.csv"
+outputDir = "recent_recipes_shards"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resume', action='store_true', help="reuse outcomes from the journal and keep the existing shards")
+    parser.add_argument('--journal', default=journalFilename, help="progress journal (SQLite)")
+    parser.add_argument('--cache', help="raw page cache directory (stores every response, revalidates stale pages)")
+    parser.add_argument('--replay', action='store_true', help="parse pages from --cache only, without any network access")
+    parser.add_argument('--index', default=indexFilename, help="recipe ID index that newly found recipe IDs are merged into")
+    parser.add_argument('--store', default=storeFilename, help="recipe store (SQLite) that parsed recipes are upserted into")
+    parser.add_argument('--max-rate', type=float, default=maxRate, help="upper bound for the adaptive request rate (requests per second)")
+    parser.add_argument('--base-url', default=baseUrl, help="recipe page URL prefix (e.g. a local stand-in server)")
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this port while crawling")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help="output file format (parquet keeps list/struct columns typed)")
+    args = parser.parse_args()
+    if args.format == 'parquet':
+        filename = os.path.splitext(filename)[0] + '.parquet'
+    baseUrl = args.base_url
+    if args.replay and not args.cache:
+        parser.error("--replay requires --cache")
 
-main(csv_filename, numRecipes, filename)
\ No newline at end of file
+    main(args.store, numRecipes, filename, outputDir, args.resume, args.journal, args.cache, args.replay, args.index, args.max_rate, args.metrics_port)
\ No newline at end of file
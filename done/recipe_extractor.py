@@ -0,0 +1,324 @@
+import bisect
+import html
+import json
+import re
+import time
+from collections import Counter
+
+# 레시피 페이지에서 필요한 부분(JSON-LD, .view_tag a, #divConfirmedMaterialArea > ul > li)만
+# 응답 bytes 위에서 정규식으로 바로 찾아내는 추출기.
+# 마크업이 예상과 다르면 기존 BeautifulSoup 파싱으로 돌아간다.
+
+JSON_LD_RE = re.compile(rb'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>', re.S | re.I)
+CLASS_TAG_RE = re.compile(rb'<([a-zA-Z][\w-]*)\b[^>]*\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\')[^>]*>', re.I)
+MATERIAL_AREA_RE = re.compile(rb'<([a-zA-Z][\w-]*)\b[^>]*\bid\s*=\s*["\']?divConfirmedMaterialArea(?=["\'\s>])[^>]*>', re.I)
+ANCHOR_RE = re.compile(rb'<a\b[^>]*>(.*?)</a\s*>', re.S | re.I)
+TOKEN_RE = re.compile(rb'<(/?)([a-zA-Z][\w:-]*)\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(/?)>|<!--.*?-->', re.S)
+COMMENT_RE = re.compile(rb'<!--.*?-->', re.S)
+# BeautifulSoup 이 요소로 보지 않는 영역 (주석, script / style 내용) 의 시작
+HIDDEN_START_RE = re.compile(rb'<!--|<(script|style)\b[^>]*>', re.I)
+TAG_RE = re.compile(rb'<[^>]*>')
+
+# 닫는 태그가 없는 요소
+VOID_TAGS = {b'area', b'base', b'br', b'col', b'embed', b'hr', b'img', b'input', b'link', b'meta', b'param', b'source', b'track', b'wbr'}
+
+# 빠른 경로 / BeautifulSoup 경로 사용 횟수
+extractor_stats = Counter()
+
+
+class MarkupError(ValueError):
+    pass
+
+
+def _to_bytes(page_source):
+    if isinstance(page_source, str):
+        return page_source.encode('utf-8')
+    return page_source
+
+
+def _text(fragment):
+    # 태그와 주석을 지우고 엔티티를 풀어서 BeautifulSoup 의 .text.strip() 과 같은 결과를 만든다
+    fragment = COMMENT_RE.sub(b'', fragment)
+    return html.unescape(TAG_RE.sub(b'', fragment).decode('utf-8', errors='replace')).strip()
+
+
+def _has_class(class_value, name):
+    return name in class_value.split()
+
+
+class _HiddenSpans:
+    # 페이지의 주석 / script / style 영역 (BeautifulSoup 이 요소로 보지 않는 곳)
+    # 물어본 위치까지만 앞에서부터 찾아두고, 같은 페이지의 alert / JSON-LD / 태그 / 재료 검색이 같이 씀
+    def __init__(self, page):
+        self.page = page
+        self.starts = []
+        self.ends = []
+        self.scanned = 0  # 여기까지는 영역을 모두 찾아둠
+
+    def _scan(self, pos):
+        while self.scanned <= pos:
+            m = HIDDEN_START_RE.search(self.page, self.scanned)
+            if m is None:
+                self.scanned = len(self.page) + 1
+                return
+            if m.group(1) is None:
+                end = self.page.find(b'-->', m.end())
+                end = end + 3 if end != -1 else -1
+            else:
+                close = _close_tag_re(m.group(1).lower()).search(self.page, m.end())
+                end = close.end() if close is not None else -1
+            if end == -1:
+                # 닫히지 않은 주석 / script 는 영역으로 보지 않음
+                self.scanned = m.start() + 1
+                continue
+            self.starts.append(m.start())
+            self.ends.append(end)
+            self.scanned = end
+
+    def end(self, pos):
+        # pos 가 영역 안이면 그 영역이 끝나는 위치, 아니면 None (pos 에서 시작하는 script 태그 자체는 안이 아님)
+        self._scan(pos)
+        i = bisect.bisect_left(self.starts, pos) - 1
+        if i >= 0 and pos < self.ends[i]:
+            return self.ends[i]
+        return None
+
+
+_close_tag_cache = {}
+
+
+def _close_tag_re(tag):
+    close_tag_re = _close_tag_cache.get(tag)
+    if close_tag_re is None:
+        close_tag_re = re.compile(rb'</' + re.escape(tag) + rb'\s*>', re.I)
+        _close_tag_cache[tag] = close_tag_re
+    return close_tag_re
+
+
+def _search_visible(pattern, page, hidden):
+    # 주석 / script 문자열 안에 있지 않은 첫 매치 (BeautifulSoup 이 요소로 찾는 것과 같은 위치)
+    m = pattern.search(page)
+    while m is not None:
+        hidden_end = hidden.end(m.start())
+        if hidden_end is None:
+            return m
+        m = pattern.search(page, hidden_end)
+    return None
+
+
+def _iter_class_tags(page, name, hidden):
+    # class 속성에 name 이 들어있는 여는 태그를 찾는다 (name 이 나오는 위치에서 거꾸로 '<' 를 찾아 태그 전체를 확인)
+    # 주석이나 script 문자열 안의 태그는 BeautifulSoup 처럼 건너뜀
+    pos = page.find(name)
+    while pos != -1:
+        tag_start = page.rfind(b'<', 0, pos)
+        m = CLASS_TAG_RE.match(page, tag_start) if tag_start != -1 else None
+        if m is not None and m.end() > pos:
+            hidden_end = hidden.end(tag_start)
+            if hidden_end is not None:
+                pos = page.find(name, max(hidden_end, m.end()))
+                continue
+            class_value = m.group(2) if m.group(2) is not None else m.group(3)
+            if _has_class(class_value, name):
+                yield m
+            pos = page.find(name, m.end())
+        else:
+            pos = page.find(name, pos + len(name))
+
+
+def _element_end(page, content_start, tag):
+    # 여는 태그 바로 뒤에서 시작해 같은 이름의 짝이 맞는 닫는 태그 위치를 찾는다
+    open_close_re = _open_close_re(tag)
+    depth = 1
+    for m in open_close_re.finditer(page, content_start):
+        if m.group(1):
+            depth -= 1
+            if depth == 0:
+                return m.start(), m.end()
+        elif not m.group(2):
+            depth += 1
+    raise MarkupError(f"unclosed <{tag.decode()}>")
+
+
+_open_close_cache = {}
+
+
+def _open_close_re(tag):
+    open_close_re = _open_close_cache.get(tag)
+    if open_close_re is None:
+        open_close_re = re.compile(rb'<(/?)' + re.escape(tag) + rb'\b[^>]*?(/?)>', re.I)
+        _open_close_cache[tag] = open_close_re
+    return open_close_re
+
+
+def is_not_found_page(page, hidden=None):
+    # soup.find("div", class_="alert") 와 같은 조건
+    for m in _iter_class_tags(page, b'alert', hidden or _HiddenSpans(page)):
+        if m.group(1).lower() == b'div':
+            return True
+    return False
+
+
+def find_json_ld(page, hidden=None):
+    m = _search_visible(JSON_LD_RE, page, hidden or _HiddenSpans(page))
+    if m is None:
+        return None
+    return m.group(1).decode('utf-8', errors='replace')
+
+
+def find_tags(page, hidden=None):
+    tags = []
+    for m in _iter_class_tags(page, b'view_tag', hidden or _HiddenSpans(page)):
+        content_end, _ = _element_end(page, m.end(), m.group(1).lower())
+        tags.extend(_text(a) for a in ANCHOR_RE.findall(page, m.end(), content_end))
+    return tags
+
+
+def find_ingredients(page, hidden=None):
+    m = _search_visible(MATERIAL_AREA_RE, page, hidden or _HiddenSpans(page))
+    if m is None:
+        return []
+    area_end, _ = _element_end(page, m.end(), m.group(1).lower())
+
+    # 재료 영역의 태그를 한 번만 훑으면서 ul > li 마다 첫 div / span 의 텍스트를 모은다
+    ingredients = []
+    stack = []
+    item = None
+    first_depth = {}
+    for token in TOKEN_RE.finditer(page, m.end(), area_end):
+        name = token.group(2)
+        if name is None:
+            continue  # 주석
+        name = name.lower()
+        if name in VOID_TAGS or token.group(3):
+            continue
+
+        if not token.group(1):
+            stack.append((name, token.end()))
+            if len(stack) == 2 and name == b'li' and stack[0][0] == b'ul':
+                item = {}
+                first_depth = {}
+            elif item is not None and name in (b'div', b'span') and name not in first_depth:
+                first_depth[name] = len(stack)  # li 안에서 처음 나온 div / span
+            continue
+
+        if not stack or stack[-1][0] != name:
+            raise MarkupError(f"unbalanced </{name.decode()}>")
+        _, content_start = stack.pop()
+        if item is None:
+            continue
+        if first_depth.get(name) == len(stack) + 1 and name not in item:
+            item[name] = _text(page[content_start:token.start()])
+        elif len(stack) == 1 and name == b'li':
+            if b'div' not in item or b'span' not in item:
+                # 기존 코드는 이 경우 예외가 나서 재료 목록 전체를 비웠음
+                return []
+            ingredients.append({'name': item[b'div'], 'amount': item[b'span']})
+            item = None
+
+    if stack:
+        raise MarkupError(f"unclosed <{stack[-1][0].decode()}>")
+    return ingredients
+
+
+def extract_page(page_source, with_ingredients=True):
+    # 반환값: {'not_found': bool, 'json_ld': str | None, 'tags': list, 'ingredients': list}
+    page = _to_bytes(page_source)
+    hidden = _HiddenSpans(page)
+    if is_not_found_page(page, hidden):
+        return {'not_found': True, 'json_ld': None, 'tags': [], 'ingredients': []}
+
+    json_ld = find_json_ld(page, hidden)
+    if json_ld is None:
+        raise MarkupError("application/ld+json script not found")
+
+    return {
+        'not_found': False,
+        'json_ld': json_ld,
+        'tags': find_tags(page, hidden),
+        'ingredients': find_ingredients(page, hidden) if with_ingredients else [],
+    }
+
+
+def has_recipe_markup(page_source):
+    # 원본 HTML 만으로 판단할 수 있는 페이지인지 (레시피 없음 alert 또는 JSON-LD 가 있음)
+    # False 면 JSON-LD 가 스크립트로 그려지는 페이지이거나 차단 / 점검 페이지이므로 브라우저로 다시 받음
+    page = _to_bytes(page_source)
+    hidden = _HiddenSpans(page)
+    return is_not_found_page(page, hidden) or find_json_ld(page, hidden) is not None
+
+
+def extract_page_with_soup(page_source, with_ingredients=True):
+    # 기존 BeautifulSoup 기반 추출 (fallback 및 비교용, bs4 는 이 경로를 처음 쓸 때 import)
+    from bs4 import BeautifulSoup
+
+    if isinstance(page_source, bytes):
+        soup = BeautifulSoup(page_source, "html.parser", from_encoding='utf-8')
+    else:
+        soup = BeautifulSoup(page_source, "html.parser")
+
+    if soup.find("div", class_="alert"):
+        return {'not_found': True, 'json_ld': None, 'tags': [], 'ingredients': []}
+
+    json_ld_script = soup.find("script", type="application/ld+json")
+    json_ld = json_ld_script.string if json_ld_script is not None else None
+
+    try:
+        tags = [tag.text.strip() for tag in soup.select(".view_tag a")]
+    except Exception:
+        tags = []
+
+    ingredients = []
+    if with_ingredients:
+        try:
+            for item in soup.select('#divConfirmedMaterialArea > ul > li'):
+                material_name = item.select_one('div').text.strip()
+                material_amount = item.select_one('span').text.strip()
+                ingredients.append({'name': material_name, 'amount': material_amount})
+        except Exception:
+            ingredients = []
+
+    return {'not_found': False, 'json_ld': json_ld, 'tags': tags, 'ingredients': ingredients}
+
+
+def extract(page_source, with_ingredients=True):
+    try:
+        extracted = extract_page(page_source, with_ingredients)
+        extractor_stats['fast'] += 1
+        return extracted
+    except MarkupError:
+        extractor_stats['fallback'] += 1
+        return extract_page_with_soup(page_source, with_ingredients)
+
+
+def parse_recipe_page(page_source, recipe_id=None, with_ingredients=True, json_strict=False, timings=None):
+    # 기존 parsing_async 와 같은 형태의 결과 ([레시피] 또는 []) 를 돌려준다
+    # timings 에 dict 를 넘기면 추출(decode) / JSON 파싱(parse) 에 걸린 시간(초)을 기록
+    start = time.perf_counter()
+    extracted = extract(page_source, with_ingredients)
+    if timings is not None:
+        timings['decode'] = time.perf_counter() - start
+
+    # 레시피가 없는 경우 alert 메시지 처리
+    if extracted['not_found']:
+        print(f"[INFO] Recipe ID {recipe_id} not found.")
+        return []
+
+    # JSON-LD 데이터 추출
+    try:
+        start = time.perf_counter()
+        json_ld_data = json.loads(extracted['json_ld'], strict=json_strict)
+        if timings is not None:
+            timings['parse'] = time.perf_counter() - start
+        if recipe_id is not None:
+            json_ld_data = {'recipe_id': recipe_id, **json_ld_data}  # Add recipe ID to the beginning of data
+    except Exception as e:
+        print(f"[ERROR] JSON-LD parsing failed for Recipe ID {recipe_id}: {e}")
+        return []
+
+    json_ld_data['tags'] = extracted['tags']
+    if with_ingredients:
+        json_ld_data['ingredients'] = extracted['ingredients']
+
+    print(f"[INFO] Successfully parsed Recipe ID {recipe_id}")
+    return [json_ld_data]
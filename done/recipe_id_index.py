@@ -0,0 +1,111 @@
+import argparse
+import os
+
+import numpy as np
+
+# 알려진 레시피 ID 를 정렬된 uint32 배열(.npy)로 저장하는 인덱스.
+# np.load(mmap_mode='r') 로 여는 것은 파일 크기와 관계없이 바로 끝나고, 실제로 읽는 부분만 메모리에 올라온다.
+# 범위 조회 / 최신 K 개 / 포함 여부는 모두 이진 탐색(searchsorted)이라 전체 정렬이 필요 없다.
+#   python recipe_id_index.py build recipe_id.txt recipe_id_index.npy
+#   python recipe_id_index.py newest recipe_id_index.npy 1000
+
+ID_DTYPE = np.uint32
+
+
+class RecipeIdIndex:
+    def __init__(self, filename):
+        self.filename = filename
+        self.ids = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.filename):
+            return np.empty(0, dtype=ID_DTYPE)
+        return np.load(self.filename, mmap_mode='r')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, recipe_id):
+        pos = np.searchsorted(self.ids, recipe_id)
+        return pos < len(self.ids) and self.ids[pos] == recipe_id
+
+    def contains(self, recipe_ids):
+        # recipe_ids 각각의 포함 여부 (bool 배열)
+        recipe_ids = np.asarray(recipe_ids, dtype=ID_DTYPE)
+        pos = np.searchsorted(self.ids, recipe_ids)
+        found = pos < len(self.ids)
+        found[found] = self.ids[pos[found]] == recipe_ids[found]
+        return found
+
+    def between(self, low, high):
+        # low <= id <= high 인 ID (오름차순, mmap 의 view 라 복사 없음)
+        start = np.searchsorted(self.ids, low, side='left')
+        end = np.searchsorted(self.ids, high, side='right')
+        return self.ids[start:end]
+
+    def newest(self, k):
+        # 가장 큰 ID 부터 k 개
+        return self.ids[max(0, len(self.ids) - k):][::-1]
+
+    def max_id(self):
+        return int(self.ids[-1]) if len(self.ids) else None
+
+    def merge(self, recipe_ids):
+        # 새로 찾은 ID 를 합쳐서 저장 (임시 파일에 쓴 뒤 rename 으로 교체)
+        new_ids = np.unique(np.asarray(recipe_ids, dtype=ID_DTYPE))
+        new_ids = new_ids[~self.contains(new_ids)]
+        if not len(new_ids):
+            return 0
+
+        merged = np.union1d(self.ids, new_ids).astype(ID_DTYPE)
+        tmp_filename = self.filename + '.tmp.npy'
+        np.save(tmp_filename, merged)
+        self.ids = None  # 교체 전에 기존 mmap 을 닫음
+        os.replace(tmp_filename, self.filename)
+        self.ids = self._load()
+        return len(new_ids)
+
+
+def build_from_text(text_filename, index_filename):
+    # recipe_id.txt (한 줄에 ID 하나) -> 정렬된 uint32 인덱스
+    with open(text_filename, 'r') as fd:
+        recipe_ids = np.array(fd.read().split(), dtype=np.int64)
+    if os.path.exists(index_filename):
+        os.remove(index_filename)
+    index = RecipeIdIndex(index_filename)
+    index.merge(recipe_ids)
+    return index
+
+
+def open_index(index_filename, text_filename=None):
+    # 인덱스가 없고 recipe_id.txt 가 있으면 한 번 변환해서 사용
+    if not os.path.exists(index_filename) and text_filename and os.path.exists(text_filename):
+        print(f"[INFO] Building {index_filename} from {text_filename}")
+        return build_from_text(text_filename, index_filename)
+    return RecipeIdIndex(index_filename)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="recipe ID index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="convert recipe_id.txt into an index")
+    build_parser.add_argument('text_file')
+    build_parser.add_argument('index_file')
+    newest_parser = subparsers.add_parser('newest', help="print the K newest IDs")
+    newest_parser.add_argument('index_file')
+    newest_parser.add_argument('k', type=int)
+    merge_parser = subparsers.add_parser('merge', help="add IDs from a text file")
+    merge_parser.add_argument('index_file')
+    merge_parser.add_argument('text_file')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = build_from_text(args.text_file, args.index_file)
+        print(f"[INFO] {len(index)} IDs saved to {args.index_file}")
+    elif args.command == 'newest':
+        for recipe_id in RecipeIdIndex(args.index_file).newest(args.k):
+            print(recipe_id)
+    else:
+        with open(args.text_file, 'r') as fd:
+            added = RecipeIdIndex(args.index_file).merge(np.array(fd.read().split(), dtype=np.int64))
+        print(f"[INFO] {added} new IDs merged into {args.index_file}")
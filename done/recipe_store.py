@@ -0,0 +1,206 @@
+import ast
+import csv
+import json
+import sqlite3
+import time
+
+from ingredient_normalizer import parse_amount, split_ingredient_text
+
+# 레시피 / 재료 / 카테고리를 recipe_id 기준으로 쌓아두는 SQLite 저장소.
+# 크롤러는 새로 받은 레시피를 바로 upsert 하고, search_category 는 (recipe_id, cat4, cat2) 를 추가만 한다.
+# Recipe_data.csv (레시피 x 카테고리 inner join) 는 recipe_data 뷰로 필요할 때 내보낸다.
+#   recipes            recipe_id PK, 전처리된 필드 (리스트 필드는 JSON)
+#   recipe_ingredients (recipe_id, position) PK, 재료 이름 / 계량 / 수량 / 단위
+#   recipe_categories  (recipe_id, cat4, cat2) PK, (cat4, cat2) 인덱스
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS recipes ("
+    " recipe_id INTEGER PRIMARY KEY,"
+    " name TEXT, image TEXT, author TEXT, date_published TEXT, description TEXT,"
+    " recipe_ingredient TEXT, recipe_instructions TEXT, tags TEXT,"
+    " updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS recipe_ingredients ("
+    " recipe_id INTEGER NOT NULL, position INTEGER NOT NULL,"
+    " name TEXT, amount TEXT, quantity REAL, quantity_max REAL, unit TEXT,"
+    " PRIMARY KEY (recipe_id, position)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS recipe_ingredients_name ON recipe_ingredients (name)",
+    "CREATE TABLE IF NOT EXISTS recipe_categories ("
+    " recipe_id INTEGER NOT NULL, cat4 INTEGER NOT NULL, cat2 INTEGER NOT NULL,"
+    " PRIMARY KEY (recipe_id, cat4, cat2)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS recipe_categories_combination ON recipe_categories (cat4, cat2)",
+    "CREATE VIEW IF NOT EXISTS recipe_data AS"
+    " SELECT r.recipe_id AS RecipeID, r.name, r.image, r.author, r.date_published AS datePublished, r.description,"
+    " r.recipe_ingredient AS recipeIngredient, r.recipe_instructions AS recipeInstructions, r.tags, c.cat4, c.cat2"
+    " FROM recipes r JOIN recipe_categories c ON c.recipe_id = r.recipe_id",
+]
+
+RECIPE_DATA_COLUMNS = ['RecipeID', 'name', 'image', 'author', 'datePublished', 'description',
+                       'recipeIngredient', 'recipeInstructions', 'tags', 'cat4', 'cat2']
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def recipe_row(record):
+    # 크롤러 레코드(JSON-LD + tags + ingredients) -> recipes 행 (preprocess_chunk 와 같은 필드)
+    author = record.get('author')
+    steps = record.get('recipeInstructions') or []
+    return (
+        int(record['recipe_id']),
+        record.get('name'),
+        _json(record.get('image') or []),
+        author.get('name', '') if isinstance(author, dict) else (author or ''),
+        record.get('datePublished'),
+        record.get('description'),
+        _json([split_ingredient_text(item) for item in record.get('recipeIngredient') or []]),
+        _json([(step.get('text', ''), step.get('image', '')) for step in steps if isinstance(step, dict)]),
+        _json(record.get('tags') or []),
+    )
+
+
+def ingredient_rows(record):
+    # 페이지에서 뽑은 ingredients (name / amount) 가 있으면 그것을, 없으면 recipeIngredient 를 나눠서 사용
+    items = record.get('ingredients')
+    if items:
+        pairs = [(item.get('name'), item.get('amount')) for item in items]
+    else:
+        pairs = [split_ingredient_text(item) for item in record.get('recipeIngredient') or []]
+    rows = []
+    for position, (name, amount) in enumerate(pairs):
+        parsed = parse_amount(amount or '')
+        rows.append((int(record['recipe_id']), position, (name or '').strip(), amount, parsed.quantity, parsed.quantity_max, parsed.unit))
+    return rows
+
+
+class RecipeStore:
+    def __init__(self, filename):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+        self.pending = []
+
+    def __call__(self, record):
+        # sink 처럼 레코드를 하나씩 받음 (commit() 때 한 번에 반영)
+        self.pending.append(record)
+
+    def commit(self):
+        if self.pending:
+            self.upsert_recipes(self.pending)
+            self.pending = []
+
+    def upsert_recipes(self, records):
+        now = time.time()
+        records = [record for record in records if record.get('recipe_id') is not None]
+        recipe_ids = [(int(record['recipe_id']),) for record in records]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO recipes (recipe_id, name, image, author, date_published, description,"
+                " recipe_ingredient, recipe_instructions, tags, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(recipe_id) DO UPDATE SET name=excluded.name, image=excluded.image, author=excluded.author,"
+                " date_published=excluded.date_published, description=excluded.description,"
+                " recipe_ingredient=excluded.recipe_ingredient, recipe_instructions=excluded.recipe_instructions,"
+                " tags=excluded.tags, updated_at=excluded.updated_at",
+                [recipe_row(record) + (now,) for record in records],
+            )
+            # 재료는 레시피 단위로 교체
+            self.conn.executemany("DELETE FROM recipe_ingredients WHERE recipe_id = ?", recipe_ids)
+            self.conn.executemany(
+                "INSERT INTO recipe_ingredients (recipe_id, position, name, amount, quantity, quantity_max, unit)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row for record in records for row in ingredient_rows(record)],
+            )
+        return len(records)
+
+    def upsert_categories(self, rows):
+        # rows: (recipe_id, cat4, cat2), 이미 있는 조합은 무시
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO recipe_categories (recipe_id, cat4, cat2) VALUES (?, ?, ?)",
+                ((int(recipe_id), int(cat4), int(cat2)) for recipe_id, cat4, cat2 in rows),
+            )
+        return cursor.rowcount
+
+    def max_recipe_id(self):
+        # recipe_id 는 rowid 이므로 MAX 는 B-tree 의 마지막 항목만 읽음
+        return self.conn.execute("SELECT MAX(recipe_id) FROM recipes").fetchone()[0]
+
+    def recipe_ids_in(self, cat4, cat2):
+        rows = self.conn.execute(
+            "SELECT recipe_id FROM recipe_categories WHERE cat4 = ? AND cat2 = ? ORDER BY recipe_id", (cat4, cat2)
+        )
+        return [row[0] for row in rows]
+
+    def recipes_with_ingredient(self, name):
+        rows = self.conn.execute("SELECT DISTINCT recipe_id FROM recipe_ingredients WHERE name = ? ORDER BY recipe_id", (name,))
+        return [row[0] for row in rows]
+
+    def counts(self):
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('recipes', 'recipe_ingredients', 'recipe_categories')}
+
+    def iter_recipe_data(self, min_recipe_id=None):
+        # recipe_data 뷰를 한 행씩 (min_recipe_id 를 주면 그 이후 레시피만)
+        query = "SELECT * FROM recipe_data"
+        params = ()
+        if min_recipe_id is not None:
+            query += " WHERE RecipeID >= ?"
+            params = (min_recipe_id,)
+        return self.conn.execute(query + " ORDER BY RecipeID, cat4, cat2", params)
+
+    def export_recipe_data(self, csv_filename, min_recipe_id=None):
+        # 기존 Recipe_data.csv 와 같은 형식 (리스트 필드는 Python repr)
+        row_count = 0
+        with open(csv_filename, mode='w', newline='', encoding='utf-8-sig') as fd:
+            writer = csv.writer(fd)
+            writer.writerow(RECIPE_DATA_COLUMNS)
+            for row in self.iter_recipe_data(min_recipe_id):
+                row = list(row)
+                row[2] = str(json.loads(row[2]))
+                row[6] = str([tuple(item) for item in json.loads(row[6])])
+                row[7] = str([tuple(item) for item in json.loads(row[7])])
+                row[8] = str(json.loads(row[8]))
+                writer.writerow(row)
+                row_count += 1
+        print(f"Data saved to {csv_filename} ({row_count} rows)")
+        return row_count
+
+    def import_preprocessed_csv(self, csv_filename, encoding='utf-8-sig', batch_size=5000):
+        # preprocessing_recipes 가 만든 CSV (recipe_id, name, image, author, ... ) 를 가져옴
+        def literal(value):
+            try:
+                return ast.literal_eval(value) if value else []
+            except (ValueError, SyntaxError):
+                return []
+
+        def to_record(row):
+            return {
+                'recipe_id': row['recipe_id'],
+                'name': row.get('name'),
+                'image': literal(row.get('image')),
+                'author': {'name': row.get('author') or ''},
+                'datePublished': row.get('datePublished'),
+                'description': row.get('description'),
+                'recipeIngredient': [' '.join(part for part in item if part) for item in literal(row.get('recipeIngredient'))],
+                'recipeInstructions': [{'text': text, 'image': image} for text, image in literal(row.get('recipeInstructions'))],
+                'tags': literal(row.get('tags')),
+            }
+
+        imported = 0
+        with open(csv_filename, newline='', encoding=encoding) as fd:
+            batch = []
+            for row in csv.DictReader(fd):
+                batch.append(to_record(row))
+                if len(batch) >= batch_size:
+                    imported += self.upsert_recipes(batch)
+                    batch = []
+            imported += self.upsert_recipes(batch)
+        return imported
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,155 @@
+import csv
+import glob
+import gzip
+import json
+import os
+
+# 레시피 레코드를 gzip 으로 압축한 JSONL shard 로 나눠서 바로바로 기록하는 sink.
+#   recipes_shards/
+#     part-00000.jsonl.gz
+#     part-00001.jsonl.gz
+#     part-00002.jsonl.gz.tmp   <- 아직 커밋되지 않은 shard
+#     _schema.json              <- 지금까지 나온 모든 레코드의 필드 합집합
+# shard 는 .tmp 로 쓰다가 shard_records 개가 차면 fsync 후 rename 으로 커밋한다.
+# 커밋된 shard 의 recipe_id 목록은 on_commit 으로 넘겨서 저널에 완료 표시를 한다.
+
+SHARD_PATTERN = 'part-*.jsonl.gz'
+SCHEMA_FILENAME = '_schema.json'
+
+
+def _json_type(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, list):
+        return 'list'
+    if isinstance(value, dict):
+        return 'struct'
+    return type(value).__name__
+
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fd:
+        fd.write(data)
+        fd.flush()
+        os.fsync(fd.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_schema(directory):
+    # {'fields': [필드 이름 (처음 나온 순서)], 'types': {필드 이름: [값 타입]}}
+    path = os.path.join(directory, SCHEMA_FILENAME)
+    if not os.path.exists(path):
+        return {'fields': [], 'types': {}}
+    with open(path, encoding='utf-8') as fd:
+        return json.load(fd)
+
+
+def shard_paths(directory):
+    return sorted(glob.glob(os.path.join(directory, SHARD_PATTERN)))
+
+
+class ShardedJsonlSink:
+    def __init__(self, directory, shard_records=2000, on_commit=None, append=False, compresslevel=6):
+        self.directory = directory
+        self.shard_records = shard_records
+        self.on_commit = on_commit
+        self.compresslevel = compresslevel
+        os.makedirs(directory, exist_ok=True)
+
+        # append=False 이면 이전 실행의 결과를 지우고 새로 시작
+        if not append:
+            for path in shard_paths(directory) + [os.path.join(directory, SCHEMA_FILENAME)]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        # 이전 실행에서 커밋되지 못한 shard 는 버림 (해당 ID 는 저널에 완료로 남지 않았으므로 다시 처리됨)
+        for tmp_path in glob.glob(os.path.join(directory, SHARD_PATTERN + '.tmp')):
+            os.remove(tmp_path)
+
+        existing = shard_paths(directory)
+        self.next_index = int(os.path.basename(existing[-1])[5:10]) + 1 if existing else 0
+        self.schema = load_schema(directory)
+        self.known_types = {field: set(types) for field, types in self.schema['types'].items()}
+        self.fd = None
+        self.tmp_path = None
+        self.pending_ids = []
+        self.record_count = 0
+
+    def _open_shard(self):
+        self.tmp_path = os.path.join(self.directory, f'part-{self.next_index:05d}.jsonl.gz.tmp')
+        self.fd = gzip.open(self.tmp_path, 'wt', encoding='utf-8', compresslevel=self.compresslevel)
+
+    def _update_schema(self, record):
+        for field, value in record.items():
+            types = self.known_types.get(field)
+            if types is None:
+                types = self.known_types[field] = set()
+                self.schema['fields'].append(field)
+            types.add(_json_type(value))
+
+    def __call__(self, record):
+        if self.fd is None:
+            self._open_shard()
+        self.fd.write(json.dumps(record, ensure_ascii=False))
+        self.fd.write('\n')
+        self._update_schema(record)
+        self.pending_ids.append(record.get('recipe_id'))
+        self.record_count += 1
+        if len(self.pending_ids) >= self.shard_records:
+            self.commit()
+
+    def commit(self):
+        if self.fd is None:
+            return
+        self.fd.close()
+        with open(self.tmp_path, 'rb') as fd:
+            os.fsync(fd.fileno())
+        os.replace(self.tmp_path, self.tmp_path[:-len('.tmp')])
+
+        self.schema['types'] = {field: sorted(types) for field, types in self.known_types.items()}
+        _write_atomic(os.path.join(self.directory, SCHEMA_FILENAME), json.dumps(self.schema, ensure_ascii=False, indent=2))
+
+        committed_ids, self.pending_ids = self.pending_ids, []
+        self.fd = None
+        self.tmp_path = None
+        self.next_index += 1
+        if self.on_commit is not None:
+            self.on_commit([recipe_id for recipe_id in committed_ids if recipe_id is not None])
+
+    def close(self):
+        self.commit()
+        print(f"[INFO] {self.record_count} records saved to {self.directory}")
+
+
+def iter_records(directory):
+    for path in shard_paths(directory):
+        with gzip.open(path, 'rt', encoding='utf-8') as fd:
+            for line in fd:
+                yield json.loads(line)
+
+
+def export_csv(directory, csv_filename):
+    # 모든 shard 를 합집합 스키마의 컬럼으로 CSV 변환 (레코드를 한 줄씩 읽어서 씀)
+    fields = load_schema(directory)['fields']
+    with open(csv_filename, mode='w', newline='', encoding='utf-8-sig') as fd:
+        writer = csv.DictWriter(fd, fieldnames=fields)
+        writer.writeheader()
+        for record in iter_records(directory):
+            writer.writerow(record)
+    print(f"Data saved to {csv_filename}")
+
+
+def export_records(directory, filename):
+    # 확장자로 출력 형식 선택 (.parquet 이면 리스트/구조체 컬럼을 가진 Parquet, 그 외는 CSV)
+    if filename.endswith('.parquet'):
+        from columnar_store import export_parquet
+        export_parquet(iter_records(directory), filename)
+    else:
+        export_csv(directory, filename)
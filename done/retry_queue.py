@@ -0,0 +1,84 @@
+import asyncio
+import heapq
+import random
+import time
+from collections import Counter
+
+# 일시적인 요청 실패(타임아웃 / 연결 끊김 / 429 / 5xx)를 다시 시도하는 대기열.
+# 실패한 ID 는 시도 횟수에 따라 지수적으로 늘어나는 시간(base_delay * 2^(n-1), 최대 max_delay)의
+# 절반 + 나머지 절반 안에서 랜덤(jitter)만큼 기다린 뒤 get() 으로 나온다.
+# 새 ID 를 처리하는 워커와 따로 돌아가므로 재시도를 기다리는 동안 새 작업이 멈추지 않는다.
+# max_attempts 번 실패한 ID 는 gave_up 에 남긴다. 실패 이유별 횟수는 reasons 에 모은다.
+
+
+class RetryQueue:
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.heap = []  # (다시 시도할 시각, recipe_id)
+        self.attempts = {}  # recipe_id -> 실패 횟수
+        self.reasons = Counter()
+        self.recovered = 0  # 재시도해서 결과를 얻은 ID 수
+        self.gave_up = []
+        self.unfinished = 0  # schedule() 됐지만 아직 task_done() 되지 않은 ID 수
+        self.changed = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.finished.set()
+
+    def __len__(self):
+        return self.unfinished
+
+    def note(self, reason):
+        # 재시도 대상이 아닌 결과(레시피 없음 등)도 이유별 횟수에 포함
+        self.reasons[reason] += 1
+
+    def backoff(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def schedule(self, recipe_id, reason):
+        # 다시 시도하면 True, 시도 횟수를 다 써서 포기하면 False
+        self.note(reason)
+        attempt = self.attempts.get(recipe_id, 0) + 1
+        self.attempts[recipe_id] = attempt
+        if attempt >= self.max_attempts:
+            self.reasons['gave_up'] += 1
+            self.gave_up.append(recipe_id)
+            return False
+        heapq.heappush(self.heap, (time.monotonic() + self.backoff(attempt), recipe_id))
+        self.unfinished += 1
+        self.finished.clear()
+        self.changed.set()
+        return True
+
+    def done(self, recipe_id):
+        # 실패했던 ID 가 결과(레시피 / 레시피 없음)를 얻음
+        if self.attempts.pop(recipe_id, None) is not None:
+            self.recovered += 1
+
+    async def get(self):
+        # 가장 먼저 다시 시도할 ID 를 그 시각까지 기다렸다가 돌려줌
+        while True:
+            if self.heap:
+                wait = self.heap[0][0] - time.monotonic()
+                if wait <= 0:
+                    return heapq.heappop(self.heap)[1]
+            else:
+                wait = None
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(self.changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def task_done(self):
+        self.unfinished -= 1
+        if self.unfinished == 0:
+            self.finished.set()
+
+    async def join(self):
+        await self.finished.wait()
+
+    def summary(self):
+        return f"failures by reason {dict(self.reasons)}, {self.recovered} recovered after retry, {len(self.gave_up)} gave up"
@@ -0,0 +1,124 @@
+import ast
+import csv
+import html
+import json
+
+# 저장된 크롤링 결과(recent_recipes.csv)로 10000recipe 레시피 페이지와 비슷한 HTML 을 만든다.
+# 추출기 벤치마크와 로컬 테스트 서버에서 실제 사이트 대신 사용한다.
+
+JSON_LD_FIELDS = ['@context', '@type', 'name', 'image', 'author', 'datePublished', 'description',
+                  'totalTime', 'recipeYield', 'recipeIngredient', 'recipeInstructions', 'aggregateRating']
+
+# 실제 페이지처럼 앞뒤로 붙는 메뉴/광고 영역
+FILLER_BLOCK = '''<div class="gnb_menu"><ul class="gnb_list">
+<li class="gnb_item"><a href="/recipe/list.html">레시피분류</a></li>
+<li class="gnb_item"><a href="/ranking/home_new.html">랭킹</a></li>
+<li class="gnb_item"><a href="/chef/chef_list.html">셰프</a></li>
+</ul><div class="ad_area"><script>var adSlot = {"id": 1, "size": [300, 250]};</script><img src="/img/ad.png"></div></div>
+'''
+
+
+def _literal(value):
+    if not value:
+        return None
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def load_sample_records(csv_filename, limit=None):
+    records = []
+    with open(csv_filename, newline='', encoding='utf-8-sig') as fd:
+        for row in csv.DictReader(fd):
+            record = {'recipe_id': int(row['recipe_id'])}
+            for key, value in row.items():
+                if key == 'recipe_id':
+                    continue
+                if key in ('image', 'author', 'recipeIngredient', 'recipeInstructions', 'tags', 'ingredients', 'aggregateRating'):
+                    value = _literal(value)
+                if value not in (None, ''):
+                    record[key] = value
+            records.append(record)
+            if limit is not None and len(records) >= limit:
+                break
+    return records
+
+
+def render_recipe_page(record, filler_blocks=40, with_json_ld=True):
+    # with_json_ld=False: JSON-LD 를 스크립트로 나중에 넣는 페이지처럼 원본 HTML 에는 JSON-LD 가 없음
+    json_ld = {key: record[key] for key in JSON_LD_FIELDS if key in record}
+    tags = ''.join(f'<a href="/recipe/list.html?q={html.escape(tag.lstrip("#"))}">{html.escape(tag)}</a>\n'
+                   for tag in record.get('tags') or [])
+    ingredients = ''.join(
+        f'<li>\n<div class="ingre_list_name"><a href="javascript:viewMaterial(\'{i}\');">{html.escape(item["name"])}</a></div>\n'
+        f'<span class="ingre_list_ea">{html.escape(item["amount"])}</span>\n</li>\n'
+        for i, item in enumerate(record.get('ingredients') or [])
+    )
+    filler = FILLER_BLOCK * (filler_blocks // 2)
+    json_ld_script = f'<script type="application/ld+json">{json.dumps(json_ld, ensure_ascii=False)}</script>' if with_json_ld else ''
+    return f'''<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(str(record.get('name', '')))}</title>
+{json_ld_script}
+</head>
+<body>
+{filler}
+<div id="contents_area" class="col-xs-9">
+<div class="view2_summary"><h3>{html.escape(str(record.get('name', '')))}</h3></div>
+<div class="ready_ingre3" id="divConfirmedMaterialArea">
+<ul><b class="ready_ingre3_tt">[재료]</b>
+{ingredients}</ul>
+</div>
+<div class="view_tag">
+{tags}</div>
+</div>
+{filler}
+</body>
+</html>
+'''.encode('utf-8')
+
+
+def render_not_found_page():
+    return '''<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>만개의레시피</title></head>
+<body>
+<div class="alert alert-danger">레시피 정보가 없습니다.</div>
+<script>alert('레시피 정보가 없습니다.'); history.back();</script>
+</body>
+</html>
+'''.encode('utf-8')
+
+
+# 재료 정보 ajax (/bbs/ajax.html?q_mode=getMaterialContents&seq=) 응답과 비슷한 JSON
+MATERIAL_NAMES = ['양파', '당근', '감자', '대파', '마늘', '애호박', '두부', '돼지고기', '달걀', '표고버섯', '배추', '고등어']
+
+
+def render_material_response(seq, revision=0):
+    # revision 이 바뀌면 10 으로 나누어떨어지는 seq 의 구입 요령이 바뀜 (변경 감지 확인용)
+    name = MATERIAL_NAMES[seq % len(MATERIAL_NAMES)]
+    purchase_tip = f'{name}은(는) 단단하고 윤기가 있는 것을 고른다.'
+    if revision and seq % 10 == 0:
+        purchase_tip += f' (개정 {revision})'
+    efficacy = ''.join(f'<a href="/recipe/list.html?q={tag}">{tag}</a>' for tag in ['피로회복', '면역력'][:1 + seq % 2])
+    fragment = f'''<div class="ingredient_top">
+<div class="ingredient_pic" style="background:url(https://recipe1.ezmember.co.kr/img/mobile/ingredient/{seq}.jpg) center no-repeat; background-size:cover;"></div>
+<div class="ingredient_tit">{html.escape(name)}</div>
+</div>
+<table class="ingredient_info">
+<tr><th>제철</th><td>{3 + seq % 9}~{5 + seq % 7}월</td></tr>
+<tr><th>보관온도</th><td>{seq % 10}℃</td></tr>
+<tr><th>칼로리</th><td>{20 + seq % 300}kcal (100g)</td></tr>
+<tr><th>궁합음식</th><td>{MATERIAL_NAMES[(seq + 1) % len(MATERIAL_NAMES)]}</td></tr>
+<tr><th>상극음식</th><td>{MATERIAL_NAMES[(seq + 5) % len(MATERIAL_NAMES)]}</td></tr>
+</table>
+<dl class="ingredient_cont ingredient_cont_tag"><dt>효능</dt><dd>{efficacy}</dd></dl>
+<dl class="ingredient_cont"><dt>구입요령</dt><dd>{html.escape(purchase_tip)}</dd></dl>
+<dl class="ingredient_cont"><dt>손질법</dt><dd>흐르는 물에 씻어 물기를 뺀다.</dd></dl>
+<dl class="ingredient_cont"><dt>조리법</dt><dd>볶음, 찌개, 국에 넣는다.</dd></dl>
+<dl class="ingredient_cont"><dt>보관법</dt><dd>신문지에 싸서 서늘한 곳에 둔다.</dd></dl>
+'''
+    return json.dumps({'result': 'SUCCESS', 'mname': name, 'html': fragment}, ensure_ascii=False).encode('utf-8')
@@ -1,10 +1,15 @@
-import requests
+import asyncio
+import aiohttp
+from aiohttp import ClientSession, TCPConnector
+import argparse
+import csv
+import os
 from bs4 import BeautifulSoup
 import re
-import pandas as pd
-from collections import defaultdict
 import time
-import random
+from category_store import CategoryStore
+from rate_controller import RateController, parse_retry_after
+from recipe_store import RecipeStore
 
 # 카테고리별 value 값 저장
 category_values = {
@@ -48,79 +53,204 @@ category_values = {
 min_recipe_id = 7018267  # 최소 레시피 ID
 max_recipe_id = 7028266  # 최대 레시피 ID
 
+baseUrl = "https://www.10000recipe.com/recipe/list.html"
+
 # 지정된 selector
 selector = "#contents_area_full > ul > ul > li > div.common_sp_thumb > a"
 
+maxConcurrency = 16  # 동시에 보내는 최대 요청 수 (전체 조합 합계)
+requestsPerSecond = 10  # 전체 조합이 나눠 쓰는 초당 요청 수 상한 (응답이 정상인 동안 이 값까지 올림)
+initialRate = 2.0  # 처음 초당 요청 수
+maxRetries = 3  # 429 / 5xx 응답이나 네트워크 오류 / 타임아웃이 난 페이지를 다시 요청하는 횟수
+outputFilename = './recipe_cat_ids.csv'
+failedFilename = './failed_combinations.csv'  # 재시도 후에도 실패한 (cat4, cat2, 페이지) -> --retry-failed 로 그 페이지부터 다시 크롤링
+
 # 사용자 에이전트 설정
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-# 크롤링 함수
-def crawl_recipes(min_recipe_id, max_recipe_id):
-    base_url = "https://www.10000recipe.com/recipe/list.html"
-    recipe_ids = defaultdict(lambda: {'categories': []})
-
-    cat4_values = category_values["종류별"]
-    cat2_values = category_values["상황별"]
-
-    for cat4_value, cat4_name in cat4_values.items():
-        for cat2_value, cat2_name in cat2_values.items():
-            page = 1
-            while True:
-                url = f"{base_url}?cat4={cat4_value}&cat2={cat2_value}&order=date&page={page}"
-
-                response = requests.get(url, headers=headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                # selector를 사용하여 레시피 링크 추출
-                links = soup.select(selector)
-                if not links:
-                    break  # 링크가 더 이상 없으면 종료
-
-                stop_crawling = False
-                current_page_recipe_count = 0
-                for link in links:
-                    # 레시피 ID 추출 (링크에서 ID를 추출하는 예제)
-                    match = re.search(r'recipe/(\d+)', link['href'])
-                    if match:
-                        recipe_id = int(match.group(1))  # 레시피 ID를 정수로 변환
-                        if recipe_id < min_recipe_id:  # 레시피 ID가 최소값보다 작으면 크롤링 중단
-                            stop_crawling = True
-                            break
-                        if recipe_id <= max_recipe_id:  # 레시피 ID가 최대값보다 작거나 같으면 저장
-                            category_combination = (cat4_value, cat2_value)
-                            if category_combination not in recipe_ids[recipe_id]['categories']:
-                                recipe_ids[recipe_id]['categories'].append(category_combination)
-                            current_page_recipe_count += 1
-                        # 7028266보다 큰 경우는 저장하지 않지만 계속 크롤링
-
-                print(f"{cat4_name} - {cat2_name} 조합 - 페이지 {page}에서 {current_page_recipe_count}개의 데이터를 크롤링했습니다. 현재까지 수집된 레시피 수: {len(recipe_ids)}")
-
-                if stop_crawling:
-                    break
-
-                page += 1
+def parse_recipe_ids(page_source):
+    # selector를 사용하여 레시피 링크 추출 후 링크에서 레시피 ID 추출
+    soup = BeautifulSoup(page_source, 'html.parser')
+    recipe_ids = []
+    for link in soup.select(selector):
+        match = re.search(r'recipe/(\d+)', link.get('href', ''))
+        if match:
+            recipe_ids.append(int(match.group(1)))
+    return recipe_ids
 
+async def fetch_page(session, rate, url):
+    # 모든 조합이 같은 속도 조절기를 공유, 429 / 5xx 응답이면 None
+    await rate.acquire()
+    start = time.monotonic()
+    try:
+        async with session.get(url, headers=headers) as response:
+            rate.report(response.status, time.monotonic() - start, retry_after=parse_retry_after(response.headers.get('Retry-After')))
+            if response.status == 429 or response.status >= 500:
+                return None
+            return await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        rate.report(error=True)
+        raise
 
-    return recipe_ids
+async def crawl_combination(session, rate, cat4_value, cat2_value, min_recipe_id, max_recipe_id, on_row, failed, start_page=1):
+    # 한 (cat4, cat2) 조합을 최신순으로 페이지를 넘기면서 min_recipe_id 보다 작은 ID 가 나오면 중단
+    # 재시도 후에도 받지 못한 페이지는 failed 에 (cat4, cat2, 페이지) 로 남김
+    cat4_name = category_values["종류별"][cat4_value]
+    cat2_name = category_values["상황별"][cat2_value]
+    page = start_page
+    found = 0
+    retries = 0
+    while True:
+        url = f"{baseUrl}?cat4={cat4_value}&cat2={cat2_value}&order=date&page={page}"
+        try:
+            page_source = await fetch_page(session, rate, url)
+            error = None if page_source is not None else "429 / 5xx"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            page_source = None
+            error = repr(e)
+        if page_source is None:
+            # 서버가 요청을 제한했거나 네트워크 오류: 속도 조절기가 속도를 줄였으므로 같은 페이지를 다시 요청
+            retries += 1
+            if retries > maxRetries:
+                print(f"[ERROR] {cat4_name} - {cat2_name} 조합 - 페이지 {page} 요청 실패: 재시도 {maxRetries}회 초과 ({error})")
+                failed.append((cat4_value, cat2_value, page))
+                break
+            continue
+        retries = 0
+
+        # HTML 파싱은 스레드에서 처리해서 다른 조합의 요청을 막지 않음
+        recipe_ids = await asyncio.to_thread(parse_recipe_ids, page_source)
+        if not recipe_ids:
+            break  # 링크가 더 이상 없으면 종료
+
+        stop_crawling = False
+        current_page_recipe_count = 0
+        for recipe_id in recipe_ids:
+            if recipe_id < min_recipe_id:  # 레시피 ID가 최소값보다 작으면 크롤링 중단
+                stop_crawling = True
+                break
+            if recipe_id <= max_recipe_id:  # 레시피 ID가 최대값보다 작거나 같으면 바로 내보냄
+                on_row(recipe_id, cat4_value, cat2_value)
+                current_page_recipe_count += 1
+            # max_recipe_id 보다 큰 경우는 저장하지 않지만 계속 크롤링
+
+        found += current_page_recipe_count
+        print(f"{cat4_name} - {cat2_name} 조합 - 페이지 {page}에서 {current_page_recipe_count}개의 데이터를 크롤링했습니다.")
+
+        if stop_crawling:
+            break
+
+        page += 1
+    return found
+
+async def crawl_recipes(min_recipe_id, max_recipe_id, on_row, concurrency=maxConcurrency, rate=requestsPerSecond, start_pages=None):
+    # 221 개 (cat4, cat2) 조합을 동시에 크롤링 (커넥션은 하나의 세션에서 재사용)
+    # start_pages 가 있으면 {(cat4, cat2): 시작 페이지} 에 있는 조합만 크롤링
+    if start_pages is None:
+        start_pages = {(cat4_value, cat2_value): 1 for cat4_value in category_values["종류별"] for cat2_value in category_values["상황별"]}
+    failed = []
+    connector = TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+    # rate 는 상한, 처음에는 initialRate 로 시작해서 응답이 정상인 동안 올림
+    rate_controller = RateController(min(initialRate, rate), max_rate=rate)
+    async with ClientSession(connector=connector, timeout=timeout) as session:
+        tasks = [
+            crawl_combination(session, rate_controller, cat4_value, cat2_value, min_recipe_id, max_recipe_id, on_row, failed, start_page)
+            for (cat4_value, cat2_value), start_page in start_pages.items()
+        ]
+        found = sum(await asyncio.gather(*tasks))
+    print(f"[INFO] Rate controller: {rate_controller.stats()}")
+    return found, sorted(failed)
+
+def read_failed_combinations(filename):
+    # {(cat4, cat2): 실패한 페이지}
+    with open(filename, newline='', encoding='utf-8') as fd:
+        return {(int(row['cat4']), int(row['cat2'])): int(row['page']) for row in csv.DictReader(fd)}
+
+def write_failed_combinations(filename, failed):
+    # 실패한 조합이 없으면 이전 실패 목록을 지움
+    if not failed:
+        if os.path.exists(filename):
+            os.remove(filename)
+        return
+    with open(filename, mode='w', newline='', encoding='utf-8') as fd:
+        writer = csv.writer(fd)
+        writer.writerow(['cat4', 'cat2', 'page'])
+        writer.writerows(failed)
+    print(f"[ERROR] {len(failed)} combinations failed, saved to {filename} (rerun with --retry-failed)")
+
+def load_previous_rows(output_filename, store):
+    # --retry-failed: 이전 실행의 결과를 저장소에 다시 넣어 중복 행을 막음
+    if output_filename.endswith('.parquet'):
+        import pandas as pd
+        rows = pd.read_parquet(output_filename).itertuples(index=False)
+    else:
+        with open(output_filename, newline='', encoding='utf-8') as fd:
+            rows = [tuple(map(int, row)) for row in list(csv.reader(fd))[1:]]
+    for recipe_id, cat4_value, cat2_value in rows:
+        store.add(int(recipe_id), (int(cat4_value), int(cat2_value)))
+
+def main(min_recipe_id, max_recipe_id, output_filename, concurrency=maxConcurrency, rate=requestsPerSecond, store_filename=None,
+         failed_filename=failedFilename, retry_failed=False):
+    startTime = time.monotonic()
+    # 레시피별 조합 소속은 비트셋으로 저장 (중복 확인 O(1))
+    combinations = [(cat4_value, cat2_value) for cat4_value in category_values["종류별"] for cat2_value in category_values["상황별"]]
+    store = CategoryStore(combinations)
+
+    start_pages = None
+    if retry_failed:
+        # 지난 실행에서 실패한 조합만 실패한 페이지부터 다시 크롤링하고 결과는 이어서 기록
+        if not os.path.exists(failed_filename):
+            print(f"[INFO] {failed_filename} not found, nothing to retry")
+            return store
+        start_pages = read_failed_combinations(failed_filename)
+        print(f"[INFO] Retrying {len(start_pages)} failed combinations from {failed_filename}")
+        if os.path.exists(output_filename):
+            load_previous_rows(output_filename, store)
+    resume = retry_failed and os.path.exists(output_filename)
+
+    if output_filename.endswith('.parquet'):
+        # Parquet 은 크롤링이 끝난 뒤 저장소에서 바로 컬럼으로 내보냄
+        on_row = lambda recipe_id, cat4_value, cat2_value: store.add(recipe_id, (cat4_value, cat2_value))
+        _, failed = asyncio.run(crawl_recipes(min_recipe_id, max_recipe_id, on_row, concurrency, rate, start_pages))
+        store.to_frame().to_parquet(output_filename, index=False)
+    else:
+        # 찾은 (RecipeID, cat4, cat2) 는 모아두지 않고 바로 CSV 에 기록
+        with open(output_filename, mode='a' if resume else 'w', newline='', encoding='utf-8') as fd:
+            writer = csv.writer(fd)
+            if not resume:
+                writer.writerow(['RecipeID', 'cat4', 'cat2'])
+
+            def on_row(recipe_id, cat4_value, cat2_value):
+                if store.add(recipe_id, (cat4_value, cat2_value)):
+                    writer.writerow((recipe_id, cat4_value, cat2_value))
 
-# 크롤링 실행
-recipe_ids = crawl_recipes(min_recipe_id, max_recipe_id)
+            _, failed = asyncio.run(crawl_recipes(min_recipe_id, max_recipe_id, on_row, concurrency, rate, start_pages))
+    write_failed_combinations(failed_filename, failed)
 
-# 수집된 데이터를 DataFrame으로 변환
-data = []
-for recipe_id, info in recipe_ids.items():
-    for cat4_value, cat2_value in info['categories']:
-        data.append({
-            'RecipeID': recipe_id,
-            'cat4': cat4_value,
-            'cat2': cat2_value
-        })
+    if store_filename:
+        # 레시피 저장소에 (recipe_id, cat4, cat2) 추가 (이미 있는 조합은 무시)
+        recipe_store = RecipeStore(store_filename)
+        added = recipe_store.upsert_categories(store.to_frame().itertuples(index=False))
+        recipe_store.close()
+        print(f"[INFO] {added} new category rows added to {store_filename}")
 
-df = pd.DataFrame(data)
+    print(f"[INFO] {int(store.membership().sum())} rows ({len(store)} recipes) in {time.monotonic() - startTime:.1f}s")
+    print("CSV 파일로 저장되었습니다." if output_filename.endswith('.csv') else f"Data saved to {output_filename}")
+    return store
 
-# CSV 파일로 저장
-df.to_csv('./recipe_cat_ids.csv', index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--min-id', type=int, default=min_recipe_id)
+    parser.add_argument('--max-id', type=int, default=max_recipe_id)
+    parser.add_argument('--concurrency', type=int, default=maxConcurrency, help="max in-flight requests across all combinations")
+    parser.add_argument('--rate', type=float, default=requestsPerSecond, help="upper bound for the shared adaptive request rate (requests per second)")
+    parser.add_argument('--output', default=outputFilename)
+    parser.add_argument('--store', help="recipe store (SQLite) to add the category rows to")
+    parser.add_argument('--failed', default=failedFilename, help="where combinations that still fail after retries are saved")
+    parser.add_argument('--retry-failed', action='store_true', help="crawl only the combinations saved in --failed, appending to --output")
+    args = parser.parse_args()
 
-print("CSV 파일로 저장되었습니다.")
\ No newline at end of file
+    main(args.min_id, args.max_id, args.output, args.concurrency, args.rate, args.store, args.failed, args.retry_failed)
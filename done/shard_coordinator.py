@@ -0,0 +1,293 @@
+import argparse
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+from record_sink import ShardedJsonlSink, export_records, iter_records
+
+# 레시피 ID 공간을 shard(shard_size 개 ID)로 나누고, 여러 워커 프로세스 / 노드에 시간 제한이 있는 lease 로 나눠주는 코디네이터.
+#   - plan(): [low, high] 를 큰 ID 부터 빈틈 / 겹침 없이 shard 로 나눔 (shard 0 이 가장 큰 ID 쪽)
+#   - claim(): 대기 중이거나 lease 가 만료된 shard 하나를 가져감 (죽은 워커의 shard 는 만료되면 다른 워커가 가져감)
+#   - renew(): 크롤링하는 동안 lease 연장, complete(): 출력 디렉터리를 기록하고 완료
+# lease 를 줄 때마다 token 을 올리므로, 만료된 뒤에 돌아온 워커의 renew / complete 는 거절된다.
+# 저장소는 같은 메서드를 가진 객체면 된다: SqliteLeaseStore (여러 프로세스 / 노드가 공유하는 파일), MemoryLeaseStore (한 프로세스 안에서 테스트용).
+# merge_outputs() 는 완료된 shard 의 출력을 shard 순서, shard 안에서는 recipe_id 내림차순으로 합쳐서 실행 순서와 무관한 같은 결과를 만든다.
+#   python shard_coordinator.py plan --low 6000000 --high 7028266 --shard-size 10000
+#   python fast_version.py --coordinator coordinator.db          (노드 / 프로세스마다 실행)
+#   python shard_coordinator.py status
+#   python shard_coordinator.py merge --output recipes.csv --store recipes.db
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+
+FAILED_FILENAME = 'failed_ids.txt'  # shard 출력 디렉터리 안에 재시도 후에도 받지 못한 ID 목록
+
+Lease = collections.namedtuple('Lease', ['shard_id', 'low', 'high', 'token'])
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS shards ("
+    " shard_id INTEGER PRIMARY KEY,"
+    " low INTEGER NOT NULL, high INTEGER NOT NULL,"
+    " state TEXT NOT NULL,"
+    " worker TEXT, token INTEGER NOT NULL DEFAULT 0, lease_until REAL,"
+    " output TEXT, updated_at REAL)"
+)
+SHARD_COLUMNS = ['shard_id', 'low', 'high', 'state', 'worker', 'token', 'lease_until', 'output', 'updated_at']
+
+
+class SqliteLeaseStore:
+    def __init__(self, filename, busy_timeout=30):
+        # 여러 노드가 네트워크 파일시스템으로 공유할 수 있도록 WAL 대신 기본 rollback journal 사용
+        # claim 은 BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡고 확인 + 변경을 한 트랜잭션에서 처리
+        self.conn = sqlite3.connect(filename, timeout=busy_timeout, isolation_level=None)
+        self.conn.execute(SCHEMA)
+
+    def add_shards(self, shards, now):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO shards (shard_id, low, high, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(shard_id, low, high, PENDING, now) for shard_id, low, high in shards],
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def shards(self):
+        rows = self.conn.execute(f"SELECT {', '.join(SHARD_COLUMNS)} FROM shards ORDER BY shard_id")
+        return [dict(zip(SHARD_COLUMNS, row)) for row in rows]
+
+    def claim(self, worker, now, lease_seconds):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT shard_id, low, high, token FROM shards"
+                " WHERE state = ? OR (state = ? AND lease_until < ?) ORDER BY shard_id LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            shard_id, low, high, token = row
+            self.conn.execute(
+                "UPDATE shards SET state = ?, worker = ?, token = ?, lease_until = ?, updated_at = ? WHERE shard_id = ?",
+                (LEASED, worker, token + 1, now + lease_seconds, now, shard_id),
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return Lease(shard_id, low, high, token + 1)
+
+    def _update_lease(self, lease, assignments, params):
+        cursor = self.conn.execute(
+            f"UPDATE shards SET {assignments} WHERE shard_id = ? AND token = ? AND state = ?",
+            params + (lease.shard_id, lease.token, LEASED),
+        )
+        return cursor.rowcount == 1
+
+    def renew(self, lease, now, lease_seconds):
+        return self._update_lease(lease, "lease_until = ?, updated_at = ?", (now + lease_seconds, now))
+
+    def complete(self, lease, output, now):
+        return self._update_lease(lease, "state = ?, output = ?, lease_until = NULL, updated_at = ?", (DONE, output, now))
+
+    def release(self, lease, now):
+        return self._update_lease(lease, "state = ?, worker = NULL, lease_until = NULL, updated_at = ?", (PENDING, now))
+
+    def close(self):
+        self.conn.close()
+
+
+class MemoryLeaseStore:
+    # SqliteLeaseStore 와 같은 동작을 dict 로 (한 프로세스 안의 여러 워커 / 테스트용)
+    def __init__(self):
+        self.rows = {}
+        self.lock = threading.Lock()
+
+    def add_shards(self, shards, now):
+        with self.lock:
+            for shard_id, low, high in shards:
+                self.rows.setdefault(shard_id, {'shard_id': shard_id, 'low': low, 'high': high, 'state': PENDING, 'worker': None,
+                                                'token': 0, 'lease_until': None, 'output': None, 'updated_at': now})
+
+    def shards(self):
+        with self.lock:
+            return [dict(self.rows[shard_id]) for shard_id in sorted(self.rows)]
+
+    def claim(self, worker, now, lease_seconds):
+        with self.lock:
+            for shard_id in sorted(self.rows):
+                row = self.rows[shard_id]
+                if row['state'] == PENDING or (row['state'] == LEASED and row['lease_until'] < now):
+                    row.update(state=LEASED, worker=worker, token=row['token'] + 1, lease_until=now + lease_seconds, updated_at=now)
+                    return Lease(shard_id, row['low'], row['high'], row['token'])
+            return None
+
+    def _update_lease(self, lease, **changes):
+        with self.lock:
+            row = self.rows.get(lease.shard_id)
+            if row is None or row['token'] != lease.token or row['state'] != LEASED:
+                return False
+            row.update(changes)
+            return True
+
+    def renew(self, lease, now, lease_seconds):
+        return self._update_lease(lease, lease_until=now + lease_seconds, updated_at=now)
+
+    def complete(self, lease, output, now):
+        return self._update_lease(lease, state=DONE, output=output, lease_until=None, updated_at=now)
+
+    def release(self, lease, now):
+        return self._update_lease(lease, state=PENDING, worker=None, lease_until=None, updated_at=now)
+
+    def close(self):
+        pass
+
+
+class ShardCoordinator:
+    def __init__(self, store, lease_seconds=300, clock=time.time):
+        # 노드 사이에서 비교하는 시각이므로 time.time (노드 간 시계 차이보다 lease_seconds 를 충분히 길게)
+        self.store = store
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+    def plan(self, low, high, shard_size):
+        shards = []
+        shard_high = high
+        while shard_high >= low:
+            shard_low = max(low, shard_high - shard_size + 1)
+            shards.append((len(shards), shard_low, shard_high))
+            shard_high = shard_low - 1
+
+        # 이미 계획이 있으면 같은 계획일 때만 허용 (다른 범위로 다시 나누면 진행 중인 lease 와 겹칠 수 있음)
+        existing = [(row['shard_id'], row['low'], row['high']) for row in self.store.shards()]
+        if existing and existing != shards:
+            raise ValueError("coordinator already has a different shard plan")
+        self.store.add_shards(shards, self.clock())
+        return len(shards)
+
+    def claim(self, worker):
+        return self.store.claim(worker, self.clock(), self.lease_seconds)
+
+    def renew(self, lease):
+        return self.store.renew(lease, self.clock(), self.lease_seconds)
+
+    def complete(self, lease, output):
+        return self.store.complete(lease, output, self.clock())
+
+    def release(self, lease):
+        return self.store.release(lease, self.clock())
+
+    def progress(self):
+        now = self.clock()
+        counts = collections.Counter()
+        for row in self.store.shards():
+            if row['state'] == LEASED and row['lease_until'] < now:
+                counts['expired'] += 1
+            else:
+                counts[row['state']] += 1
+        return dict(counts)
+
+    def check_coverage(self):
+        # shard 들이 빈틈 / 겹침 없이 이어지는지 확인 (문제가 있으면 설명 목록)
+        problems = []
+        rows = self.store.shards()
+        for previous, row in zip(rows, rows[1:]):
+            if row['high'] != previous['low'] - 1:
+                problems.append(f"shard {previous['shard_id']} [{previous['low']}, {previous['high']}] and "
+                                f"shard {row['shard_id']} [{row['low']}, {row['high']}] are not contiguous")
+        return problems
+
+    def completed_outputs(self):
+        return [(row['shard_id'], row['output']) for row in self.store.shards() if row['state'] == DONE]
+
+
+def read_failed_ids(output):
+    path = os.path.join(output, FAILED_FILENAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as fd:
+        return [int(line) for line in fd if line.strip()]
+
+
+def merge_outputs(coordinator, merged_dir, filename, store_filename=None, index_filename=None, failed_filename='failed_recipes.txt'):
+    # 완료된 shard 의 출력을 shard 순서 (큰 ID 부터) / shard 안에서 recipe_id 내림차순으로 합침
+    # shard 하나씩만 메모리에 올리므로 전체 크기와 무관
+    # 재시도 후에도 받지 못한 ID 는 shard 마다 남긴 목록을 모아서 failed_filename 에 기록 (다시 크롤링할 대상)
+    rows = coordinator.store.shards()
+    pending = [row['shard_id'] for row in rows if row['state'] != DONE]
+    if pending:
+        print(f"[INFO] {len(pending)} of {len(rows)} shards are not done yet, merging the completed ones")
+
+    store = None
+    if store_filename:
+        from recipe_store import RecipeStore
+        store = RecipeStore(store_filename)
+    sink = ShardedJsonlSink(merged_dir)
+    recipe_ids = []
+    failed_ids = []
+    try:
+        for shard_id, output in coordinator.completed_outputs():
+            records = sorted(iter_records(output), key=lambda record: record['recipe_id'], reverse=True)
+            seen = set()
+            for record in records:
+                if record['recipe_id'] in seen:
+                    continue
+                seen.add(record['recipe_id'])
+                sink(record)
+                if store is not None:
+                    store(record)
+            if store is not None:
+                store.commit()
+            recipe_ids.extend(seen)
+            failed_ids.extend(read_failed_ids(output))
+    finally:
+        sink.close()
+        if store is not None:
+            store.close()
+
+    export_records(merged_dir, filename)
+    with open(failed_filename, mode='w', newline='', encoding='utf-8') as log_fd:
+        for failed_id in sorted(failed_ids, reverse=True):
+            log_fd.write(f"{failed_id}\n")
+    print(f"[INFO] {len(failed_ids)} IDs failed after retries, saved to {failed_filename}")
+    if index_filename:
+        from recipe_id_index import RecipeIdIndex
+        added = RecipeIdIndex(index_filename).merge(recipe_ids)
+        print(f"[INFO] {added} new recipe IDs merged into {index_filename}")
+    return len(recipe_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', default='coordinator.db', help="shared coordinator database (SQLite)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    plan_parser = subparsers.add_parser('plan', help="split [low, high] into shards")
+    plan_parser.add_argument('--low', type=int, required=True)
+    plan_parser.add_argument('--high', type=int, required=True)
+    plan_parser.add_argument('--shard-size', type=int, default=10000)
+    subparsers.add_parser('status', help="print shard counts by state")
+    merge_parser = subparsers.add_parser('merge', help="merge completed shard outputs")
+    merge_parser.add_argument('--output', default='recipes.csv', help="merged output (.csv or .parquet)")
+    merge_parser.add_argument('--merged-dir', default='recipes_shards_merged')
+    merge_parser.add_argument('--store', help="recipe store (SQLite) to upsert the merged recipes into")
+    merge_parser.add_argument('--index', help="recipe ID index to merge the found IDs into")
+    args = parser.parse_args()
+
+    coordinator = ShardCoordinator(SqliteLeaseStore(args.db))
+    if args.command == 'plan':
+        count = coordinator.plan(args.low, args.high, args.shard_size)
+        print(f"[INFO] {count} shards of up to {args.shard_size} IDs planned for {args.low} ~ {args.high}")
+    elif args.command == 'status':
+        print(f"[INFO] {coordinator.progress()}")
+        for problem in coordinator.check_coverage():
+            print(f"[ERROR] {problem}")
+    else:
+        count = merge_outputs(coordinator, args.merged_dir, args.output, args.store, args.index)
+        print(f"[INFO] {count} recipes merged")
+    coordinator.store.close()
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+
+from aiohttp import web
+
+from sample_pages import load_sample_records, render_material_response, render_not_found_page, render_recipe_page
+
+# 실제 사이트 대신 쓰는 로컬 레시피 서버 (속도 조절기 / 크롤러 테스트용).
+# recent_recipes.csv 로 만든 페이지를 /recipe/{id} 로 돌려주고, 서버처럼 요청을 제한한다.
+#   - 최근 1초 동안 받은 요청이 capacity 를 넘으면 429 + Retry-After
+#   - 부하(최근 1초 요청 수 / capacity)가 높을수록 응답이 느려짐
+#   - error_rate 확률로 503, 지연 시간은 latency 의 ±jitter 비율 안에서 랜덤 (seed 로 재현 가능)
+#   - script_only_every 로 나누어떨어지는 ID 는 원본 HTML 에 JSON-LD 가 없는 페이지 (브라우저 fallback 확인용)
+#   - /bbs/ajax.html?q_mode=getMaterialContents&seq= 로 재료 정보 JSON (seq 1 ~ material_count, material_revision 으로 일부 내용 변경)
+#   python standin_server.py --port 8765 --capacity 50
+#   python fast_version.py --base-url http://127.0.0.1:8765/recipe/
+# /stats 로 지금까지의 요청 수와 최근 1초 요청 수를 확인할 수 있다.
+
+
+class StandinServer:
+    def __init__(self, records, capacity=50, latency=0.02, error_rate=0.0, not_found_every=3, retry_after=1, jitter=0.0, seed=None,
+                 script_only_every=0, material_count=3509, material_revision=0):
+        self.pages = [render_recipe_page(record) for record in records]
+        self.script_only_pages = [render_recipe_page(record, with_json_ld=False) for record in records] if script_only_every else []
+        self.not_found_page = render_not_found_page()
+        self.capacity = capacity
+        self.latency = latency
+        self.error_rate = error_rate
+        self.not_found_every = not_found_every  # 이 수로 나누어떨어지는 ID 는 레시피 없음
+        self.retry_after = retry_after
+        self.script_only_every = script_only_every
+        self.material_count = material_count
+        self.material_revision = material_revision
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.recent = collections.deque()  # 최근 1초 동안 받은 요청 시각
+        self.counts = collections.Counter()
+        self.started = time.monotonic()
+
+    def _load(self):
+        now = time.monotonic()
+        self.recent.append(now)
+        while self.recent and self.recent[0] < now - 1:
+            self.recent.popleft()
+        return len(self.recent) / self.capacity
+
+    async def _admit(self):
+        # 요청 제한 / 오류 응답이면 그 응답, 아니면 지연 시간만큼 기다린 뒤 None
+        load = self._load()
+        self.counts['requests'] += 1
+        if load > 1:
+            self.counts['throttled'] += 1
+            return web.Response(status=429, headers={'Retry-After': str(self.retry_after)})
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.counts['errors'] += 1
+            return web.Response(status=503)
+
+        # 부하가 capacity 에 가까워질수록 지연 시간이 늘어남
+        latency = self.latency * (1 + self.random.uniform(-self.jitter, self.jitter)) if self.jitter else self.latency
+        await asyncio.sleep(latency * (1 + 4 * load * load))
+        return None
+
+    async def recipe(self, request):
+        recipe_id = int(request.match_info['recipe_id'])
+        rejected = await self._admit()
+        if rejected is not None:
+            return rejected
+        if not self.pages or recipe_id % self.not_found_every == 0:
+            self.counts['not_found'] += 1
+            return web.Response(body=self.not_found_page, content_type='text/html', charset='utf-8')
+        self.counts['ok'] += 1
+        if self.script_only_every and recipe_id % self.script_only_every == 0:
+            self.counts['script_only'] += 1
+            return web.Response(body=self.script_only_pages[recipe_id % len(self.pages)], content_type='text/html', charset='utf-8')
+        return web.Response(body=self.pages[recipe_id % len(self.pages)], content_type='text/html', charset='utf-8')
+
+    async def ajax(self, request):
+        if request.query.get('q_mode') != 'getMaterialContents' or not request.query.get('seq', '').isdigit():
+            return web.Response(status=400)
+        rejected = await self._admit()
+        if rejected is not None:
+            return rejected
+        seq = int(request.query['seq'])
+        if not 1 <= seq <= self.material_count:
+            self.counts['materials_missing'] += 1
+            return web.Response(text=json.dumps({'result': 'FAIL', 'mname': '', 'html': ''}), content_type='application/json')
+        self.counts['materials'] += 1
+        return web.Response(body=render_material_response(seq, self.material_revision), content_type='application/json', charset='utf-8')
+
+    async def stats(self, request):
+        elapsed = time.monotonic() - self.started
+        body = {**self.counts, 'recent_rps': len(self.recent), 'capacity': self.capacity,
+                'elapsed': round(elapsed, 1), 'ok_per_second': round(self.counts['ok'] / elapsed, 2) if elapsed else 0}
+        return web.Response(text=json.dumps(body), content_type='application/json')
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/recipe/{recipe_id:\\d+}', self.recipe)
+        app.router.add_get('/bbs/ajax.html', self.ajax)
+        app.router.add_get('/stats', self.stats)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--csv', default='recent_recipes.csv', help="crawled records used to render the recipe pages")
+    parser.add_argument('--limit', type=int, default=500, help="number of records to render")
+    parser.add_argument('--capacity', type=float, default=50, help="requests per second served before answering 429")
+    parser.add_argument('--latency', type=float, default=0.02, help="response latency (seconds) when idle")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="probability of answering 503")
+    parser.add_argument('--jitter', type=float, default=0.0, help="latency varies by up to this fraction")
+    parser.add_argument('--seed', type=int, help="random seed for injected errors and latency jitter")
+    parser.add_argument('--not-found-every', type=int, default=3, help="IDs divisible by this return the not-found page")
+    parser.add_argument('--script-only-every', type=int, default=0, help="IDs divisible by this return a page without JSON-LD in the raw HTML")
+    parser.add_argument('--material-count', type=int, default=3509, help="number of ingredient seqs served by /bbs/ajax.html")
+    parser.add_argument('--material-revision', type=int, default=0, help="changes the content of every 10th ingredient seq")
+    args = parser.parse_args()
+
+    server = StandinServer(load_sample_records(args.csv, args.limit), args.capacity, args.latency, args.error_rate, args.not_found_every,
+                           jitter=args.jitter, seed=args.seed, script_only_every=args.script_only_every,
+                           material_count=args.material_count, material_revision=args.material_revision)
+    print(f"[INFO] Serving {len(server.pages)} recipe pages on http://127.0.0.1:{args.port}/recipe/ (capacity {args.capacity} req/s)")
+    web.run_app(server.app(), port=args.port, print=None)
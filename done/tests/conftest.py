@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 공용 모듈(done/) 을 스크립트에서처럼 바로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+import asyncio
+import itertools
+import threading
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class DummyBrowser:
+    def __init__(self):
+        self.quit_called = False
+
+    def execute_script(self, script):
+        return 'complete'
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_start_quits_launched_browsers_when_one_fails():
+    launched = []
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def create_browser():
+        with lock:
+            n = next(counter)
+        if n == 2:
+            raise RuntimeError('chrome failed to start')
+        browser = DummyBrowser()
+        launched.append(browser)
+        return browser
+
+    pool = BrowserPool(4, create_browser)
+    with pytest.raises(RuntimeError):
+        asyncio.run(pool.start())
+    assert len(launched) == 3
+    assert all(browser.quit_called for browser in launched)
+    assert pool.executors == [] and pool.browsers == []
+
+
+def test_start_and_close():
+    pool = BrowserPool(2, DummyBrowser)
+
+    async def run():
+        await pool.start()
+        result = await pool.run(lambda browser, x: x * 2, 21)
+        await pool.close()
+        return result
+
+    assert asyncio.run(run()) == 42
+    assert all(browser.quit_called for browser in pool.browsers)
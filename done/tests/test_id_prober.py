@@ -0,0 +1,50 @@
+from id_prober import DENSE, PROMOTED, SKIPPED, GapAwareProber
+
+
+def run_rounds(prober, exists):
+    # 라운드마다 요청한 ID 의 결과를 바로 record (크롤러가 라운드 사이에 기다리는 것과 같음)
+    requested = []
+    for round_ids in prober.rounds():
+        round_ids = list(round_ids)
+        requested.append(round_ids)
+        for recipe_id in round_ids:
+            prober.record(recipe_id, exists(recipe_id))
+    return requested
+
+
+class FakeIndex:
+    def __init__(self, recipe_ids):
+        self.recipe_ids = recipe_ids
+
+    def between(self, low, high):
+        return [recipe_id for recipe_id in self.recipe_ids if low <= recipe_id <= high]
+
+
+def test_empty_blocks_are_skipped_after_sampling():
+    # 0 ~ 4999: 3000 이상 블록에만 레시피가 있음
+    prober = GapAwareProber(0, 4999)
+    first, second = run_rounds(prober, lambda recipe_id: recipe_id >= 3000 and recipe_id % 2 == 0)
+    assert len(first) == 500  # 표본만 (1/10)
+    states = {block.start: block.state for block in prober.blocks}
+    assert states == {4000: PROMOTED, 3000: PROMOTED, 2000: SKIPPED, 1000: SKIPPED, 0: SKIPPED}
+    assert len(first) + len(second) == 500 + 2 * 900
+    assert len(set(first) | set(second)) == len(first) + len(second)  # 표본은 다시 요청하지 않음
+
+
+def test_known_ids_are_not_requested_again_by_default():
+    known = list(range(4000, 5000))  # 블록 하나가 전부 알려짐
+    prober = GapAwareProber(0, 4999)
+    prober.load_evidence(FakeIndex(known))
+    requested = [recipe_id for round_ids in run_rounds(prober, lambda recipe_id: True) for recipe_id in round_ids]
+    assert not set(known) & set(requested)
+    assert prober.blocks[0].state == DENSE
+    assert len(requested) == 4000
+
+
+def test_refetch_known_requests_known_ids():
+    known = [4500, 4600]
+    prober = GapAwareProber(0, 4999, refetch_known=True)
+    prober.load_evidence(FakeIndex(known))
+    requested = [recipe_id for round_ids in run_rounds(prober, lambda recipe_id: False) for recipe_id in round_ids]
+    assert set(known) <= set(requested)
+    assert all(block.state == SKIPPED for block in prober.blocks)
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import ingredient_harvester
+from ingredient_harvester import ERROR, OK, MaterialStore, harvest
+from rate_controller import RateController
+
+# seq 별 ajax 응답 (1: null, 2: 리스트, 3: 정상, 4: 파싱 중 예외)
+RESPONSES = {
+    1: 'null',
+    2: '[1, 2]',
+    3: json.dumps({'mname': '양파', 'html': '<div class="ingredient_top"><p class="ingredient_tit">양파</p></div>'}),
+    4: json.dumps({'mname': '감자', 'html': ''}),
+}
+
+
+async def ajax(request):
+    return web.Response(text=RESPONSES[int(request.query['seq'])], content_type='application/json')
+
+
+def run_harvest(tmp_path, monkeypatch, seqs):
+    parse_material = ingredient_harvester.parse_material
+
+    def flaky_parse(seq, data):
+        if seq == 4:
+            raise KeyError('html')
+        return parse_material(seq, data)
+
+    monkeypatch.setattr(ingredient_harvester, 'maxAttempts', 1)
+    monkeypatch.setattr(ingredient_harvester, 'parse_material', flaky_parse)
+    store = MaterialStore(str(tmp_path / 'materials.db'))
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/bbs/ajax.html', ajax)
+        async with TestServer(app) as server:
+            monkeypatch.setattr(ingredient_harvester, 'baseUrl', str(server.make_url('/bbs/ajax.html')))
+            # 워커가 죽으면 harvest 가 끝나지 않으므로 시간 제한
+            return await asyncio.wait_for(harvest(seqs, store, RateController(100.0, max_rate=100.0), concurrency=2), 20)
+
+    counter = asyncio.run(run())
+    statuses = dict(store.conn.execute("SELECT seq, status FROM materials").fetchall())
+    store.close()
+    return counter, statuses
+
+
+def test_non_object_json_is_recorded_as_failed(tmp_path, monkeypatch):
+    counter, statuses = run_harvest(tmp_path, monkeypatch, [1, 2, 3])
+    assert statuses == {1: ERROR, 2: ERROR, 3: OK}
+    assert counter['failed'] == 2
+
+
+def test_unexpected_parse_error_does_not_stop_the_workers(tmp_path, monkeypatch):
+    # 워커 수(2)보다 많은 seq 가 예외를 내도 나머지 seq 를 계속 처리
+    seqs = [4, 4, 4, 3]
+    counter, statuses = run_harvest(tmp_path, monkeypatch, seqs)
+    assert statuses == {3: OK, 4: ERROR}
+    assert counter['failed'] == 3
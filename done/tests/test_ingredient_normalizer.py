@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from ingredient_normalizer import ParsedAmount, explode_ingredients, normalize_ingredients, parse_amount
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1/2컵', (0.5, 0.5, '컵')),
+    ('1~2큰술', (1.0, 2.0, 'T')),
+    ('1L', (1000.0, 1000.0, 'ml')),
+    ('1과1/2', (1.5, 1.5, None)),
+    ('2+1개', (3.0, 3.0, '개')),
+    ('1 1/2컵', (1.5, 1.5, '컵')),
+    ('2 1/2 ~ 3컵', (2.5, 3.0, '컵')),
+    ('½컵', (0.5, 0.5, '컵')),
+    ('1개반', (1.5, 1.5, '개')),
+    ('반개', (0.5, 0.5, '개')),
+    ('2 tablespoons', (2.0, 2.0, 'T')),
+    ('2 tsps', (2.0, 2.0, None)),
+    ('약간', (None, None, '약간')),
+    ('', (None, None, None)),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == ParsedAmount(*expected)
+
+
+def test_whitespace_only_joins_mixed_fractions():
+    # '2 10g' 는 12g 가 아님
+    assert parse_amount('2 10g').quantity == 2.0
+
+
+@pytest.mark.parametrize('text', ['1/0컵', '1~1/0컵'])
+def test_zero_denominator_is_unparseable(text):
+    assert parse_amount(text) == ParsedAmount(None, None, None)
+
+
+def test_normalize_ingredients():
+    frame = explode_ingredients([1, 2], [[{'name': '설탕', 'amount': '1/2컵'}, '만두 18개'], [('소금', '약간')]])
+    result = normalize_ingredients(frame)
+    assert list(result['name']) == ['설탕', '만두', '소금']
+    assert list(result['quantity'][:2]) == [0.5, 18.0]
+    assert pd.isna(result['quantity'][2])
+    assert list(result['unit']) == ['컵', '개', '약간']
@@ -0,0 +1,37 @@
+from rate_controller import RateController
+
+
+def test_steady_server_errors_do_not_hold_the_rate_down():
+    # 지연 시간은 그대로인데 응답 5개 중 1개가 503 인 서버: 줄이지 않고 정상 응답으로 계속 올림
+    rate = RateController(20.0, max_rate=100.0, cooldown=0)
+    for i in range(2000):
+        if i % 5 == 0:
+            rate.report(503)
+        else:
+            rate.report(200, latency=0.01)
+    assert rate.current_rate == 100.0
+
+
+def test_throttled_response_halves_the_rate():
+    rate = RateController(20.0, cooldown=0)
+    rate.report(429)
+    assert rate.current_rate == 10.0
+
+
+def test_mostly_failing_backend_backs_off_by_error_rate():
+    rate = RateController(20.0, cooldown=0)
+    for _ in range(20):
+        rate.report(error=True)
+    # 오류 비율 1.0 -> 매번 decrease_factor 배, min_rate 아래로는 내려가지 않음
+    assert rate.current_rate == rate.min_rate
+
+
+def test_errors_while_latency_grows_reduce_the_rate():
+    rate = RateController(20.0, cooldown=0)
+    for _ in range(20):
+        rate.report(200, latency=0.01)
+    for _ in range(20):
+        rate.report(200, latency=0.2)
+    before = rate.current_rate
+    rate.report(503)
+    assert rate.current_rate < before
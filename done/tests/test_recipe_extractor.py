@@ -0,0 +1,47 @@
+import pytest
+
+from recipe_extractor import extract_page, extract_page_with_soup, has_recipe_markup
+from sample_pages import load_sample_records, render_not_found_page, render_recipe_page
+
+# (넣을 위치 바로 앞 태그, 마크업): BeautifulSoup 은 주석 / script 문자열 안의 마크업을 요소로 보지 않음
+HIDDEN_MARKUP = {
+    'json-ld-in-comment': (b'<head>', b'<!-- <script type="application/ld+json">{"name": "old"}</script> -->'),
+    'alert-in-comment': (b'<body>', b'<!-- <div class="alert">old notice</div> -->'),
+    'alert-in-script': (b'<body>', b'<script>var notice = \'<div class="alert">\' + msg + \'</div>\';</script>'),
+    'tag-in-comment': (b'<body>', b'<!-- <div class="view_tag"><a href="#">old tag</a></div> -->'),
+    'material-in-comment': (b'<body>', b'<!-- <div id="divConfirmedMaterialArea"><ul><li><div>old</div><span>1</span></li></ul></div> -->'),
+}
+
+
+@pytest.fixture(scope='module')
+def recipe_page(request):
+    csv_filename = request.path.parent.parent / 'recent_recipes.csv'
+    return render_recipe_page(load_sample_records(str(csv_filename), 1)[0])
+
+
+@pytest.mark.parametrize('name', sorted(HIDDEN_MARKUP))
+def test_hidden_markup_matches_soup(recipe_page, name):
+    anchor, markup = HIDDEN_MARKUP[name]
+    page = recipe_page.replace(anchor, anchor + markup, 1)
+    extracted = extract_page(page)
+    assert extracted == extract_page_with_soup(page)
+    assert not extracted['not_found']
+
+
+def test_commented_out_json_ld_is_skipped(recipe_page):
+    anchor, markup = HIDDEN_MARKUP['json-ld-in-comment']
+    page = recipe_page.replace(anchor, anchor + markup, 1)
+    assert '"old"' not in extract_page(page)['json_ld']
+    assert extract_page(page)['json_ld'] == extract_page(recipe_page)['json_ld']
+
+
+def test_not_found_page():
+    page = render_not_found_page()
+    assert extract_page(page) == extract_page_with_soup(page)
+    assert extract_page(page)['not_found']
+    assert has_recipe_markup(page)
+
+
+def test_page_without_json_ld_outside_comments_needs_browser():
+    page = b'<html><head><!-- <script type="application/ld+json">{}</script> --></head><body></body></html>'
+    assert not has_recipe_markup(page)
@@ -0,0 +1,64 @@
+import os
+
+from record_sink import ShardedJsonlSink, export_csv, iter_records, load_schema, shard_paths
+
+
+def test_shard_is_committed_atomically(tmp_path):
+    commits = []
+
+    def on_commit(recipe_ids):
+        # 커밋 시점에는 shard 가 rename 까지 끝나 있어야 함
+        assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+        commits.append((recipe_ids, [record['recipe_id'] for record in iter_records(tmp_path)]))
+
+    sink = ShardedJsonlSink(str(tmp_path), shard_records=2, on_commit=on_commit)
+    sink({'recipe_id': 1})
+    # 아직 커밋되지 않은 레코드는 .tmp shard 에만 있음
+    assert shard_paths(str(tmp_path)) == []
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == ['part-00000.jsonl.gz.tmp']
+    assert list(iter_records(str(tmp_path))) == []
+
+    sink({'recipe_id': 2})
+    sink({'recipe_id': 3})
+    sink.close()
+    assert commits == [([1, 2], [1, 2]), ([3], [1, 2, 3])]
+    assert [os.path.basename(path) for path in shard_paths(str(tmp_path))] == ['part-00000.jsonl.gz', 'part-00001.jsonl.gz']
+
+
+def test_uncommitted_shard_is_dropped_on_resume(tmp_path):
+    committed = []
+    sink = ShardedJsonlSink(str(tmp_path), shard_records=2)
+    sink({'recipe_id': 1})
+    sink({'recipe_id': 2})
+    sink({'recipe_id': 3})  # 프로세스가 여기서 죽었다고 가정 (close 없음)
+    sink.fd.close()
+
+    sink = ShardedJsonlSink(str(tmp_path), shard_records=2, on_commit=committed.extend, append=True)
+    sink({'recipe_id': 3})
+    sink.close()
+    assert [record['recipe_id'] for record in iter_records(str(tmp_path))] == [1, 2, 3]
+    assert committed == [3]
+
+
+def test_append_false_clears_previous_shards(tmp_path):
+    sink = ShardedJsonlSink(str(tmp_path))
+    sink({'recipe_id': 1})
+    sink.close()
+    sink = ShardedJsonlSink(str(tmp_path))
+    sink({'recipe_id': 2})
+    sink.close()
+    assert [record['recipe_id'] for record in iter_records(str(tmp_path))] == [2]
+
+
+def test_schema_is_union_of_fields(tmp_path):
+    sink = ShardedJsonlSink(str(tmp_path))
+    sink({'recipe_id': 1, 'name': '군만두'})
+    sink({'recipe_id': 2, 'tags': ['간식'], 'name': None})
+    sink.close()
+    schema = load_schema(str(tmp_path))
+    assert schema['fields'] == ['recipe_id', 'name', 'tags']
+    assert schema['types'] == {'recipe_id': ['number'], 'name': ['null', 'string'], 'tags': ['list']}
+
+    csv_path = tmp_path / 'out.csv'
+    export_csv(str(tmp_path), str(csv_path))
+    assert csv_path.read_text(encoding='utf-8-sig').splitlines()[0] == 'recipe_id,name,tags'
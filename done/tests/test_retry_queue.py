@@ -0,0 +1,49 @@
+import asyncio
+
+from retry_queue import RetryQueue
+
+
+def test_backoff_grows_and_is_capped():
+    retry = RetryQueue(base_delay=1.0, max_delay=4.0)
+    for attempt, delay in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 4.0)]:
+        # 절반 + 나머지 절반 안의 jitter
+        for _ in range(50):
+            assert delay / 2 <= retry.backoff(attempt) <= delay
+
+
+def test_gives_up_after_max_attempts():
+    retry = RetryQueue(max_attempts=3)
+    assert retry.schedule(7, 'timeout')
+    assert retry.schedule(7, 'timeout')
+    assert not retry.schedule(7, 'server_error')
+    assert retry.gave_up == [7]
+    assert len(retry) == 2
+    assert retry.reasons == {'timeout': 2, 'server_error': 1, 'gave_up': 1}
+
+
+def test_get_returns_ids_in_retry_order_and_join_waits_for_task_done():
+    async def run():
+        retry = RetryQueue(base_delay=0.02, max_delay=0.02)
+        retry.schedule(1, 'timeout')
+        retry.schedule(1, 'timeout')  # 두 번째 시도도 최대 0.02초
+        retry.schedule(2, 'timeout')
+        got = [await asyncio.wait_for(retry.get(), 1) for _ in range(3)]
+        assert sorted(got) == [1, 1, 2]
+        join = asyncio.create_task(retry.join())
+        for _ in got[:-1]:
+            retry.task_done()
+        await asyncio.sleep(0)
+        assert not join.done()
+        retry.task_done()
+        await asyncio.wait_for(join, 1)
+
+    asyncio.run(run())
+
+
+def test_done_counts_recovered_ids():
+    retry = RetryQueue()
+    retry.schedule(1, 'timeout')
+    retry.done(1)
+    retry.done(2)  # 실패한 적 없는 ID
+    assert retry.recovered == 1
+    assert '1 recovered after retry' in retry.summary()
@@ -0,0 +1,81 @@
+import pytest
+
+from record_sink import ShardedJsonlSink, iter_records
+from shard_coordinator import DONE, FAILED_FILENAME, MemoryLeaseStore, ShardCoordinator, SqliteLeaseStore, merge_outputs
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    store = MemoryLeaseStore() if request.param == 'memory' else SqliteLeaseStore(str(tmp_path / 'coordinator.db'))
+    yield store
+    store.close()
+
+
+def test_plan_covers_range_from_the_top(store):
+    coordinator = ShardCoordinator(store)
+    assert coordinator.plan(1, 25, 10) == 3
+    assert [(row['low'], row['high']) for row in store.shards()] == [(16, 25), (6, 15), (1, 5)]
+    assert coordinator.check_coverage() == []
+    # 같은 계획은 다시 해도 되지만 다른 계획은 거절
+    assert coordinator.plan(1, 25, 10) == 3
+    with pytest.raises(ValueError):
+        coordinator.plan(1, 25, 5)
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_is_rejected(store):
+    clock = FakeClock()
+    coordinator = ShardCoordinator(store, lease_seconds=10, clock=clock)
+    coordinator.plan(1, 10, 10)
+    first = coordinator.claim('a')
+    assert coordinator.claim('b') is None
+
+    clock.now += 11
+    assert coordinator.progress() == {'expired': 1}
+    second = coordinator.claim('b')
+    assert second.shard_id == first.shard_id and second.token == first.token + 1
+    # 만료된 뒤에 돌아온 워커의 renew / complete 는 거절
+    assert not coordinator.renew(first)
+    assert not coordinator.complete(first, 'out-a')
+    assert coordinator.renew(second)
+    assert coordinator.complete(second, 'out-b')
+    assert coordinator.progress() == {DONE: 1}
+    assert coordinator.completed_outputs() == [(0, 'out-b')]
+
+
+def test_release_returns_shard_to_pending(store):
+    coordinator = ShardCoordinator(store)
+    coordinator.plan(1, 10, 10)
+    lease = coordinator.claim('a')
+    assert coordinator.release(lease)
+    assert coordinator.claim('b').token == lease.token + 1
+
+
+def test_merge_outputs_orders_records_and_collects_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    coordinator = ShardCoordinator(MemoryLeaseStore())
+    coordinator.plan(1, 20, 10)
+    leases = [coordinator.claim('a'), coordinator.claim('b')]
+    outputs = {0: ([12, 20, 15], []), 1: ([3, 8, 5, 8], [2])}
+    # 뒤쪽 shard 가 먼저 끝나도 결과는 shard 순서 / shard 안에서 recipe_id 내림차순 (중복 제거)
+    for lease in reversed(leases):
+        recipe_ids, failed_ids = outputs[lease.shard_id]
+        output = f'shard-{lease.shard_id}'
+        sink = ShardedJsonlSink(output)
+        for recipe_id in recipe_ids:
+            sink({'recipe_id': recipe_id})
+        sink.close()
+        with open(f'{output}/{FAILED_FILENAME}', 'w', encoding='utf-8') as fd:
+            fd.writelines(f"{failed_id}\n" for failed_id in failed_ids)
+        coordinator.complete(lease, output)
+
+    assert merge_outputs(coordinator, 'merged', 'recipes.csv') == 6
+    assert [record['recipe_id'] for record in iter_records('merged')] == [20, 15, 12, 8, 5, 3]
+    assert (tmp_path / 'failed_recipes.txt').read_text() == "2\n"